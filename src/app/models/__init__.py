@@ -1,5 +1,18 @@
 from .appointment import Appointment, AppointmentStatus
 from .slot import Slot
+from .slotrecurrence import SlotRecurrence
+from .slothold import SlotHold
+from .waitlistentry import WaitlistEntry
+from .schedule import Schedule
 from .user import User
 from .client import Client
-from .role import Role
\ No newline at end of file
+from .role import Role
+from .caller import Caller
+from .slotpage import SlotFilter, SlotSort, SlotCursor, SlotPage
+from .slotbatch import SlotBatchResult
+from .slotstatus import SlotStatus
+from .freewindow import FreeWindow
+from .slotview import SlotView
+from .appointmentview import AppointmentView
+from .agendarow import AgendaRow
+from .waitlistpromotion import WaitlistPromotion
@@ -0,0 +1,26 @@
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from .slotstatus import SlotStatus
+
+
+class AgendaRow(NamedTuple):
+    """Строка расписания для экспорта: слот и его неотменённая запись с клиентом, если она есть."""
+    slot_id: int
+    start_time: datetime
+    end_time: datetime
+    status: SlotStatus
+    appointment_id: Optional[int]
+    client_first_name: Optional[str]
+    client_last_name: Optional[str]
+    description: Optional[str]
+
+    @property
+    def date(self) -> date:
+        return self.start_time.date()
+
+    @property
+    def client_name(self) -> Optional[str]:
+        if self.appointment_id is None:
+            return None
+        return ' '.join(filter(None, [self.client_first_name, self.client_last_name]))
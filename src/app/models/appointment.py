@@ -1,21 +1,14 @@
-from enum import Enum
 from dataclasses import dataclass
 from datetime import datetime
 from typing import Optional
 
 from sqlalchemy.orm import Mapped
 
+from src.common.framework.schema.enums import AppointmentStatus
 from src.common.framework.schema.schema import appointment
 
 from .base import Base
 
-class AppointmentStatus(Enum):
-    PENDING = 'pending' # Ожидает подтверждения
-    CONFIRMED = 'confirmed' # Подтверждена
-    COMPLETED = 'completed' # Завершена
-    CANCELLED = 'cancelled' # Отменена
-    RESCHEDULED = 'rescheduled' # Перенесена
-
 @dataclass
 class Appointment(Base):
     appointment_id: Mapped[int]
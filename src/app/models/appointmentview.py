@@ -0,0 +1,19 @@
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from src.common.framework.schema.enums import AppointmentStatus
+
+
+class AppointmentView(NamedTuple):
+    """Запись вместе со временем её слота для списков записей клиента."""
+    appointment_id: int
+    slot_id: Optional[int]
+    start_time: Optional[datetime]
+    end_time: Optional[datetime]
+    status: AppointmentStatus
+    description: Optional[str]
+    location: Optional[str]
+
+    @property
+    def date(self) -> Optional[date]:
+        return self.start_time.date() if self.start_time else None
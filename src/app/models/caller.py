@@ -0,0 +1,13 @@
+from typing import NamedTuple, Optional
+
+from .role import Role
+
+
+class Caller(NamedTuple):
+    """
+    Роль пользователя Telegram и его строки user/client, если они есть.
+    Администратор, заведённый и клиентом, получает оба id.
+    """
+    role: Role
+    user_id: Optional[int] = None
+    client_id: Optional[int] = None
@@ -0,0 +1,13 @@
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+
+
+@dataclass(frozen=True)
+class FreeWindow:
+    """Непрерывный промежуток из идущих подряд свободных слотов."""
+    start_time: datetime
+    end_time: datetime
+
+    @property
+    def duration(self) -> timedelta:
+        return self.end_time - self.start_time
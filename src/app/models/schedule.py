@@ -0,0 +1,45 @@
+from typing import Optional
+from datetime import date, time, datetime
+
+from sqlalchemy.orm import Mapped
+
+from src.common.framework.schema.schema import schedule
+
+from .base import Base
+
+
+class Schedule(Base):
+    """Рабочие часы администратора на дату, из которых генерируются слоты."""
+    schedule_id: Mapped[int]
+    admin_id: Mapped[int]
+    date: Mapped[date]
+    start_time: Mapped[time]
+    end_time: Mapped[time]
+    is_active: Mapped[int]
+    slot_duration_in_minutes: Mapped[int]
+    materialized_at: Mapped[Optional[datetime]]
+    created_at: Mapped[Optional[datetime]]
+    updated_at: Mapped[Optional[datetime]]
+    __table__ = schedule
+
+    def __repr__(self):
+        return (f'<Schedule(schedule_id={self.schedule_id}, admin_id={self.admin_id}, date={self.date}, '
+                f'start_time={self.start_time}, end_time={self.end_time}, is_active={self.is_active}, '
+                f'slot_duration_in_minutes={self.slot_duration_in_minutes})>')
+
+    def __eq__(self, other):
+        if self.schedule_id != other.schedule_id:
+            return False
+        if self.admin_id != other.admin_id:
+            return False
+        if self.date != other.date:
+            return False
+        if self.start_time != other.start_time:
+            return False
+        if self.end_time != other.end_time:
+            return False
+        if self.is_active != other.is_active:
+            return False
+        if self.slot_duration_in_minutes != other.slot_duration_in_minutes:
+            return False
+        return True
@@ -1,3 +1,4 @@
+from typing import Optional
 from datetime import datetime
 
 from sqlalchemy.orm import Mapped
@@ -12,8 +13,14 @@ class Slot(Base):
     start_time: Mapped[datetime]
     end_time: Mapped[datetime]
     duration_in_minutes: Mapped[int]
+    recurrence_id: Mapped[Optional[int]]
     __table__ = slot
 
+    @property
+    def is_virtual(self) -> bool:
+        """Слот развёрнут из повторяющегося правила и ещё не сохранён в таблицу slot."""
+        return self.slot_id is None and self.recurrence_id is not None
+
     def __repr__(self):
         return (f'<Slot(slot_id={self.slot_id}, start_time={self.start_time}, end_time={self.end_time},'
                 f' duration_in_minutes={self.duration_in_minutes}>')
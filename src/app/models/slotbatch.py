@@ -0,0 +1,10 @@
+from dataclasses import dataclass, field
+
+from .slot import Slot
+
+
+@dataclass(frozen=True)
+class SlotBatchResult:
+    """Итог массового добавления: сохранённые слоты (с slot_id) и отклонённые из-за пересечений."""
+    inserted: list[Slot] = field(default_factory=list)
+    rejected: list[Slot] = field(default_factory=list)
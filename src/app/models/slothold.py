@@ -0,0 +1,36 @@
+from typing import Optional
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped
+
+from src.common.framework.schema.schema import slot_hold
+
+from .base import Base
+
+
+class SlotHold(Base):
+    """
+    Временная бронь слота клиентом holder_tg_id до expires_at, пока он оформляет
+    запись. Истёкшая бронь ничего не держит, даже если ещё не удалена.
+    """
+    hold_id: Mapped[int]
+    slot_id: Mapped[int]
+    holder_tg_id: Mapped[int]
+    expires_at: Mapped[datetime]
+    created_at: Mapped[Optional[datetime]]
+    __table__ = slot_hold
+
+    def __repr__(self):
+        return (f'<SlotHold(hold_id={self.hold_id}, slot_id={self.slot_id}, '
+                f'holder_tg_id={self.holder_tg_id}, expires_at={self.expires_at})>')
+
+    def __eq__(self, other):
+        if self.hold_id != other.hold_id:
+            return False
+        if self.slot_id != other.slot_id:
+            return False
+        if self.holder_tg_id != other.holder_tg_id:
+            return False
+        if self.expires_at != other.expires_at:
+            return False
+        return True
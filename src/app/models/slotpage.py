@@ -0,0 +1,67 @@
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Optional
+
+from .slot import Slot
+from .slotview import SlotView
+
+
+class SlotFilter(Enum):
+    ALL = 'all' # Все слоты
+    ACTIVE = 'active' # Ещё не закончились
+    FUTURE = 'future' # Ещё не начались
+    PAST = 'past' # Уже начались
+    CANCELLED = 'cancelled' # Запись на слот отменена и новой нет
+    BOOKED = 'booked' # Есть неотменённая запись
+
+
+class SlotSort(Enum):
+    DATE_ASC = 'date_asc'
+    DATE_DESC = 'date_desc'
+    TIME_ASC = 'time_asc' # По времени суток, затем по дате
+    TIME_DESC = 'time_desc'
+
+    @property
+    def is_descending(self) -> bool:
+        return self in (SlotSort.DATE_DESC, SlotSort.TIME_DESC)
+
+    @property
+    def by_time_of_day(self) -> bool:
+        return self in (SlotSort.TIME_ASC, SlotSort.TIME_DESC)
+
+    def reversed(self) -> 'SlotSort':
+        return {
+            SlotSort.DATE_ASC: SlotSort.DATE_DESC,
+            SlotSort.DATE_DESC: SlotSort.DATE_ASC,
+            SlotSort.TIME_ASC: SlotSort.TIME_DESC,
+            SlotSort.TIME_DESC: SlotSort.TIME_ASC,
+        }[self]
+
+
+# slot_id в сортировке для слотов, развёрнутых из повторяющихся правил
+VIRTUAL_SLOT_ID = 0
+
+
+@dataclass(frozen=True)
+class SlotCursor:
+    """Позиция в списке слотов: страница начинается со слота, идущего после этого."""
+    start_time: datetime
+    slot_id: int
+
+    @staticmethod
+    def after(slot: Slot | SlotView) -> 'SlotCursor':
+        return SlotCursor(slot.start_time, VIRTUAL_SLOT_ID if slot.slot_id is None else slot.slot_id)
+
+
+@dataclass(frozen=True)
+class SlotPage:
+    slots: list[SlotView]
+    has_next: bool
+    total: Optional[int] = None
+
+    @property
+    def next_cursor(self) -> Optional[SlotCursor]:
+        if not self.has_next or not self.slots:
+            return None
+        return SlotCursor.after(self.slots[-1])
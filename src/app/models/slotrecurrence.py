@@ -0,0 +1,61 @@
+from typing import Iterable, Optional
+from datetime import date, time, datetime
+
+from sqlalchemy.orm import Mapped
+
+from src.common.framework.schema.schema import slot_recurrence
+
+from .base import Base
+
+
+class SlotRecurrence(Base):
+    """
+    Правило повторяющихся слотов: по дням недели weekdays с start_time до end_time
+    слотами по slot_duration_in_minutes, с valid_from по valid_until включительно.
+
+    Слоты по правилу не хранятся, а разворачиваются при чтении.
+    """
+    recurrence_id: Mapped[int]
+    weekdays: Mapped[int]
+    start_time: Mapped[time]
+    end_time: Mapped[time]
+    slot_duration_in_minutes: Mapped[int]
+    valid_from: Mapped[date]
+    valid_until: Mapped[date]
+    created_at: Mapped[Optional[datetime]]
+    updated_at: Mapped[Optional[datetime]]
+    __table__ = slot_recurrence
+
+    @staticmethod
+    def weekdays_mask(weekdays: Iterable[int]) -> int:
+        """Маска из номеров дней недели как у date.weekday(): 0 - понедельник."""
+        mask = 0
+        for weekday in weekdays:
+            mask |= 1 << weekday
+        return mask
+
+    def occurs_on(self, day: date) -> bool:
+        return self.valid_from <= day <= self.valid_until and bool(self.weekdays & (1 << day.weekday()))
+
+    def __repr__(self):
+        return (f'<SlotRecurrence(recurrence_id={self.recurrence_id}, weekdays={self.weekdays:07b}, '
+                f'start_time={self.start_time}, end_time={self.end_time}, '
+                f'slot_duration_in_minutes={self.slot_duration_in_minutes}, '
+                f'valid_from={self.valid_from}, valid_until={self.valid_until})>')
+
+    def __eq__(self, other):
+        if self.recurrence_id != other.recurrence_id:
+            return False
+        if self.weekdays != other.weekdays:
+            return False
+        if self.start_time != other.start_time:
+            return False
+        if self.end_time != other.end_time:
+            return False
+        if self.slot_duration_in_minutes != other.slot_duration_in_minutes:
+            return False
+        if self.valid_from != other.valid_from:
+            return False
+        if self.valid_until != other.valid_until:
+            return False
+        return True
@@ -0,0 +1,7 @@
+from enum import Enum
+
+
+class SlotStatus(Enum):
+    FREE = 'free' # Записей нет
+    BOOKED = 'booked' # Есть неотменённая запись
+    CANCELLED = 'cancelled' # Все записи отменены
@@ -0,0 +1,29 @@
+from datetime import date, datetime
+from typing import NamedTuple, Optional
+
+from .slotstatus import SlotStatus
+
+
+class SlotView(NamedTuple):
+    """
+    Слот для списков, клавиатур и экспорта: кортеж из колонок select(), без
+    ORM-объекта и identity map. Статус вычисляется в том же запросе.
+
+    У вхождений повторяющихся правил slot_id и created_at None.
+    """
+    slot_id: Optional[int]
+    start_time: datetime
+    end_time: datetime
+    duration_in_minutes: int
+    recurrence_id: Optional[int]
+    status: SlotStatus
+    created_at: Optional[datetime]
+
+    @property
+    def date(self) -> date:
+        return self.start_time.date()
+
+    @property
+    def is_virtual(self) -> bool:
+        """Вхождение повторяющегося правила, ещё не сохранённое в таблицу slot."""
+        return self.slot_id is None and self.recurrence_id is not None
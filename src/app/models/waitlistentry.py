@@ -0,0 +1,29 @@
+from typing import Optional
+from datetime import datetime
+
+from sqlalchemy.orm import Mapped
+
+from src.common.framework.schema.schema import slot_waitlist
+
+from .base import Base
+
+
+class WaitlistEntry(Base):
+    """Клиент client_id в листе ожидания занятого слота slot_id, очередь - по entry_id."""
+    entry_id: Mapped[int]
+    slot_id: Mapped[int]
+    client_id: Mapped[int]
+    created_at: Mapped[Optional[datetime]]
+    __table__ = slot_waitlist
+
+    def __repr__(self):
+        return f'<WaitlistEntry(entry_id={self.entry_id}, slot_id={self.slot_id}, client_id={self.client_id})>'
+
+    def __eq__(self, other):
+        if self.entry_id != other.entry_id:
+            return False
+        if self.slot_id != other.slot_id:
+            return False
+        if self.client_id != other.client_id:
+            return False
+        return True
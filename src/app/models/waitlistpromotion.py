@@ -0,0 +1,14 @@
+from datetime import datetime
+from typing import NamedTuple, Optional
+
+
+class WaitlistPromotion(NamedTuple):
+    """
+    Клиент из листа ожидания, которому досталась запись appointment_id на
+    освободившийся слот. По tg_client_id ему отправляется уведомление.
+    """
+    appointment_id: int
+    slot_id: int
+    client_id: int
+    tg_client_id: Optional[int]
+    start_time: datetime
@@ -1,5 +1,11 @@
-from .slot import SlotService
-from .user import UserService
-from .appointment import AppointmentService
-from .client import ClientService
-from .role import RoleService
+from .slot import SlotService, AsyncSlotService, SlotOverlapError
+from .user import UserService, AsyncUserService
+from .appointment import AppointmentService, AsyncAppointmentService, SlotBookedError, SlotHeldError
+from .client import ClientService, AsyncClientService
+from .role import RoleService, AsyncRoleService
+from .schedule import ScheduleService, AsyncScheduleService
+from .availability import AvailabilityIndex
+from .intervaltree import SlotIntervalTree
+from .slotdaycache import SlotDayCache
+from .slothold import SlotHoldService, AsyncSlotHoldService
+from .waitlist import WaitlistService, AsyncWaitlistService
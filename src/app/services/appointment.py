@@ -1,54 +1,460 @@
 import logging
-from typing import Optional
-from sqlalchemy import select
+from typing import AsyncIterator, Awaitable, Callable, Iterator, Optional
+from datetime import datetime
+from sqlalchemy import select, delete, exists, func, Select, Delete, Row, ColumnElement
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
 
-from src.app.models import Appointment, AppointmentStatus, Slot
+from src.app.models import (
+    Appointment, AppointmentStatus, AppointmentView, Client, Slot, SlotHold, WaitlistEntry, WaitlistPromotion
+)
+from src.app.services.availability import AvailabilityIndex
+from src.app.services.slot import (
+    STREAM_CHUNK_SIZE, first_occurrence_query, materialize_occurrence_query, occurrence_slot_query
+)
+from src.app.services.slotdaycache import SlotDayCache, forget_after_commit
 from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.notifications import APPOINTMENT, ChangeEvent, ChangeNotifier, payload_expression
 
 logger = logging.getLogger(__name__)
 
+# SQLSTATE нарушения уникального индекса ux_appointment_active_slot_id
+UNIQUE_VIOLATION = '23505'
+
+
+class SlotBookedError(ValueError):
+    """На слот slot_id уже есть неотменённая запись."""
+
+    def __init__(self, slot_id: int, reason: str = 'is already booked'):
+        self.slot_id = slot_id
+        super().__init__(f'Slot {slot_id} {reason}')
+
+
+class SlotHeldError(SlotBookedError):
+    """Слот временно забронирован другим клиентом (SlotHold), записаться на него сейчас нельзя."""
+
+    def __init__(self, slot_id: int):
+        super().__init__(slot_id, 'is held by another client')
+
+
+def _is_unique_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, 'pgcode', None) == UNIQUE_VIOLATION
+
+
+def lock_slot_query(slot_id: int) -> Select:
+    """
+    SELECT ... FOR UPDATE строки слота. Все, кто записывает на слот или бронирует
+    его, сначала берут эту блокировку, поэтому они идут по очереди.
+    """
+    return select(Slot.slot_id).where(Slot.slot_id == slot_id).with_for_update()
+
+
+def _lock_appointment_query(appointment_id: int) -> Select:
+    """
+    SELECT ... FOR UPDATE записи. populate_existing: сессия unit of work не
+    сбрасывает объекты после commit, и без него заблокированная строка отдавалась бы
+    из identity map такой, какой её прочитали раньше, - например уже отменённой
+    другим процессом.
+    """
+    return select(Appointment) \
+        .where(Appointment.appointment_id == appointment_id) \
+        .with_for_update() \
+        .execution_options(populate_existing=True)
+
+
+def _booked_clause(slot_id: ColumnElement[int] | int, appointment_id: Optional[int] = None) -> ColumnElement[bool]:
+    """На слоте есть неотменённая запись, кроме appointment_id."""
+    clause = exists().where(Appointment.slot_id == slot_id, Appointment.status != AppointmentStatus.CANCELLED)
+    if appointment_id is not None:
+        clause = clause.where(Appointment.appointment_id != appointment_id)
+    return clause
+
+
+def _held_clause(slot_id: ColumnElement[int] | int, holder_tg_id: Optional[int] = None) -> ColumnElement[bool]:
+    """На слоте есть неистёкшая бронь, кроме брони holder_tg_id."""
+    clause = exists().where(SlotHold.slot_id == slot_id, SlotHold.expires_at > func.now())
+    if holder_tg_id is not None:
+        clause = clause.where(SlotHold.holder_tg_id != holder_tg_id)
+    return clause
+
+
+def slot_taken_query(slot_id: int, appointment_id: Optional[int] = None, holder_tg_id: Optional[int] = None) -> Select:
+    """
+    (booked, held) слота, см. check_slot_free. Выполняется после lock_slot_query
+    отдельным запросом, поэтому видит записи и брони, закоммиченные, пока мы ждали блокировку.
+    """
+    return select(
+        _booked_clause(slot_id, appointment_id).label('booked'),
+        _held_clause(slot_id, holder_tg_id).label('held')
+    )
+
+
+def check_slot_free(slot_id: int, taken: Row) -> None:
+    """SlotBookedError или SlotHeldError, если slot_taken_query нашёл запись или чужую бронь."""
+    if taken.booked:
+        raise SlotBookedError(slot_id)
+    if taken.held:
+        raise SlotHeldError(slot_id)
+
+
+def _release_hold_query(slot_id: int, holder_tg_id: int) -> Delete:
+    return delete(SlotHold).where(SlotHold.slot_id == slot_id, SlotHold.holder_tg_id == holder_tg_id)
+
+
+def _dequeue_query(slot_id: int) -> Delete:
+    """
+    Снять с очереди слота первого клиента по ix_slot_waitlist_slot_id_entry_id, без
+    просмотра всей таблицы. SKIP LOCKED: строку, которую сейчас снимает другой процесс, не ждём.
+    """
+    first = select(WaitlistEntry.entry_id) \
+        .where(WaitlistEntry.slot_id == slot_id) \
+        .order_by(WaitlistEntry.entry_id) \
+        .limit(1) \
+        .with_for_update(skip_locked=True)
+    return delete(WaitlistEntry) \
+        .where(WaitlistEntry.entry_id == first.scalar_subquery()) \
+        .returning(WaitlistEntry.client_id)
+
+
+def _promotion_query(appointment_id: int) -> Select:
+    """Колонки WaitlistPromotion для записи клиента из листа ожидания."""
+    return select(
+        Appointment.appointment_id,
+        Appointment.slot_id,
+        Appointment.client_id,
+        Client.tg_client_id,
+        Slot.start_time
+    ) \
+        .join(Slot, Slot.slot_id == Appointment.slot_id) \
+        .join(Client, Client.client_id == Appointment.client_id) \
+        .where(Appointment.appointment_id == appointment_id)
+
+
+def _lock_free_slot_query(range_from: datetime, range_to: datetime, skipped: list[int]) -> Select:
+    """
+    Первый слот из [range_from, range_to) без неотменённой записи и неистёкшей брони,
+    FOR UPDATE SKIP LOCKED: слоты, на которые сейчас записывают другие транзакции,
+    пропускаются, а не ждутся.
+    """
+    stmt = select(Slot.slot_id, Slot.start_time).where(
+        Slot.start_time >= range_from,
+        Slot.start_time < range_to,
+        ~_booked_clause(Slot.slot_id),
+        ~_held_clause(Slot.slot_id)
+    )
+    if skipped:
+        stmt = stmt.where(Slot.slot_id.not_in(skipped))
+    return stmt \
+        .order_by(Slot.start_time, Slot.slot_id) \
+        .limit(1) \
+        .with_for_update(skip_locked=True, of=Slot)
+
+
+def _slot_appointment_query(slot_id: int) -> Select:
+    """Не больше одной строки: ux_appointment_active_slot_id."""
+    return select(Appointment).where(Appointment.slot_id == slot_id, Appointment.status != AppointmentStatus.CANCELLED)
+
+
+def _occurrence_slot_id(recurrence_id: int, start_time: datetime, slot: Optional[Slot]) -> int:
+    """Слот уже сохранённого вхождения, на которое записываются. Вхождения нет - ValueError."""
+    if slot is None:
+        raise ValueError(f'Recurrence {recurrence_id} has no free occurrence at {start_time}')
+    return slot.slot_id
+
+
+def _is_active(status: Optional[AppointmentStatus]) -> bool:
+    return status is not None and status != AppointmentStatus.CANCELLED
+
+
+def _notify_query(notifications: ChangeNotifier, appointment_id: int, slot_ids: list[Optional[int]]) -> Select:
+    """NOTIFY об изменении записи на каждый из слотов, день слота берётся (и возвращается) в том же запросе."""
+    payload = payload_expression(APPOINTMENT, appointment_id, Slot.start_time)
+    return select(Slot.start_time, notifications.notify(payload)).where(Slot.slot_id.in_(slot_ids))
+
+
+def appointment_views_query() -> Select:
+    """Только колонки AppointmentView: запись и время её слота (если слот не удалён)."""
+    return select(
+        Appointment.appointment_id,
+        Appointment.slot_id,
+        Slot.start_time,
+        Slot.end_time,
+        Appointment.status,
+        Appointment.description,
+        Appointment.location
+    ) \
+        .select_from(Appointment) \
+        .outerjoin(Slot, Slot.slot_id == Appointment.slot_id)
+
+
+def _stream_appointments_query(range_from: Optional[datetime], range_to: Optional[datetime],
+                               chunk_size: int) -> Select:
+    """Записи на слоты из [range_from, range_to) для чтения серверным курсором, см. _stream_slots_query."""
+    stmt = appointment_views_query()
+    if range_from is not None:
+        stmt = stmt.where(Slot.start_time >= range_from)
+    if range_to is not None:
+        stmt = stmt.where(Slot.start_time < range_to)
+    return stmt \
+        .order_by(Slot.start_time.nulls_last(), Appointment.appointment_id) \
+        .execution_options(yield_per=chunk_size)
+
+
+def _to_events(appointment_id: int, rows: list[Row]) -> list[ChangeEvent]:
+    return [ChangeEvent(APPOINTMENT, appointment_id, row.start_time.date()) for row in rows]
+
 
 class AppointmentService:
-    def __init__(self, engine: DatabaseEngine):
+    def __init__(self, engine: DatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None,
+                 on_promotion: Optional[Callable[[WaitlistPromotion], None]] = None):
+        """
+        availability - индекс занятости, который сервис обновляет после своих записей.
+        day_cache - кеш слотов по дням, в нём сбрасываются дни слотов изменённых записей.
+        on_promotion - уведомление клиента, которому при отмене записи достался слот из листа ожидания.
+        """
         self._engine = engine
+        self._availability = availability
+        self._day_cache = day_cache
+        self._on_promotion = on_promotion
+        if day_cache is not None:
+            engine.notifications.subscribe(day_cache.on_change)
 
     def create_appointment(self, appointment: Appointment) -> None:
+        """Сохранить запись без блокировки слота, если слот занят - SlotBookedError. Для записи клиентов - book_slot."""
         try:
             with self._engine.session() as session:
                 session.add(appointment)
+                session.flush()
+                self._notify(session, appointment.appointment_id, [appointment.slot_id])
                 session.commit()
 
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            logger.error(f"Failed to create Appointment {repr(appointment)}. Error: {e}")
+            raise
+
         except Exception as e:
             if hasattr(locals().get('session'), 'rollback'):
                 session.rollback()
             logger.error(f"Failed to create Appointment {repr(appointment)}. Error: {e}")
             raise
 
+        self._track(appointment.slot_id, None, appointment.status)
+
+    def book_slot(self, appointment: Appointment, holder_tg_id: Optional[int] = None) -> None:
+        """
+        Записать на appointment.slot_id в одной транзакции: слот блокируется, проверяется,
+        что он свободен, и запись сохраняется. Слот занят - SlotBookedError, забронирован
+        другим клиентом - SlotHeldError, слота нет - ValueError.
+
+        holder_tg_id - клиент, который забронировал слот (SlotHoldService.hold_slot):
+        его бронь не мешает записи и превращается в неё - удаляется в той же транзакции.
+        """
+        try:
+            with self._engine.session() as session:
+                self._book(session, appointment, holder_tg_id)
+                session.commit()
+
+        except IntegrityError as e:
+            # Запись в обход блокировки (create_appointment) успела раньше
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            raise
+
+        self._track(appointment.slot_id, None, appointment.status)
+
+    def book_occurrence(self, appointment: Appointment, recurrence_id: int, start_time: datetime) -> None:
+        """
+        Записать на вхождение повторяющегося правила (строку SlotView.is_virtual): в одной
+        транзакции вхождение сохраняется как слот и на него записывают, appointment.slot_id
+        заполняется. Вхождения нет - ValueError, уже сохранено и занято - SlotBookedError.
+        """
+        try:
+            with self._engine.session() as session:
+                slot_id = session.scalars(materialize_occurrence_query(recurrence_id, start_time)).one_or_none()
+                if slot_id is None:
+                    # Вхождение уже сохранено, например под запись, которую потом отменили
+                    slot = session.scalars(occurrence_slot_query(recurrence_id, start_time)).one_or_none()
+                    slot_id = _occurrence_slot_id(recurrence_id, start_time, slot)
+                appointment.slot_id = slot_id
+                self._book(session, appointment)
+                session.commit()
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            raise
+
+        self._track(appointment.slot_id, None, appointment.status)
+
+    def _book(self, session: Session, appointment: Appointment, holder_tg_id: Optional[int] = None) -> None:
+        if session.scalars(lock_slot_query(appointment.slot_id)).one_or_none() is None:
+            raise ValueError(f"Slot with slot_id = {appointment.slot_id} does not exists")
+        if _is_active(appointment.status):
+            taken = session.execute(slot_taken_query(appointment.slot_id, holder_tg_id=holder_tg_id)).one()
+            check_slot_free(appointment.slot_id, taken)
+        if holder_tg_id is not None:
+            session.execute(_release_hold_query(appointment.slot_id, holder_tg_id))
+
+        session.add(appointment)
+        session.flush()
+        self._notify(session, appointment.appointment_id, [appointment.slot_id])
+
+    def book_first_free_slot(self, appointment: Appointment, range_from: datetime, range_to: datetime) -> bool:
+        """
+        Записать на первый свободный и никем не забронированный слот из [range_from, range_to),
+        appointment.slot_id заполняется. Занятые другими транзакциями слоты пропускаются (SKIP LOCKED),
+        поэтому одновременные записи расходятся по разным слотам. Если раньше первого свободного
+        слота есть вхождение повторяющегося правила, оно сохраняется и запись идёт на него.
+        False - свободных слотов и вхождений нет.
+        """
+        try:
+            with self._engine.session() as session:
+                skipped: list[int] = []
+                while True:
+                    slot = session.execute(_lock_free_slot_query(range_from, range_to, skipped)).first()
+                    occurrence = session.execute(
+                        first_occurrence_query(range_from, range_to if slot is None else slot.start_time)
+                    ).first()
+                    if occurrence is not None:
+                        # Сохранённое вхождение до commit видно только этой транзакции. Если его успела
+                        # сохранить другая, следующий проход увидит его среди слотов
+                        slot_id = session.scalars(materialize_occurrence_query(*occurrence)).one_or_none()
+                        if slot_id is not None:
+                            break
+                        continue
+                    if slot is None:
+                        return False
+                    # Снимок запроса мог не увидеть запись, закоммиченную перед снятием блокировки
+                    if not any(session.execute(slot_taken_query(slot.slot_id)).one()):
+                        slot_id = slot.slot_id
+                        break
+                    skipped.append(slot.slot_id)
+
+                appointment.slot_id = slot_id
+                session.add(appointment)
+                session.flush()
+                self._notify(session, appointment.appointment_id, [slot_id])
+                session.commit()
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            raise
+
+        self._track(appointment.slot_id, None, appointment.status)
+        return True
+
     def get_appointment_by_id(self, appointment_id: int) -> Optional[Appointment]:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(Appointment).where(Appointment.appointment_id == appointment_id)
             return session.scalars(stmt).one_or_none()
 
+    def get_slot_appointment(self, slot_id: int) -> Optional[Appointment]:
+        """Неотменённая запись на слот, если она есть."""
+        with self._engine.read_session() as session:
+            return session.scalars(_slot_appointment_query(slot_id)).one_or_none()
+
+    def iter_appointments(self, range_from: Optional[datetime] = None, range_to: Optional[datetime] = None,
+                          chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[AppointmentView]:
+        """
+        Записи по времени слота порциями по chunk_size строк через серверный курсор,
+        см. SlotService.iter_slots. Записи на удалённые слоты идут в конце, если диапазон не задан.
+        """
+        with self._engine.read_session() as session:
+            for partition in session.execute(_stream_appointments_query(range_from, range_to, chunk_size)).partitions():
+                for row in partition:
+                    yield AppointmentView(*row)
+
     def update_appointment(self, appointment: Appointment) -> None:
         with self._engine.session() as session:
             session.merge(appointment)
+            self._notify(session, appointment.appointment_id, [appointment.slot_id])
             session.commit()
 
-    def reschedule_appointment(self, appointment_id: int, new_slot: Slot) -> None:
-        if not new_slot.is_free:
-            raise ValueError(f"Slot is busy")
+    def reschedule_appointment(self, appointment_id: int, new_slot: Slot, holder_tg_id: Optional[int] = None) -> None:
+        """
+        Перенести запись на new_slot в одной транзакции: запись и новый слот блокируются,
+        как в book_slot. Слот занят - SlotBookedError, забронирован другим клиентом - SlotHeldError.
+        """
+        try:
+            with self._engine.session() as session:
+                stmt = _lock_appointment_query(appointment_id)
+                appointment: Optional[Appointment] = session.scalars(stmt).one_or_none()
 
-        appointment: Optional[Appointment] = self.get_appointment_by_id(appointment_id)
+                if not appointment:
+                    raise ValueError(f"Appointment with appointment_id = {appointment_id} does not exists")
+                if session.scalars(lock_slot_query(new_slot.slot_id)).one_or_none() is None:
+                    raise ValueError(f"Slot with slot_id = {new_slot.slot_id} does not exists")
+                if _is_active(appointment.status):
+                    taken = session.execute(slot_taken_query(new_slot.slot_id, appointment_id, holder_tg_id)).one()
+                    check_slot_free(new_slot.slot_id, taken)
+                if holder_tg_id is not None:
+                    session.execute(_release_hold_query(new_slot.slot_id, holder_tg_id))
 
-        if not appointment:
-            raise ValueError(f"Appointment with appointment_id = {appointment_id} does not exists")
+                old_slot_id = appointment.slot_id
+                appointment.slot_id = new_slot.slot_id
+                self._notify(session, appointment_id, [old_slot_id, new_slot.slot_id])
+                session.commit()
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(new_slot.slot_id) from e
+            raise
+
+        self._track(old_slot_id, appointment.status, None)
+        self._track(new_slot.slot_id, None, appointment.status)
+
+    def cancel_appointment(self, appointment_id: int) -> Optional[WaitlistPromotion]:
+        """
+        Отменить запись. Если она занимала слот, в той же транзакции слот достаётся
+        первому клиенту листа ожидания (WaitlistService) - ему создаётся запись PENDING.
+        Возвращает, кому достался слот. Клиента уведомляет on_promotion - после commit,
+        чтобы он не узнал о записи, которая потом откатится; ошибка уведомления отмену не отменяет.
+        """
         with self._engine.session() as session:
-            appointment.slot_id = new_slot.slot_id
-            session.commit()
+            stmt = _lock_appointment_query(appointment_id)
+            appointment: Optional[Appointment] = session.scalars(stmt).one_or_none()
+
+            if appointment is None:
+                raise RuntimeError(f'Appointment with appointment_id = {appointment_id} does not found')
+
+            old_status = appointment.status
+            appointment.status = AppointmentStatus.CANCELLED
+            promoted: Optional[Appointment] = None
+            if _is_active(old_status) and appointment.slot_id is not None:
+                # Как в book_slot: пока слот заблокирован, на него не записаться в обход очереди
+                session.execute(lock_slot_query(appointment.slot_id))
+                # Отмена должна попасть в БД раньше новой записи: уникальный индекс по активным записям
+                session.flush()
+                client_id = session.scalars(_dequeue_query(appointment.slot_id)).first()
+                if client_id is not None:
+                    promoted = Appointment(slot_id=appointment.slot_id, client_id=client_id,
+                                           status=AppointmentStatus.PENDING)
+                    session.add(promoted)
+                    session.flush()
 
+            self._notify(session, appointment_id, [appointment.slot_id])
+            promotion = None
+            if promoted is not None:
+                self._notify(session, promoted.appointment_id, [promoted.slot_id])
+                promotion = WaitlistPromotion(*session.execute(_promotion_query(promoted.appointment_id)).one())
+            session.commit()
 
-    def cancel_appointment(self, appointment_id: int) -> None:
-        self._update_appointment_status(appointment_id, AppointmentStatus.CANCELLED)
+        self._track(appointment.slot_id, old_status, AppointmentStatus.CANCELLED)
+        if promoted is not None:
+            logger.info(f'Slot {promoted.slot_id} passed to client {promoted.client_id} from the waitlist')
+            self._track(promoted.slot_id, None, promoted.status)
+            if self._on_promotion is not None:
+                try:
+                    self._on_promotion(promotion)
+                except Exception as e:
+                    logger.error(f'Failed to notify client {promotion.client_id} about slot {promotion.slot_id}: {e}')
+        return promotion
 
     def confirm_appointment(self, appointment_id: int) -> None:
         self._update_appointment_status(appointment_id, AppointmentStatus.CONFIRMED)
@@ -64,5 +470,259 @@ class AppointmentService:
             if appointment is None:
                 raise RuntimeError(f'Appointment with appointment_id = {appointment_id} does not found')
 
+            old_status = appointment.status
             appointment.status = new_status
+            self._notify(session, appointment_id, [appointment.slot_id])
             session.commit()
+
+        self._track(appointment.slot_id, old_status, new_status)
+
+    def _notify(self, session: Session, appointment_id: int, slot_ids: list[Optional[int]]) -> None:
+        rows = session.execute(_notify_query(self._engine.notifications, appointment_id, slot_ids)).all()
+        forget_after_commit(session, self._day_cache, _to_events(appointment_id, rows))
+
+    def _track(self, slot_id: Optional[int], old_status: Optional[AppointmentStatus],
+               new_status: Optional[AppointmentStatus]) -> None:
+        """Сообщить индексу занятости, что запись на slot_id появилась или пропала."""
+        if self._availability is None or slot_id is None or _is_active(old_status) == _is_active(new_status):
+            return
+        if _is_active(new_status):
+            self._availability.book(slot_id)
+        else:
+            self._availability.release(slot_id)
+
+
+class AsyncAppointmentService:
+    def __init__(self, engine: AsyncDatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None,
+                 on_promotion: Optional[Callable[[WaitlistPromotion], Awaitable[None]]] = None):
+        self._engine = engine
+        self._availability = availability
+        self._day_cache = day_cache
+        self._on_promotion = on_promotion
+        if day_cache is not None:
+            engine.notifications.subscribe(day_cache.on_change)
+
+    async def create_appointment(self, appointment: Appointment) -> None:
+        try:
+            async with self._engine.session() as session:
+                session.add(appointment)
+                await session.flush()
+                await self._notify(session, appointment.appointment_id, [appointment.slot_id])
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            logger.error(f"Failed to create Appointment {repr(appointment)}. Error: {e}")
+            raise
+
+        except Exception as e:
+            logger.error(f"Failed to create Appointment {repr(appointment)}. Error: {e}")
+            raise
+
+        self._track(appointment.slot_id, None, appointment.status)
+
+    async def book_slot(self, appointment: Appointment, holder_tg_id: Optional[int] = None) -> None:
+        """Записать на appointment.slot_id, заблокировав слот, см. AppointmentService.book_slot."""
+        try:
+            async with self._engine.session() as session:
+                await self._book(session, appointment, holder_tg_id)
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            raise
+
+        self._track(appointment.slot_id, None, appointment.status)
+
+    async def book_occurrence(self, appointment: Appointment, recurrence_id: int, start_time: datetime) -> None:
+        """Записать на вхождение правила, см. AppointmentService.book_occurrence."""
+        try:
+            async with self._engine.session() as session:
+                slot_id = (await session.scalars(materialize_occurrence_query(recurrence_id, start_time))).one_or_none()
+                if slot_id is None:
+                    slot = (await session.scalars(occurrence_slot_query(recurrence_id, start_time))).one_or_none()
+                    slot_id = _occurrence_slot_id(recurrence_id, start_time, slot)
+                appointment.slot_id = slot_id
+                await self._book(session, appointment)
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            raise
+
+        self._track(appointment.slot_id, None, appointment.status)
+
+    async def _book(self, session: AsyncSession, appointment: Appointment, holder_tg_id: Optional[int] = None) -> None:
+        if (await session.scalars(lock_slot_query(appointment.slot_id))).one_or_none() is None:
+            raise ValueError(f"Slot with slot_id = {appointment.slot_id} does not exists")
+        if _is_active(appointment.status):
+            taken = (await session.execute(slot_taken_query(appointment.slot_id, holder_tg_id=holder_tg_id))).one()
+            check_slot_free(appointment.slot_id, taken)
+        if holder_tg_id is not None:
+            await session.execute(_release_hold_query(appointment.slot_id, holder_tg_id))
+
+        session.add(appointment)
+        await session.flush()
+        await self._notify(session, appointment.appointment_id, [appointment.slot_id])
+
+    async def book_first_free_slot(self, appointment: Appointment, range_from: datetime, range_to: datetime) -> bool:
+        """Записать на первый свободный слот или вхождение диапазона, см. AppointmentService.book_first_free_slot."""
+        try:
+            async with self._engine.session() as session:
+                skipped: list[int] = []
+                while True:
+                    slot = (await session.execute(_lock_free_slot_query(range_from, range_to, skipped))).first()
+                    stmt = first_occurrence_query(range_from, range_to if slot is None else slot.start_time)
+                    occurrence = (await session.execute(stmt)).first()
+                    if occurrence is not None:
+                        slot_id = (await session.scalars(materialize_occurrence_query(*occurrence))).one_or_none()
+                        if slot_id is not None:
+                            break
+                        continue
+                    if slot is None:
+                        return False
+                    if not any((await session.execute(slot_taken_query(slot.slot_id))).one()):
+                        slot_id = slot.slot_id
+                        break
+                    skipped.append(slot.slot_id)
+
+                appointment.slot_id = slot_id
+                session.add(appointment)
+                await session.flush()
+                await self._notify(session, appointment.appointment_id, [slot_id])
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(appointment.slot_id) from e
+            raise
+
+        self._track(appointment.slot_id, None, appointment.status)
+        return True
+
+    async def get_appointment_by_id(self, appointment_id: int) -> Optional[Appointment]:
+        async with self._engine.read_session() as session:
+            stmt = select(Appointment).where(Appointment.appointment_id == appointment_id)
+            return (await session.scalars(stmt)).one_or_none()
+
+    async def get_slot_appointment(self, slot_id: int) -> Optional[Appointment]:
+        async with self._engine.read_session() as session:
+            return (await session.scalars(_slot_appointment_query(slot_id))).one_or_none()
+
+    async def iter_appointments(self, range_from: Optional[datetime] = None, range_to: Optional[datetime] = None,
+                                chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[AppointmentView]:
+        """Записи порциями через серверный курсор, см. AppointmentService.iter_appointments."""
+        async with self._engine.read_session() as session:
+            result = await session.stream(_stream_appointments_query(range_from, range_to, chunk_size))
+            async for partition in result.partitions():
+                for row in partition:
+                    yield AppointmentView(*row)
+
+    async def update_appointment(self, appointment: Appointment) -> None:
+        async with self._engine.session() as session:
+            await session.merge(appointment)
+            await self._notify(session, appointment.appointment_id, [appointment.slot_id])
+
+    async def reschedule_appointment(self, appointment_id: int, new_slot: Slot,
+                                     holder_tg_id: Optional[int] = None) -> None:
+        """Перенести запись на new_slot, заблокировав запись и слот, см. AppointmentService.reschedule_appointment."""
+        try:
+            async with self._engine.session() as session:
+                stmt = _lock_appointment_query(appointment_id)
+                appointment: Optional[Appointment] = (await session.scalars(stmt)).one_or_none()
+
+                if not appointment:
+                    raise ValueError(f"Appointment with appointment_id = {appointment_id} does not exists")
+                if (await session.scalars(lock_slot_query(new_slot.slot_id))).one_or_none() is None:
+                    raise ValueError(f"Slot with slot_id = {new_slot.slot_id} does not exists")
+                if _is_active(appointment.status):
+                    stmt = slot_taken_query(new_slot.slot_id, appointment_id, holder_tg_id)
+                    taken = (await session.execute(stmt)).one()
+                    check_slot_free(new_slot.slot_id, taken)
+                if holder_tg_id is not None:
+                    await session.execute(_release_hold_query(new_slot.slot_id, holder_tg_id))
+
+                old_slot_id = appointment.slot_id
+                appointment.slot_id = new_slot.slot_id
+                await self._notify(session, appointment_id, [old_slot_id, new_slot.slot_id])
+
+        except IntegrityError as e:
+            if _is_unique_violation(e):
+                raise SlotBookedError(new_slot.slot_id) from e
+            raise
+
+        self._track(old_slot_id, appointment.status, None)
+        self._track(new_slot.slot_id, None, appointment.status)
+
+    async def cancel_appointment(self, appointment_id: int) -> Optional[WaitlistPromotion]:
+        """Отменить запись и отдать слот первому из листа ожидания, см. AppointmentService.cancel_appointment."""
+        async with self._engine.session() as session:
+            stmt = _lock_appointment_query(appointment_id)
+            appointment: Optional[Appointment] = (await session.scalars(stmt)).one_or_none()
+
+            if appointment is None:
+                raise RuntimeError(f'Appointment with appointment_id = {appointment_id} does not found')
+
+            old_status = appointment.status
+            appointment.status = AppointmentStatus.CANCELLED
+            promoted: Optional[Appointment] = None
+            if _is_active(old_status) and appointment.slot_id is not None:
+                await session.execute(lock_slot_query(appointment.slot_id))
+                await session.flush()
+                client_id = (await session.scalars(_dequeue_query(appointment.slot_id))).first()
+                if client_id is not None:
+                    promoted = Appointment(slot_id=appointment.slot_id, client_id=client_id,
+                                           status=AppointmentStatus.PENDING)
+                    session.add(promoted)
+                    await session.flush()
+
+            await self._notify(session, appointment_id, [appointment.slot_id])
+            promotion = None
+            if promoted is not None:
+                await self._notify(session, promoted.appointment_id, [promoted.slot_id])
+                row = (await session.execute(_promotion_query(promoted.appointment_id))).one()
+                promotion = WaitlistPromotion(*row)
+
+        self._track(appointment.slot_id, old_status, AppointmentStatus.CANCELLED)
+        if promoted is not None:
+            logger.info(f'Slot {promoted.slot_id} passed to client {promoted.client_id} from the waitlist')
+            self._track(promoted.slot_id, None, promoted.status)
+            if self._on_promotion is not None:
+                try:
+                    await self._on_promotion(promotion)
+                except Exception as e:
+                    logger.error(f'Failed to notify client {promotion.client_id} about slot {promotion.slot_id}: {e}')
+        return promotion
+
+    async def confirm_appointment(self, appointment_id: int) -> None:
+        await self._update_appointment_status(appointment_id, AppointmentStatus.CONFIRMED)
+
+    async def complete_appointment(self, appointment_id: int) -> None:
+        await self._update_appointment_status(appointment_id, AppointmentStatus.COMPLETED)
+
+    async def _update_appointment_status(self, appointment_id: int, new_status: AppointmentStatus) -> None:
+        async with self._engine.session() as session:
+            stmt = select(Appointment).where(Appointment.appointment_id == appointment_id)
+            appointment: Optional[Appointment] = (await session.scalars(stmt)).one_or_none()
+
+            if appointment is None:
+                raise RuntimeError(f'Appointment with appointment_id = {appointment_id} does not found')
+
+            old_status = appointment.status
+            appointment.status = new_status
+            await self._notify(session, appointment_id, [appointment.slot_id])
+
+        self._track(appointment.slot_id, old_status, new_status)
+
+    async def _notify(self, session: AsyncSession, appointment_id: int, slot_ids: list[Optional[int]]) -> None:
+        rows = (await session.execute(_notify_query(self._engine.notifications, appointment_id, slot_ids))).all()
+        forget_after_commit(session.sync_session, self._day_cache, _to_events(appointment_id, rows))
+
+    def _track(self, slot_id: Optional[int], old_status: Optional[AppointmentStatus],
+               new_status: Optional[AppointmentStatus]) -> None:
+        if self._availability is None or slot_id is None or _is_active(old_status) == _is_active(new_status):
+            return
+        if _is_active(new_status):
+            self._availability.book(slot_id)
+        else:
+            self._availability.release(slot_id)
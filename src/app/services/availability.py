@@ -0,0 +1,224 @@
+from datetime import date, datetime, time, timedelta
+from typing import Iterator, Optional
+
+from src.app.models import Slot
+from src.infrastructure.postgres.notifications import ALL, APPOINTMENT, SLOT, ChangeEvent
+
+MINUTES_PER_DAY = 24 * 60
+FULL_DAY = (1 << MINUTES_PER_DAY) - 1
+
+
+def _ceil_minute(moment: datetime) -> int:
+    minute = moment.hour * 60 + moment.minute
+    return minute + 1 if moment.second or moment.microsecond else minute
+
+
+def _day_masks(start_time: datetime, end_time: datetime) -> Iterator[tuple[date, int]]:
+    """Маски минут полуинтервала [start_time, end_time) по дням. Неполные минуты считаются целиком."""
+    day = start_time.date()
+    while datetime.combine(day, time.min) < end_time:
+        first = start_time.hour * 60 + start_time.minute if day == start_time.date() else 0
+        last = _ceil_minute(end_time) if day == end_time.date() else MINUTES_PER_DAY
+        if last > first:
+            yield day, ((1 << (last - first)) - 1) << first
+        day += timedelta(days=1)
+
+
+def _first_run(bits: int, length: int) -> Optional[int]:
+    """
+    Номер младшего бита, с которого идут length единиц подряд, или None.
+
+    После шага x &= x >> step бит i остаётся, только если единицы идут с i по
+    i + run + step - 1, поэтому длина проверенного отрезка растёт удвоением:
+    O(log length) операций над всей маской дня.
+    """
+    if length <= 0:
+        return 0
+    run = 1
+    while run < length:
+        step = min(run, length - run)
+        bits &= bits >> step
+        run += step
+    if not bits:
+        return None
+    return (bits & -bits).bit_length() - 1
+
+
+class AvailabilityIndex:
+    """
+    Занятость по минутам в памяти: на каждый день маска из 1440 бит (int),
+    бит i - минута i от полуночи.
+
+    occupied - минуты, покрытые слотами, booked - покрытые слотами с
+    неотменённой записью. Проверки интервалов, поиск свободного отрезка и
+    проверка пачки кандидатов идут битовыми операциями над маской целого дня
+    без запросов в БД. Индекс знает только то, что в него загрузили
+    (SlotService.build_availability_index) и что сервисы сообщили после записи.
+
+    Индекс - единственная структура, которой бот проверяет пачки новых слотов
+    (validate); точная до секунды альтернатива с тем же validate - SlotIntervalTree.
+
+    Долгоживущий индекс процесса подписывается на уведомления движка (on_change):
+    дни, изменённые любым процессом, сбрасываются и дозагружаются перед
+    использованием (SlotService.refresh_availability_index).
+
+    Usage:
+        availability = AvailabilityIndex()
+        engine.notifications.subscribe(availability.on_change)
+        slot_service = AsyncSlotService(engine, availability=availability)
+        ...
+        await slot_service.refresh_availability_index(availability, first_day, last_day)
+        accepted = availability.validate(candidates)
+    """
+
+    def __init__(self):
+        self._occupied: dict[date, int] = {}
+        self._booked: dict[date, int] = {}
+        self._slots: dict[int, tuple[datetime, datetime]] = {}
+        self._bookings: dict[int, int] = {}
+        # Слоты по дню начала: их заменяет load_day
+        self._day_slots: dict[date, set[int]] = {}
+        # Дни, загруженные load_day и с тех пор не сброшенные on_change
+        self._loaded: set[date] = set()
+        # Номер "поколения" дня, как в SlotDayCache: меняется при каждом сбросе
+        self._versions: dict[date, int] = {}
+        self._epoch = 0
+
+    def __len__(self) -> int:
+        return len(self._slots)
+
+    def add_slot(self, slot: Slot, bookings: int = 0) -> None:
+        """Учесть сохранённый слот и число неотменённых записей на него."""
+        self.remove_slot(slot.slot_id)
+        self._slots[slot.slot_id] = (slot.start_time, slot.end_time)
+        self._day_slots.setdefault(slot.start_time.date(), set()).add(slot.slot_id)
+        self._set(self._occupied, slot.start_time, slot.end_time, True)
+        self._bookings[slot.slot_id] = 0
+        for _ in range(bookings):
+            self.book(slot.slot_id)
+
+    def remove_slot(self, slot_id: int) -> None:
+        interval = self._slots.pop(slot_id, None)
+        if interval is None:
+            return
+        day_slots = self._day_slots[interval[0].date()]
+        day_slots.discard(slot_id)
+        if not day_slots:
+            del self._day_slots[interval[0].date()]
+        self._set(self._occupied, *interval, False)
+        self._set(self._booked, *interval, False)
+        self._bookings.pop(slot_id, None)
+
+    def book(self, slot_id: int) -> None:
+        """На слот появилась неотменённая запись."""
+        if slot_id not in self._slots:
+            return
+        self._bookings[slot_id] += 1
+        if self._bookings[slot_id] == 1:
+            self._set(self._booked, *self._slots[slot_id], True)
+
+    def release(self, slot_id: int) -> None:
+        """Запись на слот отменена или перенесена."""
+        if not self._bookings.get(slot_id):
+            return
+        self._bookings[slot_id] -= 1
+        if self._bookings[slot_id] == 0:
+            self._set(self._booked, *self._slots[slot_id], False)
+
+    def missing_days(self, range_from: date, range_to: date) -> dict[date, tuple[int, int]]:
+        """
+        Дни из [range_from, range_to), которые не загружены или сброшены, с их
+        версиями: версия передаётся в load_day вместе с загруженными слотами.
+        """
+        missing = {}
+        day = range_from
+        while day < range_to:
+            if day not in self._loaded:
+                missing[day] = self._version(day)
+            day += timedelta(days=1)
+        return missing
+
+    def load_day(self, day: date, version: tuple[int, int], slots: list[tuple[Slot, int]]) -> None:
+        """
+        Заменить слоты, начинающиеся в day, слотами из БД, пересекающими day, с числом
+        неотменённых записей. Если день сбросили, пока он грузился, данные применяются,
+        но день остаётся в missing_days: прочитанное могло устареть.
+        """
+        for slot_id in list(self._day_slots.get(day, ())):
+            self.remove_slot(slot_id)
+        for slot, bookings in slots:
+            self.add_slot(slot, bookings)
+        if self._version(day) == version:
+            self._loaded.add(day)
+
+    def on_change(self, event: ChangeEvent) -> None:
+        """
+        Подписчик ChangeNotifier. Изменение слота или записи сбрасывает его день,
+        событие без дня - все дни. Правила повторения индекс не учитывает.
+        """
+        if event.entity in (SLOT, APPOINTMENT) and event.day is not None:
+            self._loaded.discard(event.day)
+            self._versions[event.day] = self._versions.get(event.day, 0) + 1
+        elif event.entity in (SLOT, APPOINTMENT, ALL):
+            self._loaded.clear()
+            self._versions.clear()
+            self._epoch += 1
+
+    def is_free(self, start_time: datetime, end_time: datetime) -> bool:
+        """Интервал не пересекается ни с одним слотом."""
+        return all(not self._occupied.get(day, 0) & mask for day, mask in _day_masks(start_time, end_time))
+
+    def is_booked(self, start_time: datetime, end_time: datetime) -> bool:
+        """В интервал попадает хотя бы одна минута слота с записью."""
+        return any(self._booked.get(day, 0) & mask for day, mask in _day_masks(start_time, end_time))
+
+    def find_free_run(self, day: date, minutes: int, not_before: time = time.min) -> Optional[datetime]:
+        """Начало первого отрезка дня без слотов длиной minutes, например для нового слота."""
+        free = ~self._occupied.get(day, 0) & FULL_DAY
+        return self._first_run_start(day, free, minutes, not_before)
+
+    def find_bookable_run(self, day: date, minutes: int, not_before: time = time.min) -> Optional[datetime]:
+        """Начало первого отрезка дня длиной minutes, покрытого свободными слотами."""
+        free = self._occupied.get(day, 0) & ~self._booked.get(day, 0)
+        return self._first_run_start(day, free, minutes, not_before)
+
+    def validate(self, slots: list[Slot]) -> list[bool]:
+        """
+        Для каждого слота: можно ли его добавить.
+
+        Слот нельзя добавить, если он пересекается с уже учтёнными слотами или
+        с предыдущими допустимыми слотами списка - как в SlotService.add_slots.
+        Индекс не меняется: сохранённые слоты в него вносят сервисы (add_slot).
+        """
+        pending: dict[date, int] = {}
+        result = []
+        for slot in slots:
+            masks = list(_day_masks(slot.start_time, slot.end_time))
+            accepted = all(not pending.get(day, self._occupied.get(day, 0)) & mask for day, mask in masks)
+            if accepted:
+                for day, mask in masks:
+                    pending[day] = pending.get(day, self._occupied.get(day, 0)) | mask
+            result.append(accepted)
+        return result
+
+    def _version(self, day: date) -> tuple[int, int]:
+        return self._epoch, self._versions.get(day, 0)
+
+    @staticmethod
+    def _first_run_start(day: date, free: int, minutes: int, not_before: time) -> Optional[datetime]:
+        free &= ~((1 << (not_before.hour * 60 + not_before.minute)) - 1)
+        first = _first_run(free, minutes)
+        if first is None:
+            return None
+        return datetime.combine(day, time.min) + timedelta(minutes=first)
+
+    @staticmethod
+    def _set(masks: dict[date, int], start_time: datetime, end_time: datetime, value: bool) -> None:
+        # Слоты не пересекаются (ex_slot_no_overlap), поэтому снятие битов не задевает соседей
+        for day, mask in _day_masks(start_time, end_time):
+            bits = masks.get(day, 0)
+            bits = bits | mask if value else bits & ~mask
+            if bits:
+                masks[day] = bits
+            else:
+                masks.pop(day, None)
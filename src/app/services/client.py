@@ -1,23 +1,33 @@
 import logging
 from typing import Optional
-from sqlalchemy import select
+from sqlalchemy import select, Select
 
-from src.app.models import Client, Appointment
+from src.app.models import Client, Appointment, AppointmentView, Slot
+from src.app.services.appointment import appointment_views_query
+from src.app.services.role import role_cache
 from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.notifications import CLIENT, ChangeEvent
 
 logger = logging.getLogger(__name__)
 
 
+def _appointment_views_query(client_id: int) -> Select:
+    """Записи клиента со временем слота, начиная с поздних."""
+    return appointment_views_query() \
+        .where(Appointment.client_id == client_id) \
+        .order_by(Slot.start_time.desc().nulls_last(), Appointment.appointment_id.desc())
+
+
 class ClientService:
     def __init__(self, engine: DatabaseEngine):
         self._engine = engine
 
     def add_client(self, client: Client):
-        if client.is_admin():
-            raise RuntimeError(f"Can't create Client with non client role")
         try:
             with self._engine.session() as session:
                 session.add(client)
+                session.execute(self._engine.notifications.query([ChangeEvent(CLIENT, client.tg_client_id)]))
                 session.commit()
         except Exception as e:
             if hasattr(locals().get('session'), 'rollback'):
@@ -25,8 +35,10 @@ class ClientService:
             logger.error(f"Failed to add Client {repr(client)}. Error: {e}")
             raise
 
+        role_cache.invalidate(client.tg_client_id)
+
     def get_client_by_id(self, client_id: int) -> Optional[Client]:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(Client).where(Client.client_id == client_id)
             client: Optional[Client] = session.scalars(stmt).one_or_none()
 
@@ -35,13 +47,60 @@ class ClientService:
         return client
 
     def get_client_by_tg_id_if_exists(self, tg_client_id: int) -> Optional[Client]:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(Client).where(Client.tg_client_id == tg_client_id)
             return session.scalars(stmt).one_or_none()
 
     def get_client_appointments(self, client_id: int) -> Optional[list[Appointment]]:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(Appointment).where(
                 Appointment.client_id == client_id
             ).order_by(Appointment.created_at)
             return list(session.scalars(stmt).all())
+
+    def get_client_appointment_views(self, client_id: int) -> list[AppointmentView]:
+        """Записи клиента для списка, начиная с поздних, без загрузки ORM-объектов."""
+        with self._engine.read_session() as session:
+            return [AppointmentView(*row) for row in session.execute(_appointment_views_query(client_id))]
+
+
+class AsyncClientService:
+    def __init__(self, engine: AsyncDatabaseEngine):
+        self._engine = engine
+
+    async def add_client(self, client: Client):
+        try:
+            async with self._engine.session() as session:
+                session.add(client)
+                await session.execute(self._engine.notifications.query([ChangeEvent(CLIENT, client.tg_client_id)]))
+        except Exception as e:
+            logger.error(f"Failed to add Client {repr(client)}. Error: {e}")
+            raise
+
+        role_cache.invalidate(client.tg_client_id)
+
+    async def get_client_by_id(self, client_id: int) -> Optional[Client]:
+        async with self._engine.read_session() as session:
+            stmt = select(Client).where(Client.client_id == client_id)
+            client: Optional[Client] = (await session.scalars(stmt)).one_or_none()
+
+            if client is None:
+                raise ValueError(f"Client with id {client_id} not found")
+        return client
+
+    async def get_client_by_tg_id_if_exists(self, tg_client_id: int) -> Optional[Client]:
+        async with self._engine.read_session() as session:
+            stmt = select(Client).where(Client.tg_client_id == tg_client_id)
+            return (await session.scalars(stmt)).one_or_none()
+
+    async def get_client_appointments(self, client_id: int) -> Optional[list[Appointment]]:
+        async with self._engine.read_session() as session:
+            stmt = select(Appointment).where(
+                Appointment.client_id == client_id
+            ).order_by(Appointment.created_at)
+            return list((await session.scalars(stmt)).all())
+
+    async def get_client_appointment_views(self, client_id: int) -> list[AppointmentView]:
+        """Записи клиента для списка, см. ClientService.get_client_appointment_views."""
+        async with self._engine.read_session() as session:
+            return [AppointmentView(*row) for row in await session.execute(_appointment_views_query(client_id))]
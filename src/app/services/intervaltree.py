@@ -0,0 +1,146 @@
+import random
+from datetime import datetime, timedelta
+from typing import Iterable, Iterator, Optional
+
+from src.app.models import Slot
+
+EPOCH = datetime(1970, 1, 1)
+ONE_SECOND = timedelta(seconds=1)
+
+
+def _seconds(moment: datetime) -> int:
+    return (moment - EPOCH) // ONE_SECOND
+
+
+class _Node:
+    # Без __dict__ узел вместе с числами занимает ~150 байт: год слотов (~10 тыс.) - пара мегабайт
+    __slots__ = ('start', 'end', 'max_end', 'priority', 'slot_id', 'left', 'right')
+
+    def __init__(self, start: int, end: int, slot_id: Optional[int]):
+        self.start = start
+        self.end = end
+        self.max_end = end
+        self.priority = random.random()
+        self.slot_id = slot_id
+        self.left: Optional[_Node] = None
+        self.right: Optional[_Node] = None
+
+    def update(self) -> None:
+        self.max_end = max(
+            self.end,
+            self.left.max_end if self.left else self.end,
+            self.right.max_end if self.right else self.end
+        )
+
+
+def _rotate_right(node: _Node) -> _Node:
+    top = node.left
+    node.left, top.right = top.right, node
+    node.update()
+    top.update()
+    return top
+
+
+def _rotate_left(node: _Node) -> _Node:
+    top = node.right
+    node.right, top.left = top.left, node
+    node.update()
+    top.update()
+    return top
+
+
+def _insert(node: Optional[_Node], new: _Node) -> _Node:
+    if node is None:
+        return new
+    if (new.start, new.end) < (node.start, node.end):
+        node.left = _insert(node.left, new)
+        if node.left.priority > node.priority:
+            node = _rotate_right(node)
+    else:
+        node.right = _insert(node.right, new)
+        if node.right.priority > node.priority:
+            node = _rotate_left(node)
+    node.update()
+    return node
+
+
+class SlotIntervalTree:
+    """
+    Дерево интервалов слотов (декартово дерево по началу, в узле - максимум
+    концов поддерева) для проверки пачки кандидатов без запросов в БД.
+
+    Поиск пересечения и вставка - O(log n) в среднем. Время хранится в
+    секундах, интервалы полуоткрытые [start_time, end_time), как у
+    ограничения ex_slot_no_overlap.
+
+    Пачки слотов в боте проверяет общий AvailabilityIndex процесса; дерево -
+    точная до секунды замена для проверки без долгоживущего индекса, validate
+    у них одинаковый.
+
+    Usage:
+        tree = slot_service.build_interval_tree(range_from, range_to)
+        accepted = tree.validate(candidates)
+    """
+
+    def __init__(self, slots: Iterable[Slot] = ()):
+        self._root: Optional[_Node] = None
+        self._size = 0
+        for slot in slots:
+            self.add(slot)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __iter__(self) -> Iterator[tuple[datetime, datetime]]:
+        """Интервалы по возрастанию начала."""
+        stack: list[_Node] = []
+        node = self._root
+        while stack or node:
+            while node:
+                stack.append(node)
+                node = node.left
+            node = stack.pop()
+            yield EPOCH + node.start * ONE_SECOND, EPOCH + node.end * ONE_SECOND
+            node = node.right
+
+    def add(self, slot: Slot) -> None:
+        self._root = _insert(self._root, _Node(_seconds(slot.start_time), _seconds(slot.end_time), slot.slot_id))
+        self._size += 1
+
+    def overlaps(self, start_time: datetime, end_time: datetime) -> bool:
+        return self._find_overlap(_seconds(start_time), _seconds(end_time)) is not None
+
+    def find_overlap(self, start_time: datetime, end_time: datetime) -> Optional[int]:
+        """slot_id какого-нибудь пересекающегося слота (None, если пересечений нет или слот не сохранён)."""
+        node = self._find_overlap(_seconds(start_time), _seconds(end_time))
+        return node.slot_id if node else None
+
+    def validate(self, slots: list[Slot]) -> list[bool]:
+        """
+        Для каждого слота: можно ли его добавить, как в AvailabilityIndex.validate -
+        без пересечений с деревом и с предыдущими допустимыми слотами списка.
+        Дерево не меняется: сохранённые слоты добавляет вызывающий (add).
+        """
+        pending = SlotIntervalTree()
+        result = []
+        for slot in slots:
+            accepted = not self.overlaps(slot.start_time, slot.end_time) \
+                and not pending.overlaps(slot.start_time, slot.end_time)
+            if accepted:
+                pending.add(slot)
+            result.append(accepted)
+        return result
+
+    def _find_overlap(self, start: int, end: int) -> Optional[_Node]:
+        node = self._root
+        while node:
+            if node.start < end and start < node.end:
+                return node
+            # Если в левом поддереве есть интервал, кончающийся после start, но
+            # пересечения там нет, то он начинается не раньше end - как и всё
+            # правое поддерево, так что искать дальше надо только слева.
+            if node.left and node.left.max_end > start:
+                node = node.left
+            else:
+                node = node.right
+        return None
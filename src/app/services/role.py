@@ -1,28 +1,133 @@
 import logging
-from sqlalchemy import select
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
 
-from src.app.models import Role, User, Client
+from sqlalchemy import select, Row, Select
+
+from src.app.models import Caller, Role, User, Client
 from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.notifications import ALL, CLIENT, USER, ChangeEvent
 
 logger = logging.getLogger(__name__)
 
+ROLE_CACHE_SIZE = 10_000
+ROLE_CACHE_TTL_S = 300.0
+
+
+class RoleCache:
+    """
+    Роли по tg id (вместе с id строк user/client, см. Caller): LRU не больше
+    max_size записей, каждая живёт ttl_s секунд.
+
+    Роль читается почти на каждом апдейте и почти никогда не меняется.
+    UserService.add_user и ClientService.add_client сбрасывают запись своего
+    tg id, записи других процессов приходят через on_change (LISTEN/NOTIFY),
+    TTL ограничивает устаревание, если роль поменяли в обход сервисов.
+    """
+
+    def __init__(self, max_size: int = ROLE_CACHE_SIZE, ttl_s: float = ROLE_CACHE_TTL_S):
+        self._max_size = max_size
+        self._ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[int, tuple[Caller, float]] = OrderedDict()
+
+    def get(self, tg_id: int) -> Optional[Caller]:
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(tg_id)
+            if entry is None:
+                return None
+            caller, expires_at = entry
+            if expires_at <= now:
+                del self._entries[tg_id]
+                return None
+            self._entries.move_to_end(tg_id)
+            return caller
+
+    def put(self, tg_id: int, caller: Caller) -> None:
+        with self._lock:
+            self._entries[tg_id] = (caller, time.monotonic() + self._ttl_s)
+            self._entries.move_to_end(tg_id)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, tg_id: Optional[int]) -> None:
+        with self._lock:
+            self._entries.pop(tg_id, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def on_change(self, event: ChangeEvent) -> None:
+        """Подписчик ChangeNotifier: user и client приходят с tg id."""
+        if event.entity in (USER, CLIENT):
+            self.invalidate(event.entity_id)
+        elif event.entity == ALL:
+            self.clear()
+
+
+# Общий для всех экземпляров RoleService/AsyncRoleService процесса
+role_cache = RoleCache()
+
+
+def _caller_query(tg_id: int) -> Select:
+    """id строк user и client одним запросом: два подзапроса по уникальным индексам tg id."""
+    return select(
+        select(User.user_id).where(User.tg_user_id == tg_id).scalar_subquery().label('user_id'),
+        select(Client.client_id).where(Client.tg_client_id == tg_id).scalar_subquery().label('client_id')
+    )
+
+
+def _to_caller(row: Row) -> Caller:
+    if row.user_id is not None:
+        role = Role.ADMIN
+    elif row.client_id is not None:
+        role = Role.CLIENT
+    else:
+        role = Role.GUEST
+    return Caller(role, row.user_id, row.client_id)
+
 
 class RoleService:
-    def __init__(self, engine: DatabaseEngine):
+    def __init__(self, engine: DatabaseEngine, cache: RoleCache = role_cache):
         self._engine = engine
+        self._cache = cache
 
     def get_user_role_by_tg_id(self, tg_id: int) -> Role:
-        with self._engine.session() as session:
-            stmt = select(User).where(User.tg_user_id == tg_id)
-            user = session.scalars(stmt).one_or_none()
+        return self.get_caller_by_tg_id(tg_id).role
+
+    def get_caller_by_tg_id(self, tg_id: int) -> Caller:
+        """Роль и id строк user/client одним запросом, из того же кеша, что и роль."""
+        caller = self._cache.get(tg_id)
+        if caller is not None:
+            return caller
+
+        with self._engine.read_session() as session:
+            caller = _to_caller(session.execute(_caller_query(tg_id)).one())
+
+        self._cache.put(tg_id, caller)
+        return caller
+
+
+class AsyncRoleService:
+    def __init__(self, engine: AsyncDatabaseEngine, cache: RoleCache = role_cache):
+        self._engine = engine
+        self._cache = cache
 
-            if user:
-                return Role.ADMIN
+    async def get_user_role_by_tg_id(self, tg_id: int) -> Role:
+        return (await self.get_caller_by_tg_id(tg_id)).role
 
-            stmt = select(Client).where(Client.tg_client_id == tg_id)
-            client = session.scalars(stmt).one_or_none()
+    async def get_caller_by_tg_id(self, tg_id: int) -> Caller:
+        caller = self._cache.get(tg_id)
+        if caller is not None:
+            return caller
 
-            if client:
-                return Role.CLIENT
+        async with self._engine.read_session() as session:
+            caller = _to_caller((await session.execute(_caller_query(tg_id))).one())
 
-            return Role.GUEST
+        self._cache.put(tg_id, caller)
+        return caller
@@ -0,0 +1,125 @@
+import logging
+from typing import Optional
+from datetime import date, timedelta
+
+from sqlalchemy import select, update, or_, func, literal_column, true, Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.app.models import Schedule, Slot
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.notifications import slot_events
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_HORIZON_DAYS = 30
+
+ACTIVE = 1
+
+
+def _materialize_query(today: date, horizon_days: int) -> Insert:
+    """
+    Один запрос, создающий недостающие слоты по расписанию на [today, today + horizon_days).
+
+    CTE due помечает строки расписания как обработанные (UPDATE ... RETURNING)
+    и заодно блокирует их, поэтому два одновременных запуска не обработают
+    одну строку дважды. Берутся только строки, по которым слоты ещё не
+    создавались или которые менялись после этого. Для каждой строки
+    generate_series нарезает рабочие часы на слоты, уже занятые интервалы
+    пропускает EXCLUDE-ограничение ex_slot_no_overlap - повторный запуск
+    ничего не создаёт.
+    """
+    pending = or_(Schedule.materialized_at.is_(None), Schedule.updated_at > Schedule.materialized_at)
+
+    due = update(Schedule) \
+        .where(
+            Schedule.is_active == ACTIVE,
+            Schedule.date >= today,
+            Schedule.date < today + timedelta(days=horizon_days),
+            pending
+        ) \
+        .values(materialized_at=func.now(), updated_at=Schedule.updated_at) \
+        .returning(Schedule.date, Schedule.start_time, Schedule.end_time, Schedule.slot_duration_in_minutes) \
+        .cte('due')
+
+    step = literal_column("INTERVAL '1 minute'") * due.c.slot_duration_in_minutes
+    series = func.generate_series(
+        due.c.date + due.c.start_time,
+        due.c.date + due.c.end_time - step,
+        step
+    ).table_valued('slot_start').render_derived().lateral('series')
+    slot_start = series.c.slot_start
+
+    rows = select(slot_start, slot_start + step, due.c.slot_duration_in_minutes) \
+        .select_from(due.join(series, true())) \
+        .order_by(slot_start)
+
+    return pg_insert(Slot) \
+        .from_select(['start_time', 'end_time', 'duration_in_minutes'], rows) \
+        .on_conflict_do_nothing() \
+        .returning(Slot.slot_id, Slot.start_time) \
+        .add_cte(due)
+
+
+class ScheduleService:
+    def __init__(self, engine: DatabaseEngine):
+        self._engine = engine
+
+    def add_schedule(self, schedule: Schedule) -> None:
+        try:
+            with self._engine.session() as session:
+                session.add(schedule)
+                session.commit()
+        except Exception as e:
+            if hasattr(locals().get('session'), 'rollback'):
+                session.rollback()
+            logger.error(f"Failed to create Schedule {repr(schedule)}. Error: {e}")
+            raise
+
+    def get_schedule_by_id(self, schedule_id: int) -> Optional[Schedule]:
+        with self._engine.read_session() as session:
+            stmt = select(Schedule).where(Schedule.schedule_id == schedule_id)
+            return session.scalars(stmt).one_or_none()
+
+    def materialize_slots(self, horizon_days: int = DEFAULT_HORIZON_DAYS) -> int:
+        """Создать недостающие слоты по активному расписанию на horizon_days вперёд. Возвращает число новых слотов."""
+        with self._engine.session() as session:
+            rows = session.execute(_materialize_query(date.today(), horizon_days)).all()
+            notify = self._engine.notifications.query(slot_events((row.slot_id, row.start_time.date()) for row in rows))
+            if notify is not None:
+                session.execute(notify)
+            session.commit()
+        created = len(rows)
+
+        logger.info(f'Materialized {created} slots for {horizon_days} days ahead')
+        return created
+
+
+class AsyncScheduleService:
+    def __init__(self, engine: AsyncDatabaseEngine):
+        self._engine = engine
+
+    async def add_schedule(self, schedule: Schedule) -> None:
+        try:
+            async with self._engine.session() as session:
+                session.add(schedule)
+        except Exception as e:
+            logger.error(f"Failed to create Schedule {repr(schedule)}. Error: {e}")
+            raise
+
+    async def get_schedule_by_id(self, schedule_id: int) -> Optional[Schedule]:
+        async with self._engine.read_session() as session:
+            stmt = select(Schedule).where(Schedule.schedule_id == schedule_id)
+            return (await session.scalars(stmt)).one_or_none()
+
+    async def materialize_slots(self, horizon_days: int = DEFAULT_HORIZON_DAYS) -> int:
+        """Создать недостающие слоты по расписанию, см. ScheduleService.materialize_slots."""
+        async with self._engine.session() as session:
+            rows = (await session.execute(_materialize_query(date.today(), horizon_days))).all()
+            notify = self._engine.notifications.query(slot_events((row.slot_id, row.start_time.date()) for row in rows))
+            if notify is not None:
+                await session.execute(notify)
+        created = len(rows)
+
+        logger.info(f'Materialized {created} slots for {horizon_days} days ahead')
+        return created
@@ -1,78 +1,1313 @@
 import logging
-from typing import Optional
-from datetime import date, datetime
+from typing import AsyncIterator, Iterator, Optional
+from datetime import date, datetime, time, timedelta
 
-from sqlalchemy import select, delete, or_
+from sqlalchemy import (
+    select, delete, and_, exists, func, cast, case, tuple_, true, false, values, column, literal, literal_column,
+    union_all, Select, Insert, Subquery, Time, Date, DateTime, Integer, Interval, ColumnElement, Row
+)
+from sqlalchemy.dialects.postgresql import TSRANGE, insert as pg_insert
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 
-from src.app.models import Slot, Appointment
+from src.app.models import (
+    Slot, SlotRecurrence, Appointment, AppointmentStatus, SlotFilter, SlotSort, SlotCursor, SlotPage, SlotBatchResult,
+    SlotStatus, SlotView, AgendaRow, FreeWindow, Client
+)
+from src.app.models.slotpage import VIRTUAL_SLOT_ID
+from src.app.services.availability import AvailabilityIndex
+from src.app.services.intervaltree import SlotIntervalTree
+from src.app.services.slotdaycache import SlotDayCache, forget_after_commit
 from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.notifications import RECURRENCE, ChangeEvent, slot_events
 
 logger = logging.getLogger(__name__)
 
+DEFAULT_PAGE_SIZE = 5
+
+# SQLSTATE нарушения EXCLUDE-ограничения ex_slot_no_overlap
+EXCLUSION_VIOLATION = '23P01'
+
+# Строк в одном INSERT: 4 параметра на строку, asyncpg допускает не больше 32767
+BULK_INSERT_CHUNK_SIZE = 1000
+
+# Строк в одной порции серверного курсора при потоковом чтении
+STREAM_CHUNK_SIZE = 1000
+
+# Дней правил, разворачиваемых одним запросом страницы вхождений
+OCCURRENCE_WINDOW_DAYS = 31
+
+# Больше вхождений total не считает: каждое посчитанное вхождение разворачивается
+OCCURRENCE_COUNT_LIMIT = 1000
+
+
+class SlotOverlapError(ValueError):
+    """Слот пересекается с уже существующими, conflicts - с какими именно."""
+
+    def __init__(self, slot: Slot, conflicts: list[Slot]):
+        self.slot = slot
+        self.conflicts = conflicts
+        super().__init__(f'Slot {slot!r} overlaps with {len(conflicts)} existing slot(s)')
+
+
+def _overlap_clause(slot: Slot) -> ColumnElement[bool]:
+    """
+    Пересечение с полуинтервалом [start_time, end_time) слота.
+
+    Выражение совпадает с выражением GiST-индекса ограничения ex_slot_no_overlap,
+    поэтому проверка идёт по индексу. Сам слот (если он уже сохранён) не считается.
+    """
+    existing = func.tsrange(Slot.start_time, Slot.end_time, type_=TSRANGE)
+    clause = existing.overlaps(func.tsrange(slot.start_time, slot.end_time, type_=TSRANGE))
+    if slot.slot_id is not None:
+        clause = and_(clause, Slot.slot_id != slot.slot_id)
+    return clause
+
+
+def _is_exclusion_violation(error: IntegrityError) -> bool:
+    return getattr(error.orig, 'pgcode', None) == EXCLUSION_VIOLATION
+
+
+def _bulk_insert_query(slots: list[Slot]) -> Insert:
+    """
+    Многострочный INSERT ... SELECT FROM (VALUES ...) ON CONFLICT DO NOTHING RETURNING.
+
+    Строки вставляются в порядке списка. Слот, пересекающийся с уже существующим
+    или с вставленным раньше в этом же запросе, пропускается EXCLUDE-ограничением
+    ex_slot_no_overlap - и не попадает в RETURNING.
+    """
+    candidate = values(
+        column('ord', Integer),
+        column('start_time', DateTime),
+        column('end_time', DateTime),
+        column('duration_in_minutes', Integer),
+        name='candidate'
+    ).data([
+        (ord_, slot.start_time, slot.end_time, slot.duration_in_minutes)
+        for ord_, slot in enumerate(slots)
+    ])
+    rows = select(candidate.c.start_time, candidate.c.end_time, candidate.c.duration_in_minutes) \
+        .order_by(candidate.c.ord)
+
+    return pg_insert(Slot) \
+        .from_select(['start_time', 'end_time', 'duration_in_minutes'], rows) \
+        .on_conflict_do_nothing() \
+        .returning(Slot.slot_id, Slot.start_time, Slot.end_time)
+
+
+def _clone_query(source_clause: ColumnElement[bool], source_anchor: ColumnElement[datetime],
+                 first_target: datetime, last_target: datetime, step: timedelta, time_offset: timedelta) -> Insert:
+    """
+    INSERT ... SELECT, копирующий слоты под source_clause на каждую дату из
+    generate_series(first_target, last_target, step).
+
+    Копия сохраняет положение слота относительно source_anchor (начала дня или
+    недели), сдвинутое на time_offset. Пересекающиеся копии пропускает
+    EXCLUDE-ограничение ex_slot_no_overlap.
+    """
+    target = func.generate_series(
+        literal(first_target, DateTime),
+        literal(last_target, DateTime),
+        literal(step, Interval)
+    ).table_valued('anchor').render_derived().lateral('target')
+    copy_start = target.c.anchor + (Slot.start_time - source_anchor) + literal(time_offset, Interval)
+
+    rows = select(copy_start, copy_start + (Slot.end_time - Slot.start_time), Slot.duration_in_minutes) \
+        .select_from(Slot.__table__.join(target, true())) \
+        .where(source_clause) \
+        .order_by(target.c.anchor, Slot.start_time)
+
+    return pg_insert(Slot) \
+        .from_select(['start_time', 'end_time', 'duration_in_minutes'], rows) \
+        .on_conflict_do_nothing() \
+        .returning(Slot.slot_id, Slot.start_time)
+
+
+def _day_start(day: date) -> datetime:
+    return datetime.combine(day, time.min)
+
+
+def _week_start(day: date) -> datetime:
+    return _day_start(day - timedelta(days=day.weekday()))
+
+
+def _clone_slot_query(slot_id: int, target_from: date, target_to: date, time_offset: timedelta) -> Insert:
+    return _clone_query(
+        Slot.slot_id == slot_id, func.date_trunc('day', Slot.start_time),
+        _day_start(target_from), _day_start(target_to), timedelta(days=1), time_offset
+    )
+
+
+def _clone_day_query(source_day: date, target_from: date, target_to: date, time_offset: timedelta) -> Insert:
+    source_start = _day_start(source_day)
+    return _clone_query(
+        and_(Slot.start_time >= source_start, Slot.start_time < source_start + timedelta(days=1)),
+        literal(source_start, DateTime),
+        _day_start(target_from), _day_start(target_to), timedelta(days=1), time_offset
+    )
+
+
+def _clone_week_query(source_day: date, target_from: date, target_to: date, time_offset: timedelta) -> Insert:
+    """Неделя (пн-вс), содержащая source_day, копируется на каждую неделю, начинающуюся в [target_from, target_to]."""
+    source_start = _week_start(source_day)
+    first_target = _week_start(target_from)
+    if first_target.date() < target_from:
+        first_target += timedelta(days=7)
+    return _clone_query(
+        and_(Slot.start_time >= source_start, Slot.start_time < source_start + timedelta(days=7)),
+        literal(source_start, DateTime),
+        first_target, _day_start(target_to), timedelta(days=7), time_offset
+    )
+
+
+def _row_events(rows: list[Row]) -> list[ChangeEvent]:
+    """События об изменении слотов по строкам RETURNING slot_id, start_time."""
+    return slot_events((row.slot_id, row.start_time.date()) for row in rows)
+
+
+def _chunks(slots: list[Slot]) -> list[list[Slot]]:
+    return [slots[i:i + BULK_INSERT_CHUNK_SIZE] for i in range(0, len(slots), BULK_INSERT_CHUNK_SIZE)]
+
+
+def _to_batch_result(slots: list[Slot], returned: list[Row]) -> SlotBatchResult:
+    """Сопоставить RETURNING с исходными слотами и проставить им slot_id."""
+    positions: dict[tuple[datetime, datetime], list[int]] = {}
+    for index, slot in enumerate(slots):
+        positions.setdefault((slot.start_time, slot.end_time), []).append(index)
+
+    inserted_indexes = set()
+    for row in returned:
+        index = positions[(row.start_time, row.end_time)].pop(0)
+        slots[index].slot_id = row.slot_id
+        inserted_indexes.add(index)
+
+    return SlotBatchResult(
+        inserted=[slot for index, slot in enumerate(slots) if index in inserted_indexes],
+        rejected=[slot for index, slot in enumerate(slots) if index not in inserted_indexes]
+    )
+
+
+def _is_booked_clause() -> ColumnElement[bool]:
+    return exists().where(
+        Appointment.slot_id == Slot.slot_id,
+        Appointment.status != AppointmentStatus.CANCELLED
+    )
+
+
+def _is_cancelled_clause() -> ColumnElement[bool]:
+    """Запись на слот была, но все записи отменены."""
+    return and_(
+        exists().where(
+            Appointment.slot_id == Slot.slot_id,
+            Appointment.status == AppointmentStatus.CANCELLED
+        ),
+        ~_is_booked_clause()
+    )
+
+
+def _slot_status_column() -> ColumnElement[str]:
+    """SlotStatus слота в SQL: оба EXISTS идут по ix_appointment_slot_id_status."""
+    return case(
+        (_is_booked_clause(), SlotStatus.BOOKED.value),
+        (_is_cancelled_clause(), SlotStatus.CANCELLED.value),
+        else_=SlotStatus.FREE.value
+    ).label('status')
+
+
+def _slot_views_query() -> Select:
+    """Только колонки, которые нужны SlotView - без загрузки ORM-объектов."""
+    return select(
+        Slot.slot_id,
+        Slot.start_time,
+        Slot.end_time,
+        Slot.duration_in_minutes,
+        Slot.recurrence_id,
+        _slot_status_column(),
+        Slot.created_at
+    )
+
+
+def _to_slot_view(row: Row) -> SlotView:
+    return SlotView(
+        row.slot_id, row.start_time, row.end_time, row.duration_in_minutes, row.recurrence_id,
+        SlotStatus(row.status), row.created_at
+    )
+
+
+def _slot_filter_clause(slot_filter: SlotFilter, now: datetime) -> ColumnElement[bool]:
+    if slot_filter == SlotFilter.ACTIVE:
+        return Slot.end_time > now
+    if slot_filter == SlotFilter.FUTURE:
+        return Slot.start_time > now
+    if slot_filter == SlotFilter.PAST:
+        return Slot.start_time <= now
+    if slot_filter == SlotFilter.CANCELLED:
+        return _is_cancelled_clause()
+    if slot_filter == SlotFilter.BOOKED:
+        return _is_booked_clause()
+    return true()
+
+
+def _slot_sort_keys(sort: SlotSort, cursor: Optional[SlotCursor] = None,
+                    start_time: ColumnElement[datetime] = Slot.start_time,
+                    slot_id: ColumnElement[int] = Slot.slot_id) -> tuple[list, list]:
+    """Колонки сортировки и соответствующие им значения курсора."""
+    keys = [start_time, slot_id]
+    values = [cursor.start_time, cursor.slot_id] if cursor else []
+    if sort.by_time_of_day:
+        keys.insert(0, cast(start_time, Time))
+        if cursor:
+            values.insert(0, cursor.start_time.time())
+    return keys, values
+
+
+def _keyset_page(stmt: Select, keys: list, values: list, sort: SlotSort, cursor: Optional[SlotCursor],
+                 limit: int) -> Select:
+    if cursor:
+        position = tuple_(*keys)
+        stmt = stmt.where(position < tuple(values) if sort.is_descending else position > tuple(values))
+
+    order_by = [key.desc() if sort.is_descending else key.asc() for key in keys]
+    return stmt.order_by(*order_by).limit(limit + 1)
+
+
+def _slots_page_query(slot_filter: SlotFilter, sort: SlotSort, cursor: Optional[SlotCursor],
+                      limit: int, now: datetime) -> Select:
+    """
+    Keyset-пагинация: страница после cursor в порядке sort.
+
+    Выбирается limit + 1 строка, лишняя строка означает, что есть следующая страница.
+    """
+    keys, values = _slot_sort_keys(sort, cursor)
+    stmt = _slot_views_query().where(_slot_filter_clause(slot_filter, now))
+    return _keyset_page(stmt, keys, values, sort, cursor, limit)
+
+
+def _slots_count_query(slot_filter: SlotFilter, now: datetime) -> Select:
+    return select(func.count()).select_from(Slot).where(_slot_filter_clause(slot_filter, now))
+
+
+def _slot_statuses_query(slot_ids: list[int]) -> Select:
+    """
+    Статусы записей по слотам одним GROUP BY по ix_appointment_slot_id_status.
+
+    Слотов без записей в результате нет - они свободны.
+    """
+    return select(
+        Appointment.slot_id,
+        func.bool_or(Appointment.status != AppointmentStatus.CANCELLED).label('is_booked')
+    ) \
+        .where(Appointment.slot_id.in_(slot_ids)) \
+        .group_by(Appointment.slot_id)
+
+
+def _to_statuses(slot_ids: list[int], rows: list[Row]) -> dict[int, SlotStatus]:
+    statuses = dict.fromkeys(slot_ids, SlotStatus.FREE)
+    for row in rows:
+        statuses[row.slot_id] = SlotStatus.BOOKED if row.is_booked else SlotStatus.CANCELLED
+    return statuses
+
+
+def _slots_between_query(range_from: datetime, range_to: datetime) -> Select:
+    """Слоты, пересекающие [range_from, range_to)."""
+    return select(Slot).where(Slot.start_time < range_to, Slot.end_time > range_from)
+
+
+def _availability_query(range_from: datetime, range_to: datetime) -> Select:
+    """Слоты, пересекающие [range_from, range_to), с числом неотменённых записей на каждый."""
+    bookings = select(func.count()) \
+        .where(Appointment.slot_id == Slot.slot_id, Appointment.status != AppointmentStatus.CANCELLED) \
+        .scalar_subquery()
+    return select(Slot, bookings.label('bookings')) \
+        .where(Slot.start_time < range_to, Slot.end_time > range_from)
+
+
+def _missing_days_range(missing: dict[date, tuple[int, int]]) -> tuple[datetime, datetime]:
+    """Одним запросом грузится промежуток от первого до последнего недостающего дня."""
+    return datetime.combine(min(missing), time.min), datetime.combine(max(missing) + timedelta(days=1), time.min)
+
+
+def _load_missing_days(index: AvailabilityIndex, missing: dict[date, tuple[int, int]], rows: list[Row]) -> None:
+    for day, version in missing.items():
+        day_from = datetime.combine(day, time.min)
+        day_to = day_from + timedelta(days=1)
+        index.load_day(day, version, [
+            (slot, bookings) for slot, bookings in rows if slot.start_time < day_to and slot.end_time > day_from
+        ])
+
+
+def _to_availability_index(rows: list[Row]) -> AvailabilityIndex:
+    index = AvailabilityIndex()
+    for slot, bookings in rows:
+        index.add_slot(slot, bookings)
+    return index
+
+
+def _stream_slots_query(range_from: Optional[datetime], range_to: Optional[datetime], chunk_size: int) -> Select:
+    """
+    Слоты, начинающиеся в [range_from, range_to), для чтения серверным курсором:
+    yield_per включает stream_results, в памяти держится не больше chunk_size строк.
+    """
+    stmt = _slot_views_query()
+    if range_from is not None:
+        stmt = stmt.where(Slot.start_time >= range_from)
+    if range_to is not None:
+        stmt = stmt.where(Slot.start_time < range_to)
+    return stmt.order_by(Slot.start_time, Slot.slot_id).execution_options(yield_per=chunk_size)
+
+
+def _agenda_query(range_from: datetime, range_to: datetime) -> Select:
+    """Сохранённые слоты из [range_from, range_to) с неотменённой записью и клиентом, если они есть."""
+    # Отдельный alias, чтобы EXISTS статуса не коррелировали с присоединённой записью
+    booking = aliased(Appointment)
+    return select(
+        Slot.slot_id,
+        Slot.start_time,
+        Slot.end_time,
+        _slot_status_column(),
+        booking.appointment_id,
+        Client.first_name,
+        Client.last_name,
+        booking.description
+    ) \
+        .select_from(Slot) \
+        .outerjoin(booking, and_(booking.slot_id == Slot.slot_id, booking.status != AppointmentStatus.CANCELLED)) \
+        .outerjoin(Client, Client.client_id == booking.client_id) \
+        .where(Slot.start_time >= range_from, Slot.start_time < range_to) \
+        .order_by(Slot.start_time, Slot.slot_id)
+
+
+def _to_agenda_row(row: Row) -> AgendaRow:
+    return AgendaRow(
+        row.slot_id, row.start_time, row.end_time, SlotStatus(row.status), row.appointment_id,
+        row.first_name, row.last_name, row.description
+    )
+
+
+def _to_page(rows: list[SlotView], limit: int, total: Optional[int]) -> SlotPage:
+    return SlotPage(slots=rows[:limit], has_next=len(rows) > limit, total=total)
+
+
+def _occurrences_query(range_from: Optional[datetime] = None, range_to: Optional[datetime] = None,
+                       recurrence_id: Optional[int] = None) -> Select:
+    """
+    Слоты, развёрнутые из правил slot_recurrence и начинающиеся в [range_from, range_to).
+
+    generate_series перебирает только дни правила внутри диапазона, поэтому
+    длинная серия стоит столько, сколько её попадает в запрошенное окно.
+    Вхождения, пересекающиеся со слотами из таблицы (в том числе уже
+    сохранёнными при записи), не возвращаются - реальный слот важнее правила.
+    """
+    rule = SlotRecurrence
+    step = literal_column("INTERVAL '1 minute'") * rule.slot_duration_in_minutes
+    first_day = rule.valid_from if range_from is None else func.greatest(rule.valid_from, cast(range_from, Date))
+    last_day = rule.valid_until if range_to is None else func.least(rule.valid_until, cast(range_to, Date))
+
+    days = func.generate_series(cast(first_day, DateTime), cast(last_day, DateTime), literal_column("INTERVAL '1 day'")) \
+        .table_valued('day').render_derived().lateral('days')
+    starts = func.generate_series(days.c.day + rule.start_time, days.c.day + rule.end_time - step, step) \
+        .table_valued('occurrence_start').render_derived().lateral('starts')
+    start_time = starts.c.occurrence_start
+    end_time = start_time + step
+
+    # Бит дня недели: isodow 1 - понедельник, ему соответствует бит 0
+    weekday_bit = literal(1).op('<<')(cast(func.extract('isodow', days.c.day), Integer) - 1)
+    occupied = exists().where(
+        func.tsrange(Slot.start_time, Slot.end_time, type_=TSRANGE)
+        .overlaps(func.tsrange(start_time, end_time, type_=TSRANGE))
+    )
+
+    stmt = select(
+        rule.recurrence_id,
+        start_time.label('start_time'),
+        end_time.label('end_time'),
+        rule.slot_duration_in_minutes.label('duration_in_minutes')
+    ) \
+        .select_from(rule.__table__.join(days, true()).join(starts, true())) \
+        .where(rule.weekdays.op('&')(weekday_bit) != 0, ~occupied)
+
+    if range_from is not None:
+        stmt = stmt.where(start_time >= range_from)
+    if range_to is not None:
+        stmt = stmt.where(start_time < range_to)
+    if recurrence_id is not None:
+        stmt = stmt.where(rule.recurrence_id == recurrence_id)
+    return stmt
+
+
+def _occurrence_filter_clause(occurrence: Subquery, slot_filter: SlotFilter, now: datetime) -> ColumnElement[bool]:
+    if slot_filter == SlotFilter.ACTIVE:
+        return occurrence.c.end_time > now
+    if slot_filter == SlotFilter.FUTURE:
+        return occurrence.c.start_time > now
+    if slot_filter == SlotFilter.PAST:
+        return occurrence.c.start_time <= now
+    if slot_filter in (SlotFilter.CANCELLED, SlotFilter.BOOKED):
+        # На несохранённое вхождение не может быть записи
+        return false()
+    return true()
+
+
+def _occurrence_filter_range(slot_filter: SlotFilter, now: datetime) -> tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Дни, которые нужно развернуть для фильтра, с точностью до дня.
+
+    Вхождение не переходит через полночь, поэтому отсечение целыми днями
+    ничего не теряет, а точную границу задаёт уже сам фильтр или курсор.
+    """
+    today = _day_start(now.date())
+    range_from = today if slot_filter in (SlotFilter.ACTIVE, SlotFilter.FUTURE) else None
+    range_to = today + timedelta(days=1) if slot_filter == SlotFilter.PAST else None
+    return range_from, range_to
+
+
+def _occurrence_range(slot_filter: SlotFilter, sort: SlotSort, cursor: Optional[SlotCursor], rows: list[Row],
+                      limit: int, now: datetime) -> tuple[Optional[datetime], Optional[datetime]]:
+    """
+    Дни, которые нужно развернуть для страницы: кроме фильтра их ограничивают курсор
+    и последняя из limit + 1 строк slot - вхождения после неё на страницу уже не попадут.
+    """
+    range_from, range_to = _occurrence_filter_range(slot_filter, now)
+    if sort.by_time_of_day:
+        return range_from, range_to
+
+    cursor_day = _day_start(cursor.start_time.date()) if cursor else None
+    last_day = _day_start(rows[-1].start_time.date()) if len(rows) > limit else None
+    if sort.is_descending:
+        range_from = max(filter(None, [range_from, last_day]), default=None)
+        range_to = min(filter(None, [range_to, cursor_day and cursor_day + timedelta(days=1)]), default=None)
+    else:
+        range_from = max(filter(None, [range_from, cursor_day]), default=None)
+        range_to = min(filter(None, [range_to, last_day and last_day + timedelta(days=1)]), default=None)
+    return range_from, range_to
+
+
+def _occurrence_anchor_query(range_from: Optional[datetime], range_to: Optional[datetime],
+                             descending: bool) -> Select:
+    """
+    Первый (для descending - последний) день действия правил в [range_from, range_to):
+    с него начинается окно разворачивания, дни без правил не перебираются.
+    """
+    rule = SlotRecurrence
+    if descending:
+        last_day = rule.valid_until if range_to is None else \
+            func.least(rule.valid_until, cast(range_to - timedelta(days=1), Date))
+        stmt = select(func.max(last_day))
+    else:
+        first_day = rule.valid_from if range_from is None else func.greatest(rule.valid_from, cast(range_from, Date))
+        stmt = select(func.min(first_day))
+
+    if range_from is not None:
+        stmt = stmt.where(rule.valid_until >= cast(range_from, Date))
+    if range_to is not None:
+        stmt = stmt.where(rule.valid_from < cast(range_to, Date))
+    return stmt
+
+
+def _occurrence_window(anchor: Optional[date], range_from: Optional[datetime], range_to: Optional[datetime],
+                       descending: bool) -> Optional[tuple[datetime, datetime]]:
+    """OCCURRENCE_WINDOW_DAYS дней от anchor в порядке обхода внутри [range_from, range_to). None - дней не осталось."""
+    if anchor is None:
+        return None
+
+    window = timedelta(days=OCCURRENCE_WINDOW_DAYS)
+    if descending:
+        window_to = _day_start(anchor) + timedelta(days=1)
+        window_from = max(filter(None, [range_from, window_to - window]))
+    else:
+        window_from = _day_start(anchor)
+        window_to = min(filter(None, [range_to, window_from + window]))
+    return (window_from, window_to) if window_from < window_to else None
+
+
+def _occurrences_page_query(slot_filter: SlotFilter, sort: SlotSort, cursor: Optional[SlotCursor], count: int,
+                            now: datetime, range_from: datetime, range_to: datetime) -> Select:
+    """
+    Первые count вхождений окна [range_from, range_to) после cursor,
+    та же keyset-пагинация, что у _slots_page_query.
+    """
+    occurrence = _occurrences_query(range_from, range_to).subquery('occurrence')
+    keys, values = _slot_sort_keys(sort, cursor, occurrence.c.start_time, literal(VIRTUAL_SLOT_ID))
+    stmt = select(occurrence).where(_occurrence_filter_clause(occurrence, slot_filter, now))
+
+    if cursor:
+        position = tuple_(*keys)
+        stmt = stmt.where(position < tuple(values) if sort.is_descending else position > tuple(values))
+
+    # VIRTUAL_SLOT_ID у всех вхождений одинаковый, в ORDER BY он не нужен
+    order_by = [key.desc() if sort.is_descending else key.asc() for key in keys[:-1]]
+    return stmt.order_by(*order_by).limit(count)
+
+
+def _next_occurrence_range(window: tuple[datetime, datetime], range_from: Optional[datetime],
+                           range_to: Optional[datetime], sort: SlotSort) -> Optional[tuple]:
+    """Дни после окна в порядке обхода. По времени суток порядок перемешивает дни - там окно одно."""
+    if sort.by_time_of_day:
+        return None
+    return (range_from, window[0]) if sort.is_descending else (window[1], range_to)
+
+
+def _occurrences_count_query(slot_filter: SlotFilter, now: datetime) -> Select:
+    """Число вхождений под фильтром, но не больше OCCURRENCE_COUNT_LIMIT: LIMIT останавливает разворачивание."""
+    occurrence = _occurrences_query(*_occurrence_filter_range(slot_filter, now)).subquery('occurrence')
+    counted = select(occurrence.c.start_time) \
+        .where(_occurrence_filter_clause(occurrence, slot_filter, now)) \
+        .limit(OCCURRENCE_COUNT_LIMIT) \
+        .subquery('counted')
+    return select(func.count()).select_from(counted)
+
+
+def _to_virtual_slot(row: Row) -> SlotView:
+    # Записей на несохранённое вхождение быть не может
+    return SlotView(
+        None, row.start_time, row.end_time, row.duration_in_minutes, row.recurrence_id, SlotStatus.FREE, None
+    )
+
+
+def _merge_page(rows: list[Row], occurrences: list[Row], sort: SlotSort,
+                limit: int, total: Optional[int]) -> SlotPage:
+    """Слить страницу слотов и страницу вхождений в одну в порядке sort."""
+    def sort_key(slot: SlotView) -> tuple:
+        key = (slot.start_time, VIRTUAL_SLOT_ID if slot.slot_id is None else slot.slot_id)
+        return (slot.start_time.time(), *key) if sort.by_time_of_day else key
+
+    slots = [_to_slot_view(row) for row in rows] + [_to_virtual_slot(row) for row in occurrences]
+    return _to_page(sorted(slots, key=sort_key, reverse=sort.is_descending), limit, total)
+
+
+def _free_windows_query(range_from: datetime, range_to: datetime, duration: timedelta, limit: int) -> Select:
+    """
+    Первые limit окон не короче duration из свободных слотов, начинающихся в [range_from, range_to).
+
+    Свободные слоты - слоты без неотменённой записи и несохранённые вхождения
+    повторяющихся правил. Идущие встык слоты склеиваются в одно окно (gaps and
+    islands): lag(end_time) по start_time отмечает слот, с которого начинается
+    новое окно, накопленная сумма отметок даёт номер окна.
+    """
+    occurrence = _occurrences_query(range_from, range_to).subquery('occurrence')
+    free = union_all(
+        select(Slot.start_time, Slot.end_time)
+        .where(Slot.start_time >= range_from, Slot.start_time < range_to, ~_is_booked_clause()),
+        select(occurrence.c.start_time, occurrence.c.end_time)
+    ).subquery('free_slot')
+
+    previous_end = func.lag(free.c.end_time).over(order_by=free.c.start_time)
+    marked = select(
+        free.c.start_time,
+        free.c.end_time,
+        case((previous_end == free.c.start_time, 0), else_=1).label('starts_window')
+    ).subquery('marked')
+
+    numbered = select(
+        marked.c.start_time,
+        marked.c.end_time,
+        func.sum(marked.c.starts_window).over(order_by=marked.c.start_time).label('window_no')
+    ).subquery('numbered')
+
+    window_start = func.min(numbered.c.start_time)
+    window_end = func.max(numbered.c.end_time)
+    return select(window_start.label('start_time'), window_end.label('end_time')) \
+        .group_by(numbered.c.window_no) \
+        .having(window_end - window_start >= duration) \
+        .order_by(window_start) \
+        .limit(limit)
+
+
+def materialize_occurrence_query(recurrence_id: int, start_time: datetime) -> Insert:
+    """INSERT вхождения правила как обычного слота, если оно существует и свободно."""
+    occurrence = _occurrences_query(start_time, start_time + timedelta(days=1), recurrence_id).subquery('occurrence')
+    rows = select(
+        occurrence.c.start_time,
+        occurrence.c.end_time,
+        occurrence.c.duration_in_minutes,
+        occurrence.c.recurrence_id
+    ).where(occurrence.c.start_time == start_time)
+
+    return pg_insert(Slot) \
+        .from_select(['start_time', 'end_time', 'duration_in_minutes', 'recurrence_id'], rows) \
+        .on_conflict_do_nothing() \
+        .returning(Slot.slot_id)
+
+
+def occurrence_slot_query(recurrence_id: int, start_time: datetime) -> Select:
+    """Уже сохранённое вхождение правила."""
+    return select(Slot).where(Slot.recurrence_id == recurrence_id, Slot.start_time == start_time)
+
+
+def first_occurrence_query(range_from: datetime, range_to: datetime) -> Select:
+    """Самое раннее несохранённое вхождение из [range_from, range_to)."""
+    occurrence = _occurrences_query(range_from, range_to).subquery('occurrence')
+    return select(occurrence.c.recurrence_id, occurrence.c.start_time) \
+        .order_by(occurrence.c.start_time, occurrence.c.recurrence_id) \
+        .limit(1)
+
+
+def _recurrence_overlap_clause(recurrence: SlotRecurrence) -> ColumnElement[bool]:
+    """Правила с общим днём недели, пересекающимися часами и периодами действия."""
+    return and_(
+        SlotRecurrence.weekdays.op('&')(recurrence.weekdays) != 0,
+        SlotRecurrence.start_time < recurrence.end_time,
+        SlotRecurrence.end_time > recurrence.start_time,
+        SlotRecurrence.valid_from <= recurrence.valid_until,
+        SlotRecurrence.valid_until >= recurrence.valid_from
+    )
+
+
+def _validate_recurrence(recurrence: SlotRecurrence) -> None:
+    if not 0 < recurrence.weekdays < 1 << 7:
+        raise ValueError(f'Recurrence weekdays mask {recurrence.weekdays} is empty or invalid')
+    if recurrence.start_time >= recurrence.end_time:
+        raise ValueError('Recurrence start_time must be before end_time')
+    if recurrence.slot_duration_in_minutes <= 0:
+        raise ValueError('Recurrence slot duration must be positive')
+    if recurrence.valid_from > recurrence.valid_until:
+        raise ValueError('Recurrence valid_from must not be after valid_until')
+
+
 class SlotService:
-    def __init__(self, engine: DatabaseEngine):
+    def __init__(self, engine: DatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None):
+        """
+        availability - индекс занятости, который сервис обновляет после своих записей.
+        day_cache - кеш get_slots_by_date, сервис сбрасывает в нём дни своих записей.
+        """
         self._engine = engine
+        self._availability = availability
+        self._day_cache = day_cache
+        if day_cache is not None:
+            engine.notifications.subscribe(day_cache.on_change)
 
     def add_slot(self, slot: Slot) -> None:
+        """Сохранить слот. Если он пересекается с существующими - SlotOverlapError."""
         try:
             with self._engine.session() as session:
                 session.add(slot)
+                session.flush()
+                self._notify(session, slot_events([(slot.slot_id, slot.start_time.date())]))
                 session.commit()
 
+        except IntegrityError as e:
+            if _is_exclusion_violation(e):
+                raise SlotOverlapError(slot, self.get_conflicting_slots(slot)) from e
+            logger.error(f"Failed to create Slot {repr(slot)}. Error: {e}")
+            raise
+
         except Exception as e:
             if hasattr(locals().get('session'), 'rollback'):
                 session.rollback()
             logger.error(f"Failed to create Slot {repr(slot)}. Error: {e}")
             raise
 
+        if self._availability is not None:
+            self._availability.add_slot(slot)
+
+    def add_slots(self, slots: list[Slot]) -> SlotBatchResult:
+        """
+        Сохранить много слотов в одной транзакции.
+
+        Слоты, пересекающиеся с существующими или с предыдущими слотами списка,
+        не сохраняются и возвращаются в rejected. Сохранённым проставляется slot_id.
+        """
+        returned: list[Row] = []
+        try:
+            with self._engine.session() as session:
+                for chunk in _chunks(slots):
+                    returned.extend(session.execute(_bulk_insert_query(chunk)).all())
+                self._notify(session, _row_events(returned))
+                session.commit()
+
+        except Exception as e:
+            logger.error(f"Failed to create {len(slots)} Slots. Error: {e}")
+            raise
+
+        return self._track_batch(_to_batch_result(slots, returned))
+
+    def _track_batch(self, result: SlotBatchResult) -> SlotBatchResult:
+        if self._availability is not None:
+            for slot in result.inserted:
+                self._availability.add_slot(slot)
+        return result
+
     def get_slot_by_id(self, slot_id: int) -> Optional[Slot]:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(Slot).where(Slot.slot_id == slot_id)
             slot: Optional[Slot] = session.scalars(stmt).one_or_none()
 
         return slot
 
+    def get_slot_view(self, slot_id: int) -> Optional[SlotView]:
+        """Слот со статусом для экранов просмотра, одним запросом без ORM-объекта."""
+        with self._engine.read_session() as session:
+            row = session.execute(_slot_views_query().where(Slot.slot_id == slot_id)).one_or_none()
+
+        return _to_slot_view(row) if row else None
+
+    def get_agenda(self, range_from: datetime, range_to: datetime) -> list[AgendaRow]:
+        """Расписание для экспорта: сохранённые слоты из [range_from, range_to) с записями и клиентами."""
+        with self._engine.read_session() as session:
+            rows = session.execute(_agenda_query(range_from, range_to)).all()
+
+        return [_to_agenda_row(row) for row in rows]
+
     def get_slots(self) -> list[Slot]:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(Slot).order_by(Slot.start_time)
             slots: list[Slot] = session.scalars(stmt).all()
 
         return slots
 
-    def get_slots_by_date(self, dt: date) -> Optional[list[Slot]]:
+    def iter_slots(self, range_from: Optional[datetime] = None, range_to: Optional[datetime] = None,
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[SlotView]:
+        """
+        Слоты по возрастанию начала порциями по chunk_size строк через серверный
+        курсор - для экспорта и статистики за годы истории при ограниченной памяти.
+
+        Сессия открыта, пока генератор не исчерпан или не закрыт.
+
+        Usage:
+            for slot in slot_service.iter_slots(range_from=datetime(2024, 1, 1)):
+                writer.writerow(slot)
+        """
+        with self._engine.read_session() as session:
+            for partition in session.execute(_stream_slots_query(range_from, range_to, chunk_size)).partitions():
+                for row in partition:
+                    yield _to_slot_view(row)
+
+    def get_slots_by_date(self, dt: date) -> Optional[list[SlotView]]:
+        """
+        Слоты дня вместе с несохранёнными вхождениями повторяющихся правил (slot_id у них None).
+
+        С day_cache день читается из кеша, одновременные промахи по одному дню
+        делают один запрос.
+        """
+        if self._day_cache is None:
+            return self._load_slots_by_date(dt)
+        return self._day_cache.get_or_load(dt, lambda: self._load_slots_by_date(dt))
+
+    def _load_slots_by_date(self, dt: date) -> list[SlotView]:
         start_of_day = datetime.combine(dt, datetime.min.time())
         end_of_day = datetime.combine(dt, datetime.max.time())
-        with self._engine.session() as session:
-            stmt = select(Slot).where(
+        with self._engine.read_session() as session:
+            stmt = _slot_views_query().where(
                 Slot.start_time.between(start_of_day, end_of_day)) \
                 .order_by(Slot.start_time)
-            return list(session.scalars(stmt).all())
+            rows = session.execute(stmt).all()
+            occurrences = session.execute(_occurrences_query(start_of_day, start_of_day + timedelta(days=1))).all()
+
+        slots = [_to_slot_view(row) for row in rows] + [_to_virtual_slot(row) for row in occurrences]
+        return sorted(slots, key=lambda slot: slot.start_time)
+
+    def get_slots_page(
+            self,
+            slot_filter: SlotFilter = SlotFilter.ALL,
+            sort: SlotSort = SlotSort.DATE_ASC,
+            cursor: Optional[SlotCursor] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            with_total: bool = False,
+            stored_only: bool = False
+    ) -> SlotPage:
+        """
+        Страница слотов, идущих после cursor (первая страница, если cursor не задан).
+
+        В страницу попадают и вхождения повторяющихся правил: по limit + 1 строк
+        из slot и из развёрнутых правил сливаются в один порядок. stored_only=True -
+        только слоты из таблицы, например когда нужны слоты с slot_id.
+        total - число слотов под фильтром, считается только при with_total=True;
+        вхождений в нём не больше OCCURRENCE_COUNT_LIMIT.
+        """
+        now = datetime.now()
+        with self._engine.read_session() as session:
+            rows = session.execute(_slots_page_query(slot_filter, sort, cursor, limit, now)).all()
+            occurrences = []
+            if not stored_only:
+                occurrences = self._load_occurrences(session, slot_filter, sort, cursor, rows, limit, now)
+            total = None
+            if with_total:
+                total = session.execute(_slots_count_query(slot_filter, now)).scalar_one()
+                if not stored_only:
+                    total += session.execute(_occurrences_count_query(slot_filter, now)).scalar_one()
+
+        return _merge_page(rows, occurrences, sort, limit, total)
+
+    @staticmethod
+    def _load_occurrences(session: Session, slot_filter: SlotFilter, sort: SlotSort, cursor: Optional[SlotCursor],
+                          rows: list[Row], limit: int, now: datetime) -> list[Row]:
+        """
+        До limit + 1 вхождений после cursor. Правила разворачиваются окнами по
+        OCCURRENCE_WINDOW_DAYS дней в порядке sort, пока страница не наберётся,
+        а не целиком: у правила на годы вперёд страница стоит одно-два окна.
+        """
+        occurrences: list[Row] = []
+        occurrence_range = _occurrence_range(slot_filter, sort, cursor, rows, limit, now)
+        while occurrence_range is not None and len(occurrences) <= limit:
+            anchor = session.execute(_occurrence_anchor_query(*occurrence_range, sort.is_descending)).scalar_one()
+            window = _occurrence_window(anchor, *occurrence_range, sort.is_descending)
+            if window is None:
+                break
+            stmt = _occurrences_page_query(slot_filter, sort, cursor, limit + 1 - len(occurrences), now, *window)
+            occurrences += session.execute(stmt).all()
+            occurrence_range = _next_occurrence_range(window, *occurrence_range, sort)
+        return occurrences
+
+    def clone_slot(self, slot_id: int, target_from: date, target_to: date,
+                   time_offset: timedelta = timedelta()) -> list[int]:
+        """Скопировать слот на каждый день из [target_from, target_to]. Возвращает id созданных слотов."""
+        return self._clone(_clone_slot_query(slot_id, target_from, target_to, time_offset))
+
+    def clone_day(self, source_day: date, target_from: date, target_to: date,
+                  time_offset: timedelta = timedelta()) -> list[int]:
+        """Скопировать все слоты дня на каждый день из [target_from, target_to]."""
+        return self._clone(_clone_day_query(source_day, target_from, target_to, time_offset))
+
+    def clone_week(self, source_day: date, target_from: date, target_to: date,
+                   time_offset: timedelta = timedelta()) -> list[int]:
+        """Скопировать неделю, содержащую source_day, на каждую неделю, начинающуюся в [target_from, target_to]."""
+        return self._clone(_clone_week_query(source_day, target_from, target_to, time_offset))
+
+    def _clone(self, stmt: Insert) -> list[int]:
+        with self._engine.session() as session:
+            rows = session.execute(stmt).all()
+            self._notify(session, _row_events(rows))
+            session.commit()
+        return [row.slot_id for row in rows]
+
+    def add_recurrence(self, recurrence: SlotRecurrence) -> None:
+        """
+        Сохранить правило повторяющихся слотов.
+
+        Правило не должно пересекаться с другими правилами (общий день недели,
+        часы и период действия), иначе ValueError.
+        """
+        _validate_recurrence(recurrence)
+        with self._engine.session() as session:
+            conflicts = list(session.scalars(
+                select(SlotRecurrence.recurrence_id).where(_recurrence_overlap_clause(recurrence))
+            ).all())
+            if conflicts:
+                raise ValueError(f'Recurrence {recurrence!r} overlaps with recurrences {conflicts}')
+            session.add(recurrence)
+            session.flush()
+            self._notify(session, [ChangeEvent(RECURRENCE, recurrence.recurrence_id)])
+            session.commit()
+
+    def get_recurrence_by_id(self, recurrence_id: int) -> Optional[SlotRecurrence]:
+        with self._engine.read_session() as session:
+            stmt = select(SlotRecurrence).where(SlotRecurrence.recurrence_id == recurrence_id)
+            return session.scalars(stmt).one_or_none()
+
+    def delete_recurrence_by_id(self, recurrence_id: int) -> None:
+        """Удалить правило. Уже сохранённые по нему слоты остаются."""
+        with self._engine.session() as session:
+            session.execute(delete(SlotRecurrence).where(SlotRecurrence.recurrence_id == recurrence_id))
+            self._notify(session, [ChangeEvent(RECURRENCE, recurrence_id)])
+            session.commit()
+
+    def materialize_occurrence(self, recurrence_id: int, start_time: datetime) -> Slot:
+        """
+        Сохранить вхождение правила в таблицу slot. Для записи на вхождение -
+        AppointmentService.book_occurrence, он сохраняет его в транзакции записи.
+
+        Если вхождение уже сохранено - возвращает существующий слот. Если у правила
+        нет свободного вхождения с таким началом - ValueError.
+        """
+        with self._engine.session() as session:
+            slot_id = session.scalars(materialize_occurrence_query(recurrence_id, start_time)).one_or_none()
+            stmt = select(Slot).where(Slot.slot_id == slot_id) if slot_id is not None else \
+                occurrence_slot_query(recurrence_id, start_time)
+            slot = session.scalars(stmt).one_or_none()
+            if slot_id is not None:
+                self._notify(session, slot_events([(slot_id, start_time.date())]))
+            session.commit()
+
+        if slot is None:
+            raise ValueError(f'Recurrence {recurrence_id} has no free occurrence at {start_time}')
+        return slot
 
     def delete_slot_by_id(self, slot_id: int) -> None:
         with self._engine.session() as session:
-            stmt = delete(Slot).where(Slot.slot_id == slot_id)
-            session.scalars(stmt).all()
+            stmt = delete(Slot).where(Slot.slot_id == slot_id).returning(Slot.slot_id, Slot.start_time)
+            self._notify(session, _row_events(session.execute(stmt).all()))
             session.commit()
 
+        if self._availability is not None:
+            self._availability.remove_slot(slot_id)
+
     def delete_slot_between_two_dates(self, start_date: datetime, end_date: datetime) -> None:
         with self._engine.session() as session:
-            stmt = delete(Slot).where(Slot.start_time.between(start_date, end_date))
-            session.scalars(stmt).all()
+            stmt = delete(Slot).where(Slot.start_time.between(start_date, end_date)) \
+                .returning(Slot.slot_id, Slot.start_time)
+            rows = session.execute(stmt).all()
+            self._notify(session, _row_events(rows))
+
+        self._forget_slots([row.slot_id for row in rows])
+
+    def _forget_slots(self, slot_ids: list[int]) -> None:
+        if self._availability is not None:
+            for slot_id in slot_ids:
+                self._availability.remove_slot(slot_id)
+
+    def _notify(self, session: Session, events: list[ChangeEvent]) -> None:
+        """
+        NOTIFY об изменениях в транзакции записи: другие процессы узнают о них
+        после commit, свой day_cache сбрасывается тогда же.
+        """
+        stmt = self._engine.notifications.query(events)
+        if stmt is not None:
+            session.execute(stmt)
+        forget_after_commit(session, self._day_cache, events)
 
     def is_slot_free(self, slot_id: int) -> bool:
-        with self._engine.session() as session:
-            stmt = select(Appointment).where(Appointment.slot_id == slot_id)
-            result = session.scalars(stmt).one_or_none()
+        """На слот нет неотменённой записи."""
+        return self.get_slot_statuses([slot_id])[slot_id] != SlotStatus.BOOKED
+
+    def find_free_windows(self, range_from: datetime, range_to: datetime, duration: timedelta,
+                          limit: int = DEFAULT_PAGE_SIZE) -> list[FreeWindow]:
+        """
+        Ближайшие limit свободных окон длиной не меньше duration, например
+        "свободные 90 минут на этой неделе". Считается одним запросом в БД.
+        """
+        with self._engine.read_session() as session:
+            rows = session.execute(_free_windows_query(range_from, range_to, duration, limit)).all()
+
+        return [FreeWindow(row.start_time, row.end_time) for row in rows]
+
+    def build_availability_index(self, range_from: datetime, range_to: datetime) -> AvailabilityIndex:
+        """Индекс занятости по слотам и записям из [range_from, range_to), одним запросом."""
+        with self._engine.read_session() as session:
+            rows = session.execute(_availability_query(range_from, range_to)).all()
+
+        return _to_availability_index(rows)
+
+    def refresh_availability_index(self, index: AvailabilityIndex,
+                                   range_from: date, range_to: date) -> AvailabilityIndex:
+        """
+        Догрузить в долгоживущий индекс дни из [range_from, range_to), которых в нём нет
+        или которые сбросил AvailabilityIndex.on_change. Загруженные дни не перечитываются.
+        """
+        missing = index.missing_days(range_from, range_to)
+        if not missing:
+            return index
+
+        with self._engine.read_session() as session:
+            rows = session.execute(_availability_query(*_missing_days_range(missing))).all()
 
-            return False if result is None else True
+        _load_missing_days(index, missing, rows)
+        return index
+
+    def build_interval_tree(self, range_from: datetime, range_to: datetime) -> SlotIntervalTree:
+        """Дерево интервалов по слотам из [range_from, range_to) для проверки пачки кандидатов, одним запросом."""
+        with self._engine.read_session() as session:
+            return SlotIntervalTree(session.scalars(_slots_between_query(range_from, range_to)))
+
+    def get_slot_statuses(self, slot_ids: list[int]) -> dict[int, SlotStatus]:
+        """Статус каждого из slot_ids одним запросом, например для страницы списка."""
+        if not slot_ids:
+            return {}
+
+        with self._engine.read_session() as session:
+            rows = session.execute(_slot_statuses_query(slot_ids)).all()
+
+        return _to_statuses(slot_ids, rows)
 
     def is_slot_intersect_with_others(self, slot: Slot) -> bool:
         with self._engine.session() as session:
-            stmt = select(Slot).where(
-                or_(
-                    (slot.start_time.between(Slot.start_time, Slot.end_time)),
-                    (slot.end_time.between(Slot.start_time, Slot.end_time))
-                )
-            )
-            result = session.scalars(stmt).one_or_none()
-            return False if result is None else True
+            stmt = select(exists().where(_overlap_clause(slot)))
+            return session.execute(stmt).scalar_one()
+
+    def get_conflicting_slots(self, slot: Slot) -> list[Slot]:
+        """Слоты, пересекающиеся с slot, по возрастанию начала."""
+        with self._engine.session() as session:
+            stmt = select(Slot).where(_overlap_clause(slot)).order_by(Slot.start_time)
+            return list(session.scalars(stmt).all())
+
+
+class AsyncSlotService:
+    def __init__(self, engine: AsyncDatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None):
+        self._engine = engine
+        self._availability = availability
+        self._day_cache = day_cache
+        if day_cache is not None:
+            engine.notifications.subscribe(day_cache.on_change)
+
+    async def add_slot(self, slot: Slot) -> None:
+        """Сохранить слот. Если он пересекается с существующими - SlotOverlapError."""
+        try:
+            async with self._engine.session() as session:
+                session.add(slot)
+                await session.flush()
+                await self._notify(session, slot_events([(slot.slot_id, slot.start_time.date())]))
+
+        except IntegrityError as e:
+            if _is_exclusion_violation(e):
+                raise SlotOverlapError(slot, await self.get_conflicting_slots(slot)) from e
+            logger.error(f"Failed to create Slot {repr(slot)}. Error: {e}")
+            raise
+
+        except Exception as e:
+            logger.error(f"Failed to create Slot {repr(slot)}. Error: {e}")
+            raise
+
+        if self._availability is not None:
+            self._availability.add_slot(slot)
+
+    async def add_slots(self, slots: list[Slot]) -> SlotBatchResult:
+        """Сохранить много слотов в одной транзакции, см. SlotService.add_slots."""
+        returned: list[Row] = []
+        try:
+            async with self._engine.session() as session:
+                for chunk in _chunks(slots):
+                    returned.extend((await session.execute(_bulk_insert_query(chunk))).all())
+                await self._notify(session, _row_events(returned))
+
+        except Exception as e:
+            logger.error(f"Failed to create {len(slots)} Slots. Error: {e}")
+            raise
+
+        return self._track_batch(_to_batch_result(slots, returned))
+
+    def _track_batch(self, result: SlotBatchResult) -> SlotBatchResult:
+        if self._availability is not None:
+            for slot in result.inserted:
+                self._availability.add_slot(slot)
+        return result
+
+    async def get_slot_by_id(self, slot_id: int) -> Optional[Slot]:
+        async with self._engine.read_session() as session:
+            stmt = select(Slot).where(Slot.slot_id == slot_id)
+            return (await session.scalars(stmt)).one_or_none()
+
+    async def get_slot_view(self, slot_id: int) -> Optional[SlotView]:
+        """Слот со статусом, см. SlotService.get_slot_view."""
+        async with self._engine.read_session() as session:
+            row = (await session.execute(_slot_views_query().where(Slot.slot_id == slot_id))).one_or_none()
+
+        return _to_slot_view(row) if row else None
+
+    async def get_agenda(self, range_from: datetime, range_to: datetime) -> list[AgendaRow]:
+        """Расписание для экспорта, см. SlotService.get_agenda."""
+        async with self._engine.read_session() as session:
+            rows = (await session.execute(_agenda_query(range_from, range_to))).all()
+
+        return [_to_agenda_row(row) for row in rows]
+
+    async def get_slots(self) -> list[Slot]:
+        async with self._engine.read_session() as session:
+            stmt = select(Slot).order_by(Slot.start_time)
+            return list((await session.scalars(stmt)).all())
+
+    async def iter_slots(self, range_from: Optional[datetime] = None, range_to: Optional[datetime] = None,
+                         chunk_size: int = STREAM_CHUNK_SIZE) -> AsyncIterator[SlotView]:
+        """Слоты порциями через серверный курсор, см. SlotService.iter_slots."""
+        async with self._engine.read_session() as session:
+            result = await session.stream(_stream_slots_query(range_from, range_to, chunk_size))
+            async for partition in result.partitions():
+                for row in partition:
+                    yield _to_slot_view(row)
+
+    async def get_slots_by_date(self, dt: date) -> Optional[list[SlotView]]:
+        """Слоты дня, см. SlotService.get_slots_by_date."""
+        if self._day_cache is None:
+            return await self._load_slots_by_date(dt)
+        return await self._day_cache.get_or_load_async(dt, lambda: self._load_slots_by_date(dt))
+
+    async def _load_slots_by_date(self, dt: date) -> list[SlotView]:
+        start_of_day = datetime.combine(dt, datetime.min.time())
+        end_of_day = datetime.combine(dt, datetime.max.time())
+        async with self._engine.read_session() as session:
+            stmt = _slot_views_query().where(
+                Slot.start_time.between(start_of_day, end_of_day)) \
+                .order_by(Slot.start_time)
+            rows = (await session.execute(stmt)).all()
+            occurrences = (await session.execute(
+                _occurrences_query(start_of_day, start_of_day + timedelta(days=1))
+            )).all()
+
+        slots = [_to_slot_view(row) for row in rows] + [_to_virtual_slot(row) for row in occurrences]
+        return sorted(slots, key=lambda slot: slot.start_time)
+
+    async def get_slots_page(
+            self,
+            slot_filter: SlotFilter = SlotFilter.ALL,
+            sort: SlotSort = SlotSort.DATE_ASC,
+            cursor: Optional[SlotCursor] = None,
+            limit: int = DEFAULT_PAGE_SIZE,
+            with_total: bool = False,
+            stored_only: bool = False
+    ) -> SlotPage:
+        """Страница слотов, см. SlotService.get_slots_page."""
+        now = datetime.now()
+        async with self._engine.read_session() as session:
+            rows = (await session.execute(_slots_page_query(slot_filter, sort, cursor, limit, now))).all()
+            occurrences = []
+            if not stored_only:
+                occurrences = await self._load_occurrences(session, slot_filter, sort, cursor, rows, limit, now)
+            total = None
+            if with_total:
+                total = (await session.execute(_slots_count_query(slot_filter, now))).scalar_one()
+                if not stored_only:
+                    total += (await session.execute(_occurrences_count_query(slot_filter, now))).scalar_one()
+
+        return _merge_page(rows, occurrences, sort, limit, total)
+
+    @staticmethod
+    async def _load_occurrences(session: AsyncSession, slot_filter: SlotFilter, sort: SlotSort,
+                                cursor: Optional[SlotCursor], rows: list[Row], limit: int, now: datetime) -> list[Row]:
+        occurrences: list[Row] = []
+        occurrence_range = _occurrence_range(slot_filter, sort, cursor, rows, limit, now)
+        while occurrence_range is not None and len(occurrences) <= limit:
+            stmt = _occurrence_anchor_query(*occurrence_range, sort.is_descending)
+            anchor = (await session.execute(stmt)).scalar_one()
+            window = _occurrence_window(anchor, *occurrence_range, sort.is_descending)
+            if window is None:
+                break
+            stmt = _occurrences_page_query(slot_filter, sort, cursor, limit + 1 - len(occurrences), now, *window)
+            occurrences += (await session.execute(stmt)).all()
+            occurrence_range = _next_occurrence_range(window, *occurrence_range, sort)
+        return occurrences
+
+    async def clone_slot(self, slot_id: int, target_from: date, target_to: date,
+                         time_offset: timedelta = timedelta()) -> list[int]:
+        """Скопировать слот, см. SlotService.clone_slot."""
+        return await self._clone(_clone_slot_query(slot_id, target_from, target_to, time_offset))
+
+    async def clone_day(self, source_day: date, target_from: date, target_to: date,
+                        time_offset: timedelta = timedelta()) -> list[int]:
+        """Скопировать день, см. SlotService.clone_day."""
+        return await self._clone(_clone_day_query(source_day, target_from, target_to, time_offset))
+
+    async def clone_week(self, source_day: date, target_from: date, target_to: date,
+                         time_offset: timedelta = timedelta()) -> list[int]:
+        """Скопировать неделю, см. SlotService.clone_week."""
+        return await self._clone(_clone_week_query(source_day, target_from, target_to, time_offset))
+
+    async def _clone(self, stmt: Insert) -> list[int]:
+        async with self._engine.session() as session:
+            rows = (await session.execute(stmt)).all()
+            await self._notify(session, _row_events(rows))
+        return [row.slot_id for row in rows]
+
+    async def add_recurrence(self, recurrence: SlotRecurrence) -> None:
+        """Сохранить правило повторяющихся слотов, см. SlotService.add_recurrence."""
+        _validate_recurrence(recurrence)
+        async with self._engine.session() as session:
+            conflicts = list((await session.scalars(
+                select(SlotRecurrence.recurrence_id).where(_recurrence_overlap_clause(recurrence))
+            )).all())
+            if conflicts:
+                raise ValueError(f'Recurrence {recurrence!r} overlaps with recurrences {conflicts}')
+            session.add(recurrence)
+            await session.flush()
+            await self._notify(session, [ChangeEvent(RECURRENCE, recurrence.recurrence_id)])
+
+    async def get_recurrence_by_id(self, recurrence_id: int) -> Optional[SlotRecurrence]:
+        async with self._engine.read_session() as session:
+            stmt = select(SlotRecurrence).where(SlotRecurrence.recurrence_id == recurrence_id)
+            return (await session.scalars(stmt)).one_or_none()
+
+    async def delete_recurrence_by_id(self, recurrence_id: int) -> None:
+        async with self._engine.session() as session:
+            await session.execute(delete(SlotRecurrence).where(SlotRecurrence.recurrence_id == recurrence_id))
+            await self._notify(session, [ChangeEvent(RECURRENCE, recurrence_id)])
+
+    async def materialize_occurrence(self, recurrence_id: int, start_time: datetime) -> Slot:
+        """Сохранить вхождение правила, см. SlotService.materialize_occurrence."""
+        async with self._engine.session() as session:
+            slot_id = (await session.scalars(materialize_occurrence_query(recurrence_id, start_time))).one_or_none()
+            stmt = select(Slot).where(Slot.slot_id == slot_id) if slot_id is not None else \
+                occurrence_slot_query(recurrence_id, start_time)
+            slot = (await session.scalars(stmt)).one_or_none()
+            if slot_id is not None:
+                await self._notify(session, slot_events([(slot_id, start_time.date())]))
+
+        if slot is None:
+            raise ValueError(f'Recurrence {recurrence_id} has no free occurrence at {start_time}')
+        return slot
+
+    async def delete_slot_by_id(self, slot_id: int) -> None:
+        async with self._engine.session() as session:
+            stmt = delete(Slot).where(Slot.slot_id == slot_id).returning(Slot.slot_id, Slot.start_time)
+            await self._notify(session, _row_events((await session.execute(stmt)).all()))
+
+        if self._availability is not None:
+            self._availability.remove_slot(slot_id)
+
+    async def delete_slot_between_two_dates(self, start_date: datetime, end_date: datetime) -> None:
+        async with self._engine.session() as session:
+            stmt = delete(Slot).where(Slot.start_time.between(start_date, end_date)) \
+                .returning(Slot.slot_id, Slot.start_time)
+            rows = (await session.execute(stmt)).all()
+            await self._notify(session, _row_events(rows))
+
+        self._forget_slots([row.slot_id for row in rows])
+
+    def _forget_slots(self, slot_ids: list[int]) -> None:
+        if self._availability is not None:
+            for slot_id in slot_ids:
+                self._availability.remove_slot(slot_id)
+
+    async def _notify(self, session: AsyncSession, events: list[ChangeEvent]) -> None:
+        stmt = self._engine.notifications.query(events)
+        if stmt is not None:
+            await session.execute(stmt)
+        forget_after_commit(session.sync_session, self._day_cache, events)
+
+    async def is_slot_free(self, slot_id: int) -> bool:
+        """На слот нет неотменённой записи."""
+        return (await self.get_slot_statuses([slot_id]))[slot_id] != SlotStatus.BOOKED
+
+    async def find_free_windows(self, range_from: datetime, range_to: datetime, duration: timedelta,
+                                limit: int = DEFAULT_PAGE_SIZE) -> list[FreeWindow]:
+        """Ближайшие свободные окна, см. SlotService.find_free_windows."""
+        async with self._engine.read_session() as session:
+            rows = (await session.execute(_free_windows_query(range_from, range_to, duration, limit))).all()
+
+        return [FreeWindow(row.start_time, row.end_time) for row in rows]
+
+    async def build_availability_index(self, range_from: datetime, range_to: datetime) -> AvailabilityIndex:
+        """Индекс занятости, см. SlotService.build_availability_index."""
+        async with self._engine.read_session() as session:
+            rows = (await session.execute(_availability_query(range_from, range_to))).all()
+
+        return _to_availability_index(rows)
+
+    async def refresh_availability_index(self, index: AvailabilityIndex,
+                                         range_from: date, range_to: date) -> AvailabilityIndex:
+        """Догрузка дней в индекс, см. SlotService.refresh_availability_index."""
+        missing = index.missing_days(range_from, range_to)
+        if not missing:
+            return index
+
+        async with self._engine.read_session() as session:
+            rows = (await session.execute(_availability_query(*_missing_days_range(missing)))).all()
+
+        _load_missing_days(index, missing, rows)
+        return index
+
+    async def build_interval_tree(self, range_from: datetime, range_to: datetime) -> SlotIntervalTree:
+        """Дерево интервалов по слотам, см. SlotService.build_interval_tree."""
+        async with self._engine.read_session() as session:
+            return SlotIntervalTree((await session.scalars(_slots_between_query(range_from, range_to))).all())
+
+    async def get_slot_statuses(self, slot_ids: list[int]) -> dict[int, SlotStatus]:
+        """Статусы слотов одним запросом, см. SlotService.get_slot_statuses."""
+        if not slot_ids:
+            return {}
+
+        async with self._engine.read_session() as session:
+            rows = (await session.execute(_slot_statuses_query(slot_ids))).all()
+
+        return _to_statuses(slot_ids, rows)
+
+    async def is_slot_intersect_with_others(self, slot: Slot) -> bool:
+        async with self._engine.session() as session:
+            stmt = select(exists().where(_overlap_clause(slot)))
+            return (await session.execute(stmt)).scalar_one()
+
+    async def get_conflicting_slots(self, slot: Slot) -> list[Slot]:
+        """Слоты, пересекающиеся с slot, см. SlotService.get_conflicting_slots."""
+        async with self._engine.session() as session:
+            stmt = select(Slot).where(_overlap_clause(slot)).order_by(Slot.start_time)
+            return list((await session.scalars(stmt)).all())
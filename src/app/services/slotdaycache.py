@@ -0,0 +1,200 @@
+import asyncio
+import threading
+import time
+from collections import OrderedDict
+from datetime import date
+from typing import Awaitable, Callable, Optional
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from src.app.models import SlotView
+from src.infrastructure.postgres.notifications import ALL, APPOINTMENT, RECURRENCE, SLOT, ChangeEvent
+
+SLOT_DAY_CACHE_SIZE = 366
+SLOT_DAY_CACHE_TTL_S = 60.0
+
+
+class _Flight:
+    """Загрузка дня в потоке: остальные потоки ждут done и берут её результат."""
+    __slots__ = ('done', 'slots', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.slots: tuple[SlotView, ...] = ()
+        self.error: Optional[BaseException] = None
+
+
+class SlotDayCache:
+    """
+    Read-through кеш SlotService.get_slots_by_date по дням: LRU не больше
+    max_size дней, каждый живёт ttl_s секунд.
+
+    Одновременные промахи по одному дню схлопываются: запрос в БД идёт один,
+    остальные вызовы ждут его результат (single-flight) - отдельно для потоков
+    и для корутин. Если день сбросили, пока он грузился, результат отдаётся
+    ожидающим, но в кеш не кладётся: он мог быть прочитан до записи. Отмена
+    корутины, которая грузит день, ожидающих не отменяет: один из них грузит
+    день заново.
+
+    Сервисы сбрасывают дни своих записей сами (forget_after_commit) и
+    подписывают кеш на уведомления движка: записи других процессов приходят
+    через on_change (LISTEN/NOTIFY).
+
+    Usage:
+        day_cache = SlotDayCache()
+        slot_service = AsyncSlotService(engine, day_cache=day_cache)
+        appointment_service = AsyncAppointmentService(engine, day_cache=day_cache)
+    """
+
+    def __init__(self, max_size: int = SLOT_DAY_CACHE_SIZE, ttl_s: float = SLOT_DAY_CACHE_TTL_S):
+        self._max_size = max_size
+        self._ttl_s = ttl_s
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[date, tuple[tuple[SlotView, ...], float]] = OrderedDict()
+        # Номер "поколения" дня: меняется при каждом сбросе
+        self._versions: dict[date, int] = {}
+        self._epoch = 0
+        self._flights: dict[date, _Flight] = {}
+        self._async_flights: dict[date, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_or_load(self, day: date, load: Callable[[], list[SlotView]]) -> list[SlotView]:
+        with self._lock:
+            cached = self._get(day)
+            if cached is not None:
+                return list(cached)
+            flight = self._flights.get(day)
+            leader = flight is None
+            if leader:
+                flight = self._flights[day] = _Flight()
+            version = self._version(day)
+
+        if not leader:
+            flight.done.wait()
+            if flight.error is not None:
+                raise flight.error
+            return list(flight.slots)
+
+        try:
+            flight.slots = tuple(load())
+            self._store(day, version, flight.slots)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._flights.get(day) is flight:
+                    del self._flights[day]
+            flight.done.set()
+
+        return list(flight.slots)
+
+    async def get_or_load_async(self, day: date, load: Callable[[], Awaitable[list[SlotView]]]) -> list[SlotView]:
+        while True:
+            with self._lock:
+                cached = self._get(day)
+                if cached is not None:
+                    return list(cached)
+                flight = self._async_flights.get(day)
+                leader = flight is None
+                if leader:
+                    flight = self._async_flights[day] = asyncio.get_running_loop().create_future()
+                version = self._version(day)
+
+            if leader:
+                return await self._lead_async(day, version, flight, load)
+
+            # shield: отмена одного ожидающего не отменяет загрузку для остальных
+            slots = await asyncio.shield(flight)
+            if slots is not None:
+                return list(slots)
+            # Ведущего отменили: загрузка брошена, ожидающие начинают заново, один из них - ведущим
+
+    async def _lead_async(self, day: date, version: tuple[int, int], flight: asyncio.Future,
+                          load: Callable[[], Awaitable[list[SlotView]]]) -> list[SlotView]:
+        try:
+            slots = tuple(await load())
+            self._store(day, version, slots)
+            flight.set_result(slots)
+        except asyncio.CancelledError:
+            # Отмена касается только ведущего: ожидающие его загрузки (другие апдейты) не отменяются
+            flight.set_result(None)
+            raise
+        except Exception as e:
+            flight.set_exception(e)
+            # Исключение получит вызывающий, ожидающих может не быть
+            flight.exception()
+            raise
+        finally:
+            with self._lock:
+                if self._async_flights.get(day) is flight:
+                    del self._async_flights[day]
+
+        return list(slots)
+
+    def invalidate(self, day: date) -> None:
+        with self._lock:
+            self._entries.pop(day, None)
+            self._versions[day] = self._versions.get(day, 0) + 1
+            # Новые вызовы не должны присоединяться к загрузке, начатой до сброса
+            self._flights.pop(day, None)
+            self._async_flights.pop(day, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._versions.clear()
+            self._epoch += 1
+            self._flights.clear()
+            self._async_flights.clear()
+
+    def on_change(self, event: ChangeEvent) -> None:
+        """
+        Подписчик ChangeNotifier. Изменение слота или записи сбрасывает его день,
+        событие без дня и изменение правил повторения - весь кеш.
+        """
+        if event.entity in (SLOT, APPOINTMENT) and event.day is not None:
+            self.invalidate(event.day)
+        elif event.entity in (SLOT, APPOINTMENT, RECURRENCE, ALL):
+            self.clear()
+
+    def _get(self, day: date) -> Optional[tuple[SlotView, ...]]:
+        entry = self._entries.get(day)
+        if entry is None:
+            return None
+        slots, expires_at = entry
+        if expires_at <= time.monotonic():
+            del self._entries[day]
+            return None
+        self._entries.move_to_end(day)
+        return slots
+
+    def _version(self, day: date) -> tuple[int, int]:
+        return self._epoch, self._versions.get(day, 0)
+
+    def _store(self, day: date, version: tuple[int, int], slots: tuple[SlotView, ...]) -> None:
+        with self._lock:
+            if self._version(day) != version:
+                return
+            self._entries[day] = (slots, time.monotonic() + self._ttl_s)
+            self._entries.move_to_end(day)
+            while len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+
+
+def forget_after_commit(session: Session, cache: Optional[SlotDayCache], events: list[ChangeEvent]) -> None:
+    """
+    Сбросить дни событий в кеше после commit транзакции сессии (в unit of work -
+    после его commit). Раньше нельзя: читатель успел бы положить в кеш старые данные.
+    """
+    if cache is None or not events:
+        return
+
+    def forget(_: Session) -> None:
+        for change in events:
+            cache.on_change(change)
+
+    event.listen(session, 'after_commit', forget, once=True)
@@ -0,0 +1,163 @@
+import logging
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import select, delete, func, Select, Delete, Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.app.models import SlotHold
+from src.app.services.appointment import lock_slot_query, slot_taken_query, check_slot_free
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+SLOT_HOLD_TTL = timedelta(minutes=5)
+
+# Броней, удаляемых одной транзакцией при очистке
+SLOT_HOLD_SWEEP_BATCH_SIZE = 500
+
+
+def _upsert_hold_query(slot_id: int, holder_tg_id: int, ttl: timedelta) -> Insert:
+    """
+    INSERT ... ON CONFLICT (slot_id) DO UPDATE: новая бронь занимает место истёкшей
+    (ещё не удалённой), а повторная бронь того же клиента продлевается.
+    """
+    stmt = pg_insert(SlotHold).values(
+        slot_id=slot_id,
+        holder_tg_id=holder_tg_id,
+        expires_at=func.now() + ttl,
+        created_at=func.now()
+    )
+    return stmt \
+        .on_conflict_do_update(
+            index_elements=[SlotHold.slot_id],
+            set_={
+                'holder_tg_id': stmt.excluded.holder_tg_id,
+                'expires_at': stmt.excluded.expires_at,
+                'created_at': stmt.excluded.created_at
+            }
+        ) \
+        .returning(SlotHold) \
+        .execution_options(populate_existing=True)
+
+
+def _live_hold_query(slot_id: int) -> Select:
+    return select(SlotHold).where(SlotHold.slot_id == slot_id, SlotHold.expires_at > func.now())
+
+
+def _release_query(slot_id: int, holder_tg_id: int) -> Delete:
+    return delete(SlotHold) \
+        .where(SlotHold.slot_id == slot_id, SlotHold.holder_tg_id == holder_tg_id) \
+        .returning(SlotHold.hold_id)
+
+
+def _sweep_query(batch_size: int) -> Delete:
+    """
+    Удалить до batch_size истёкших броней, начиная с самых старых, по ix_slot_hold_expires_at.
+    SKIP LOCKED: брони, которые сейчас превращают в запись, и очистка в других процессах не ждутся.
+    """
+    expired = select(SlotHold.hold_id) \
+        .where(SlotHold.expires_at <= func.now()) \
+        .order_by(SlotHold.expires_at) \
+        .limit(batch_size) \
+        .with_for_update(skip_locked=True)
+    return delete(SlotHold) \
+        .where(SlotHold.hold_id.in_(expired.scalar_subquery())) \
+        .returning(SlotHold.hold_id)
+
+
+class SlotHoldService:
+    """
+    Временные брони слотов: клиент выбрал слот (book_slot_<id>) и оформляет запись,
+    а остальные не могут записаться на слот или забронировать его, пока бронь не истечёт.
+
+    Бронь - строка slot_hold с expires_at, а не блокировка: блокировка слота
+    держится только до конца транзакции hold_slot. В боте это тоже так:
+    UnitOfWork фиксирует каждый вызов сервиса сразу, а не в конце апдейта.
+    Запись по брони - AppointmentService.book_slot(appointment, holder_tg_id)
+    (BookSlotHandler), истёкшие брони удаляет sweep_expired.
+
+    Usage:
+        hold = slot_hold_service.hold_slot(slot_id, tg_id)
+        ...
+        appointment_service.book_slot(Appointment(slot_id=slot_id, ...), holder_tg_id=tg_id)
+    """
+
+    def __init__(self, engine: DatabaseEngine, ttl: timedelta = SLOT_HOLD_TTL):
+        self._engine = engine
+        self._ttl = ttl
+
+    def hold_slot(self, slot_id: int, holder_tg_id: int) -> SlotHold:
+        """
+        Забронировать слот на ttl, повторный вызов тем же клиентом продлевает бронь.
+        На слот есть запись - SlotBookedError, чужая бронь - SlotHeldError, слота нет - ValueError.
+        """
+        with self._engine.session() as session:
+            if session.scalars(lock_slot_query(slot_id)).one_or_none() is None:
+                raise ValueError(f"Slot with slot_id = {slot_id} does not exists")
+            check_slot_free(slot_id, session.execute(slot_taken_query(slot_id, holder_tg_id=holder_tg_id)).one())
+
+            hold = session.scalars(_upsert_hold_query(slot_id, holder_tg_id, self._ttl)).one()
+            session.commit()
+
+        return hold
+
+    def get_hold(self, slot_id: int) -> Optional[SlotHold]:
+        """Неистёкшая бронь слота. Читается с primary: бронь живёт минуты, реплика может не успеть."""
+        with self._engine.session() as session:
+            return session.scalars(_live_hold_query(slot_id)).one_or_none()
+
+    def release_hold(self, slot_id: int, holder_tg_id: int) -> bool:
+        """Снять бронь клиента, например если он вышел из оформления записи. False - брони не было."""
+        with self._engine.session() as session:
+            released = session.execute(_release_query(slot_id, holder_tg_id)).first() is not None
+            session.commit()
+        return released
+
+    def sweep_expired(self, batch_size: int = SLOT_HOLD_SWEEP_BATCH_SIZE) -> int:
+        """
+        Удалить истёкшие брони пачками по batch_size, каждая пачка - своей короткой
+        транзакцией. Истёкшие брони и так ничего не держат, очистка не даёт таблице расти.
+        Возвращает число удалённых броней.
+        """
+        swept = 0
+        while True:
+            with self._engine.session() as session:
+                deleted = len(session.execute(_sweep_query(batch_size)).all())
+                session.commit()
+            swept += deleted
+            if deleted < batch_size:
+                return swept
+
+
+class AsyncSlotHoldService:
+    def __init__(self, engine: AsyncDatabaseEngine, ttl: timedelta = SLOT_HOLD_TTL):
+        self._engine = engine
+        self._ttl = ttl
+
+    async def hold_slot(self, slot_id: int, holder_tg_id: int) -> SlotHold:
+        async with self._engine.session() as session:
+            if (await session.scalars(lock_slot_query(slot_id))).one_or_none() is None:
+                raise ValueError(f"Slot with slot_id = {slot_id} does not exists")
+            taken = (await session.execute(slot_taken_query(slot_id, holder_tg_id=holder_tg_id))).one()
+            check_slot_free(slot_id, taken)
+
+            return (await session.scalars(_upsert_hold_query(slot_id, holder_tg_id, self._ttl))).one()
+
+    async def get_hold(self, slot_id: int) -> Optional[SlotHold]:
+        async with self._engine.session() as session:
+            return (await session.scalars(_live_hold_query(slot_id))).one_or_none()
+
+    async def release_hold(self, slot_id: int, holder_tg_id: int) -> bool:
+        async with self._engine.session() as session:
+            return (await session.execute(_release_query(slot_id, holder_tg_id))).first() is not None
+
+    async def sweep_expired(self, batch_size: int = SLOT_HOLD_SWEEP_BATCH_SIZE) -> int:
+        swept = 0
+        while True:
+            async with self._engine.session() as session:
+                deleted = len((await session.execute(_sweep_query(batch_size))).all())
+            swept += deleted
+            if deleted < batch_size:
+                return swept
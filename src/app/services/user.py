@@ -3,7 +3,10 @@ from typing import Optional
 from sqlalchemy import select
 
 from src.app.models import User
+from src.app.services.role import role_cache
 from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.notifications import USER, ChangeEvent
 
 logger = logging.getLogger(__name__)
 
@@ -16,6 +19,7 @@ class UserService:
         try:
             with self._engine.session() as session:
                 session.add(user)
+                session.execute(self._engine.notifications.query([ChangeEvent(USER, user.tg_user_id)]))
                 session.commit()
         except Exception as e:
             if hasattr(locals().get('session'), 'rollback'):
@@ -23,8 +27,10 @@ class UserService:
             logger.error(f"Failed to create Admin {repr(user)}. Error: {e}")
             raise
 
+        role_cache.invalidate(user.tg_user_id)
+
     def get_user_by_id(self, user_id: int) -> User:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(User).where(User.user_id == user_id)
             user: Optional[User] = session.scalars(stmt).one_or_none()
 
@@ -34,6 +40,37 @@ class UserService:
         return user
 
     def get_user_by_tg_id_if_exists(self, tg_user_id: int) -> Optional[User]:
-        with self._engine.session() as session:
+        with self._engine.read_session() as session:
             stmt = select(User).where(User.tg_user_id == tg_user_id)
             return session.scalars(stmt).one_or_none()
+
+
+class AsyncUserService:
+    def __init__(self, engine: AsyncDatabaseEngine):
+        self._engine = engine
+
+    async def add_user(self, user: User) -> None:
+        try:
+            async with self._engine.session() as session:
+                session.add(user)
+                await session.execute(self._engine.notifications.query([ChangeEvent(USER, user.tg_user_id)]))
+        except Exception as e:
+            logger.error(f"Failed to create Admin {repr(user)}. Error: {e}")
+            raise
+
+        role_cache.invalidate(user.tg_user_id)
+
+    async def get_user_by_id(self, user_id: int) -> User:
+        async with self._engine.read_session() as session:
+            stmt = select(User).where(User.user_id == user_id)
+            user: Optional[User] = (await session.scalars(stmt)).one_or_none()
+
+            if user is None:
+                raise ValueError(f"Admin with id {user_id} not found")
+
+        return user
+
+    async def get_user_by_tg_id_if_exists(self, tg_user_id: int) -> Optional[User]:
+        async with self._engine.read_session() as session:
+            stmt = select(User).where(User.tg_user_id == tg_user_id)
+            return (await session.scalars(stmt)).one_or_none()
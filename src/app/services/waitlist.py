@@ -0,0 +1,103 @@
+from sqlalchemy import select, delete, func, Select, Delete, Insert
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from src.app.models import WaitlistEntry
+from src.app.services.appointment import lock_slot_query, slot_taken_query
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+
+def _join_query(slot_id: int, client_id: int) -> Insert:
+    """Повторная постановка в очередь того же клиента ничего не меняет (uq_slot_waitlist_slot_id_client_id)."""
+    return pg_insert(WaitlistEntry) \
+        .values(slot_id=slot_id, client_id=client_id, created_at=func.now()) \
+        .on_conflict_do_nothing(index_elements=[WaitlistEntry.slot_id, WaitlistEntry.client_id])
+
+
+def _position_query(slot_id: int, client_id: int) -> Select:
+    """Место клиента в очереди слота, считая с 1, по ix_slot_waitlist_slot_id_entry_id."""
+    own = select(WaitlistEntry.entry_id) \
+        .where(WaitlistEntry.slot_id == slot_id, WaitlistEntry.client_id == client_id) \
+        .scalar_subquery()
+    return select(func.count()) \
+        .select_from(WaitlistEntry) \
+        .where(WaitlistEntry.slot_id == slot_id, WaitlistEntry.entry_id <= own)
+
+
+def _leave_query(slot_id: int, client_id: int) -> Delete:
+    return delete(WaitlistEntry) \
+        .where(WaitlistEntry.slot_id == slot_id, WaitlistEntry.client_id == client_id) \
+        .returning(WaitlistEntry.entry_id)
+
+
+def _waitlist_query(slot_id: int) -> Select:
+    return select(WaitlistEntry).where(WaitlistEntry.slot_id == slot_id).order_by(WaitlistEntry.entry_id)
+
+
+class WaitlistService:
+    """
+    Лист ожидания занятых слотов: очередь по времени постановки. Когда запись на
+    слот отменяют, AppointmentService.cancel_appointment в той же транзакции
+    записывает первого в очереди и возвращает WaitlistPromotion для уведомления.
+
+    Usage:
+        position = waitlist_service.join_waitlist(slot_id, client_id)
+        ...
+        promotion = appointment_service.cancel_appointment(appointment_id)
+    """
+
+    def __init__(self, engine: DatabaseEngine):
+        self._engine = engine
+
+    def join_waitlist(self, slot_id: int, client_id: int) -> int:
+        """
+        Встать в очередь слота, на который уже есть запись. Возвращает место в очереди,
+        считая с 1. Слот свободен или его нет - ValueError: на свободный слот надо записываться.
+        """
+        with self._engine.session() as session:
+            # Блокировка как у записи и отмены: слот не освободится, пока клиент встаёт в очередь
+            if session.scalars(lock_slot_query(slot_id)).one_or_none() is None:
+                raise ValueError(f"Slot with slot_id = {slot_id} does not exists")
+            if not session.execute(slot_taken_query(slot_id)).one().booked:
+                raise ValueError(f"Slot with slot_id = {slot_id} is free")
+
+            session.execute(_join_query(slot_id, client_id))
+            position = session.execute(_position_query(slot_id, client_id)).scalar_one()
+            session.commit()
+
+        return position
+
+    def leave_waitlist(self, slot_id: int, client_id: int) -> bool:
+        """False - клиента не было в очереди."""
+        with self._engine.session() as session:
+            left = session.execute(_leave_query(slot_id, client_id)).first() is not None
+            session.commit()
+        return left
+
+    def get_waitlist(self, slot_id: int) -> list[WaitlistEntry]:
+        """Очередь слота, первым - тот, кому слот достанется при отмене записи."""
+        with self._engine.read_session() as session:
+            return list(session.scalars(_waitlist_query(slot_id)).all())
+
+
+class AsyncWaitlistService:
+    def __init__(self, engine: AsyncDatabaseEngine):
+        self._engine = engine
+
+    async def join_waitlist(self, slot_id: int, client_id: int) -> int:
+        async with self._engine.session() as session:
+            if (await session.scalars(lock_slot_query(slot_id))).one_or_none() is None:
+                raise ValueError(f"Slot with slot_id = {slot_id} does not exists")
+            if not (await session.execute(slot_taken_query(slot_id))).one().booked:
+                raise ValueError(f"Slot with slot_id = {slot_id} is free")
+
+            await session.execute(_join_query(slot_id, client_id))
+            return (await session.execute(_position_query(slot_id, client_id))).scalar_one()
+
+    async def leave_waitlist(self, slot_id: int, client_id: int) -> bool:
+        async with self._engine.session() as session:
+            return (await session.execute(_leave_query(slot_id, client_id))).first() is not None
+
+    async def get_waitlist(self, slot_id: int) -> list[WaitlistEntry]:
+        async with self._engine.read_session() as session:
+            return list((await session.scalars(_waitlist_query(slot_id))).all())
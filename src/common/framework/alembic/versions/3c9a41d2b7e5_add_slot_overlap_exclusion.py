@@ -0,0 +1,30 @@
+"""Add slot overlap exclusion constraint
+
+Revision ID: 3c9a41d2b7e5
+Revises: 7beee38ed020
+Create Date: 2026-10-18 13:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '3c9a41d2b7e5'
+down_revision: Union[str, Sequence[str], None] = '7beee38ed020'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Ограничение создаёт GiST-индекс по tsrange(start_time, end_time), через него
+    # же работают проверки пересечений в SlotService. Миграция упадёт, если в
+    # таблице уже есть пересекающиеся слоты - их нужно разобрать вручную.
+    op.execute(
+        'ALTER TABLE slot ADD CONSTRAINT ex_slot_no_overlap '
+        'EXCLUDE USING gist (tsrange(start_time, end_time) WITH &&)'
+    )
+
+
+def downgrade() -> None:
+    op.drop_constraint('ex_slot_no_overlap', 'slot', type_='exclude')
@@ -0,0 +1,46 @@
+"""Add recurring slot definitions
+
+Revision ID: 5d0b8e9f13c7
+Revises: a51f0c6e82d4
+Create Date: 2026-10-18 16:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '5d0b8e9f13c7'
+down_revision: Union[str, Sequence[str], None] = 'a51f0c6e82d4'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'slot_recurrence',
+        sa.Column('recurrence_id', sa.INTEGER, primary_key=True, autoincrement=True),
+        sa.Column('weekdays', sa.SMALLINT, nullable=False),
+        sa.Column('start_time', sa.TIME, nullable=False),
+        sa.Column('end_time', sa.TIME, nullable=False),
+        sa.Column('slot_duration_in_minutes', sa.INTEGER, nullable=False),
+        sa.Column('valid_from', sa.DATE, nullable=False),
+        sa.Column('valid_until', sa.DATE, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, nullable=False, default=sa.text('NOW()')),
+        sa.Column('updated_at', sa.TIMESTAMP, onupdate=sa.text('NOW()'))
+    )
+    # Из какого правила создан слот (при записи на повторяющийся слот)
+    op.add_column(
+        'slot',
+        sa.Column(
+            'recurrence_id',
+            sa.INTEGER,
+            sa.ForeignKey('slot_recurrence.recurrence_id', ondelete='SET NULL')
+        )
+    )
+
+
+def downgrade() -> None:
+    op.drop_column('slot', 'recurrence_id')
+    op.drop_table('slot_recurrence')
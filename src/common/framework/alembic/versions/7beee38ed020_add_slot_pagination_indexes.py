@@ -0,0 +1,35 @@
+"""Add slot pagination indexes
+
+Revision ID: 7beee38ed020
+Revises: 8e5820ff6e26
+Create Date: 2026-10-18 12:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = '7beee38ed020'
+down_revision: Union[str, Sequence[str], None] = '8e5820ff6e26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Keyset-пагинация по (start_time, slot_id) и по времени суток
+    op.create_index('ix_slot_start_time_slot_id', 'slot', ['start_time', 'slot_id'])
+    op.create_index(
+        'ix_slot_time_of_day',
+        'slot',
+        [sa.text('CAST(start_time AS TIME)'), 'start_time', 'slot_id']
+    )
+    # Фильтр по статусу записей на слот
+    op.create_index('ix_appointment_slot_id_status', 'appointment', ['slot_id', 'status'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_appointment_slot_id_status', table_name='appointment')
+    op.drop_index('ix_slot_time_of_day', table_name='slot')
+    op.drop_index('ix_slot_start_time_slot_id', table_name='slot')
@@ -0,0 +1,38 @@
+"""Add schedule materialization columns
+
+Revision ID: a51f0c6e82d4
+Revises: 3c9a41d2b7e5
+Create Date: 2026-10-18 14:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'a51f0c6e82d4'
+down_revision: Union[str, Sequence[str], None] = '3c9a41d2b7e5'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column(
+        'schedule',
+        sa.Column('slot_duration_in_minutes', sa.INTEGER, nullable=False, server_default=sa.text('60'))
+    )
+    # Когда по строке расписания последний раз создавались слоты
+    op.add_column('schedule', sa.Column('materialized_at', sa.TIMESTAMP))
+    op.create_index(
+        'ix_schedule_active_date',
+        'schedule',
+        ['date'],
+        postgresql_where=sa.text('is_active = 1')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_schedule_active_date', table_name='schedule')
+    op.drop_column('schedule', 'materialized_at')
+    op.drop_column('schedule', 'slot_duration_in_minutes')
@@ -0,0 +1,33 @@
+"""Add unique index on active appointment slot
+
+Revision ID: b7d3e1a4c9f2
+Revises: 5d0b8e9f13c7
+Create Date: 2026-10-18 18:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d3e1a4c9f2'
+down_revision: Union[str, Sequence[str], None] = '5d0b8e9f13c7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # На слот не больше одной неотменённой записи. Миграция упадёт, если в
+    # таблице уже есть двойные записи - их нужно разобрать вручную.
+    op.create_index(
+        'ux_appointment_active_slot_id',
+        'appointment',
+        ['slot_id'],
+        unique=True,
+        postgresql_where=sa.text("status <> 'CANCELLED'")
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ux_appointment_active_slot_id', table_name='appointment')
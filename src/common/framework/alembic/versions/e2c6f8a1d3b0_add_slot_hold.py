@@ -0,0 +1,35 @@
+"""Add temporary slot holds
+
+Revision ID: e2c6f8a1d3b0
+Revises: b7d3e1a4c9f2
+Create Date: 2026-10-18 19:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'e2c6f8a1d3b0'
+down_revision: Union[str, Sequence[str], None] = 'b7d3e1a4c9f2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'slot_hold',
+        sa.Column('hold_id', sa.INTEGER, primary_key=True, autoincrement=True),
+        sa.Column('slot_id', sa.INTEGER, sa.ForeignKey('slot.slot_id', ondelete='CASCADE'), nullable=False, unique=True),
+        sa.Column('holder_tg_id', sa.INTEGER, nullable=False),
+        sa.Column('expires_at', sa.TIMESTAMP, nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, nullable=False, server_default=sa.text('NOW()'))
+    )
+    # Очистка истёкших броней пачками по expires_at
+    op.create_index('ix_slot_hold_expires_at', 'slot_hold', ['expires_at'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_slot_hold_expires_at', table_name='slot_hold')
+    op.drop_table('slot_hold')
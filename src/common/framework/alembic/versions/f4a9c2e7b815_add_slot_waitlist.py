@@ -0,0 +1,35 @@
+"""Add slot waitlist
+
+Revision ID: f4a9c2e7b815
+Revises: e2c6f8a1d3b0
+Create Date: 2026-10-18 20:00:00.000000
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+# revision identifiers, used by Alembic.
+revision: str = 'f4a9c2e7b815'
+down_revision: Union[str, Sequence[str], None] = 'e2c6f8a1d3b0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'slot_waitlist',
+        sa.Column('entry_id', sa.INTEGER, primary_key=True, autoincrement=True),
+        sa.Column('slot_id', sa.INTEGER, sa.ForeignKey('slot.slot_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('client_id', sa.INTEGER, sa.ForeignKey('client.client_id', ondelete='CASCADE'), nullable=False),
+        sa.Column('created_at', sa.TIMESTAMP, nullable=False, server_default=sa.text('NOW()')),
+        sa.UniqueConstraint('slot_id', 'client_id', name='uq_slot_waitlist_slot_id_client_id')
+    )
+    # Первый в очереди слота без просмотра всей таблицы
+    op.create_index('ix_slot_waitlist_slot_id_entry_id', 'slot_waitlist', ['slot_id', 'entry_id'])
+
+
+def downgrade() -> None:
+    op.drop_index('ix_slot_waitlist_slot_id_entry_id', table_name='slot_waitlist')
+    op.drop_table('slot_waitlist')
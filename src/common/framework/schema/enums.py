@@ -0,0 +1,9 @@
+from enum import Enum
+
+
+class AppointmentStatus(Enum):
+    PENDING = 'pending' # Ожидает подтверждения
+    CONFIRMED = 'confirmed' # Подтверждена
+    COMPLETED = 'completed' # Завершена
+    CANCELLED = 'cancelled' # Отменена
+    RESCHEDULED = 'rescheduled' # Перенесена
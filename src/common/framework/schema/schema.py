@@ -1,5 +1,8 @@
 from sqlalchemy import MetaData
-from sqlalchemy  import Table, Column, INTEGER, VARCHAR, TIMESTAMP, DATE, TIME, SMALLINT, TEXT, Enum, text, ForeignKey
+from sqlalchemy  import Table, Column, INTEGER, VARCHAR, TIMESTAMP, DATE, TIME, SMALLINT, TEXT, Enum, text, ForeignKey, Index, UniqueConstraint, cast, func
+from sqlalchemy.dialects.postgresql import ExcludeConstraint
+
+from .enums import AppointmentStatus
 
 metadata = MetaData()
 
@@ -34,6 +37,26 @@ schedule= Table(
     Column('start_time', TIME, nullable=False),
     Column('end_time', TIME, nullable=False),
     Column('is_active', SMALLINT, nullable=False),
+    Column('slot_duration_in_minutes', INTEGER, nullable=False, server_default=text('60')),
+    Column('materialized_at', TIMESTAMP),
+    Column('created_at', TIMESTAMP, nullable=False, default=text('NOW()')),
+    Column('updated_at', TIMESTAMP, onupdate=text('NOW()'))
+)
+
+Index('ix_schedule_active_date', schedule.c.date, postgresql_where=schedule.c.is_active == 1)
+
+# Повторяющиеся слоты: хранятся одним правилом и разворачиваются при чтении.
+# weekdays - битовая маска дней недели, бит 0 - понедельник.
+slot_recurrence = Table(
+    'slot_recurrence',
+    metadata,
+    Column('recurrence_id', INTEGER, primary_key=True, autoincrement=True),
+    Column('weekdays', SMALLINT, nullable=False),
+    Column('start_time', TIME, nullable=False),
+    Column('end_time', TIME, nullable=False),
+    Column('slot_duration_in_minutes', INTEGER, nullable=False),
+    Column('valid_from', DATE, nullable=False),
+    Column('valid_until', DATE, nullable=False),
     Column('created_at', TIMESTAMP, nullable=False, default=text('NOW()')),
     Column('updated_at', TIMESTAMP, onupdate=text('NOW()'))
 )
@@ -45,10 +68,19 @@ slot = Table(
     Column('start_time', TIMESTAMP, nullable=False),
     Column('end_time', TIMESTAMP, nullable=False),
     Column('duration_in_minutes', INTEGER, nullable=False),
+    Column('recurrence_id', INTEGER, ForeignKey('slot_recurrence.recurrence_id', ondelete='SET NULL')),
     Column('created_at', TIMESTAMP, nullable=False, default=text('NOW()')),
-    Column('updated_at', TIMESTAMP, onupdate=text('NOW()'))
+    Column('updated_at', TIMESTAMP, onupdate=text('NOW()')),
+    ExcludeConstraint(
+        (func.tsrange(text('start_time'), text('end_time')), '&&'),
+        name='ex_slot_no_overlap',
+        using='gist'
+    )
 )
 
+Index('ix_slot_start_time_slot_id', slot.c.start_time, slot.c.slot_id)
+Index('ix_slot_time_of_day', cast(slot.c.start_time, TIME), slot.c.start_time, slot.c.slot_id)
+
 appointment = Table(
     'appointment',
     metadata,
@@ -58,15 +90,55 @@ appointment = Table(
     Column('slot_id', INTEGER, ForeignKey('slot.slot_id', ondelete='SET NULL')),
     Column('description', TEXT),
     Column('location', VARCHAR(512)),
-    Column('status', Enum, nullable=False),
+    Column('status', Enum(AppointmentStatus, name='appointmentstatusenum'), nullable=False),
     Column('created_at', TIMESTAMP, nullable=False, default=text('NOW()')),
     Column('updated_at', TIMESTAMP, onupdate=text('NOW()'))
 )
 
+Index('ix_appointment_slot_id_status', appointment.c.slot_id, appointment.c.status)
+# Не больше одной неотменённой записи на слот
+Index(
+    'ux_appointment_active_slot_id',
+    appointment.c.slot_id,
+    unique=True,
+    postgresql_where=appointment.c.status != AppointmentStatus.CANCELLED
+)
+
+# Временная бронь слота, пока клиент оформляет запись: не больше одной на слот,
+# истёкшие не действуют и удаляются фоновой задачей по ix_slot_hold_expires_at.
+slot_hold = Table(
+    'slot_hold',
+    metadata,
+    Column('hold_id', INTEGER, primary_key=True, autoincrement=True),
+    Column('slot_id', INTEGER, ForeignKey('slot.slot_id', ondelete='CASCADE'), nullable=False, unique=True),
+    Column('holder_tg_id', INTEGER, nullable=False),
+    Column('expires_at', TIMESTAMP, nullable=False),
+    Column('created_at', TIMESTAMP, nullable=False, default=text('NOW()'))
+)
+
+Index('ix_slot_hold_expires_at', slot_hold.c.expires_at)
+
+# Лист ожидания занятых слотов: очередь по entry_id, при отмене записи слот
+# достаётся первому в очереди клиенту (AppointmentService.cancel_appointment).
+slot_waitlist = Table(
+    'slot_waitlist',
+    metadata,
+    Column('entry_id', INTEGER, primary_key=True, autoincrement=True),
+    Column('slot_id', INTEGER, ForeignKey('slot.slot_id', ondelete='CASCADE'), nullable=False),
+    Column('client_id', INTEGER, ForeignKey('client.client_id', ondelete='CASCADE'), nullable=False),
+    Column('created_at', TIMESTAMP, nullable=False, default=text('NOW()')),
+    UniqueConstraint('slot_id', 'client_id', name='uq_slot_waitlist_slot_id_client_id')
+)
+
+Index('ix_slot_waitlist_slot_id_entry_id', slot_waitlist.c.slot_id, slot_waitlist.c.entry_id)
+
 __all__ = [
     'user',
     'client',
     'schedule',
+    'slot_recurrence',
     'slot',
     'appointment',
+    'slot_hold',
+    'slot_waitlist',
 ]
@@ -1,10 +1,38 @@
 import os
+from typing import Optional
 
 class EnvConfig:
 
     @staticmethod
-    def get_str(name: str) -> str:
+    def get_str(name: str, default: Optional[str] = None) -> str:
         env = os.getenv(name)
         if env is None:
-            raise RuntimeError(f'env {env} not found')
+            if default is None:
+                raise RuntimeError(f'env {name} not found')
+            return default
         return env
+
+    @staticmethod
+    def get_int(name: str, default: Optional[int] = None) -> int:
+        env = os.getenv(name)
+        if env is None:
+            if default is None:
+                raise RuntimeError(f'env {name} not found')
+            return default
+        return int(env)
+
+    @staticmethod
+    def get_float(name: str, default: Optional[float] = None) -> float:
+        env = os.getenv(name)
+        if env is None:
+            if default is None:
+                raise RuntimeError(f'env {name} not found')
+            return default
+        return float(env)
+
+    @staticmethod
+    def get_list(name: str, separator: str = ',') -> list[str]:
+        env = os.getenv(name)
+        if env is None:
+            return []
+        return [item.strip() for item in env.split(separator) if item.strip()]
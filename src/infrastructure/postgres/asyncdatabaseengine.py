@@ -0,0 +1,191 @@
+import logging
+from contextlib import asynccontextmanager
+from typing import Optional, AsyncIterator
+from sqlalchemy import text, make_url, URL
+from sqlalchemy.exc import OperationalError
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+
+from src.infrastructure.env.envconfig import EnvConfig
+from src.infrastructure.postgres.databaseengine import DEFAULT_CONN_OPTIONS, DEFAULT_REPLICA_FRESHNESS_S, DatabaseEngine
+from src.infrastructure.postgres.notifications import ChangeListener
+from src.infrastructure.postgres.pooltelemetry import PoolTelemetry, PoolSnapshot, TimedAsyncAdaptedQueuePool
+from src.infrastructure.postgres.querytelemetry import StatementStats
+from src.infrastructure.postgres.replicarouter import ReplicaRouter, WriteTrackingSession, has_writes
+from src.infrastructure.postgres.unitofwork import AsyncUnitOfWork, get_current_unit_of_work
+
+ASYNC_DRIVER = 'postgresql+asyncpg'
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncDatabaseEngine:
+    """
+    Асинхронный аналог DatabaseEngine поверх asyncpg.
+
+    Использует тот же PLANIFY_DB_DSN и те же настройки пула, драйвер в DSN
+    подменяется на asyncpg.
+    """
+
+    def __init__(self):
+        conn_str: str = EnvConfig.get_str('PLANIFY_DB_DSN')
+        replica_conn_strs: list[str] = EnvConfig.get_list('PLANIFY_DB_REPLICA_DSNS')
+        self._engine: Optional[AsyncEngine] = None
+        self._session_factory: Optional[async_sessionmaker] = None
+        self._replica_engines: list[AsyncEngine] = []
+        self._pool_telemetry = PoolTelemetry()
+        self._query_telemetry = DatabaseEngine.create_query_telemetry()
+        self.notifications = DatabaseEngine.create_notifier()
+
+        self._init_engine(conn_str)
+        self._replica_router: ReplicaRouter[async_sessionmaker] = ReplicaRouter(
+            [self._init_replica(replica_conn_str) for replica_conn_str in replica_conn_strs],
+            EnvConfig.get_float('PLANIFY_DB_REPLICA_FRESHNESS_S', DEFAULT_REPLICA_FRESHNESS_S)
+        )
+
+    @staticmethod
+    def to_async_url(conn_str: str) -> URL:
+        return make_url(conn_str).set(drivername=ASYNC_DRIVER)
+
+    def _init_engine(self, conn_str: str) -> None:
+        try:
+            self._engine = create_async_engine(
+                self.to_async_url(conn_str),
+                poolclass=TimedAsyncAdaptedQueuePool,
+                **DEFAULT_CONN_OPTIONS
+            )
+            self._pool_telemetry.attach(self._engine.pool)
+            self._query_telemetry.attach(self._engine.sync_engine)
+
+            self._session_factory = async_sessionmaker(
+                bind=self._engine,
+                sync_session_class=WriteTrackingSession,
+                autoflush=False,
+                expire_on_commit=False
+            )
+            logger.debug('Async database engine initialize successfully')
+        except Exception as e:
+            logger.error(f'Failed to initialize async database engine: {e}')
+            raise
+
+    def _init_replica(self, conn_str: str) -> async_sessionmaker:
+        engine = create_async_engine(self.to_async_url(conn_str), **DEFAULT_CONN_OPTIONS)
+        self._query_telemetry.attach(engine.sync_engine)
+        self._replica_engines.append(engine)
+
+        return async_sessionmaker(
+            bind=engine,
+            autoflush=False,
+            expire_on_commit=False
+        )
+
+    async def test_connection(self) -> None:
+        if not self._engine:
+            raise RuntimeError('Engine not initialized')
+
+        try:
+            async with self._engine.connect() as conn:
+                await conn.execute(text('SELECT 1'))
+            logger.debug('Database connection passed')
+        except OperationalError as e:
+            logger.error(f'Database connection failed: {e}')
+            raise
+
+    @property
+    def engine(self) -> AsyncEngine:
+        if not self._engine:
+            raise RuntimeError('Database engine not initialized')
+        return self._engine
+
+    def change_listener(self) -> ChangeListener:
+        """
+        Слушатель канала notifications на primary. Запускается фоновой задачей,
+        соединение для LISTEN открывается отдельно от пула.
+        """
+        dsn = self.engine.url.set(drivername='postgresql').render_as_string(hide_password=False)
+        return ChangeListener(dsn, self.notifications)
+
+    def pool_stats(self, reset: bool = False) -> PoolSnapshot:
+        """Снимок метрик пула соединений, см. DatabaseEngine.pool_stats."""
+        return self._pool_telemetry.snapshot(reset)
+
+    def query_stats(self, reset: bool = False) -> list[StatementStats]:
+        """Статистика времени запросов, см. DatabaseEngine.query_stats."""
+        return self._query_telemetry.snapshot(reset)
+
+    @asynccontextmanager
+    async def session(self) -> AsyncIterator[AsyncSession]:
+        """
+         Async context manager для работы с сессией базы данных.
+
+         Usage:
+             async with db_engine.session() as session:
+                 user = (await session.scalars(select(User))).first()
+         """
+        unit_of_work = self._current_unit_of_work()
+        if unit_of_work is not None:
+            async with unit_of_work.transaction() as session:
+                yield session
+            return
+
+        if not self._session_factory:
+            raise RuntimeError("Session factory not initialized")
+
+        session = self._session_factory()
+        try:
+            yield session
+            await session.commit()
+            logger.debug("Session committed successfully")
+        except Exception as e:
+            await session.rollback()
+            logger.error(f"Session rollback due to error: {e}")
+            raise
+        finally:
+            if has_writes(session.sync_session):
+                self._replica_router.record_write()
+            await session.close()
+
+    @asynccontextmanager
+    async def read_session(self) -> AsyncIterator[AsyncSession]:
+        """Async context manager для читающих запросов, см. DatabaseEngine.read_session."""
+        unit_of_work = self._current_unit_of_work()
+        if unit_of_work is not None:
+            async with unit_of_work.transaction() as session:
+                yield session
+            return
+
+        replica_factory = self._replica_router.choose()
+        if replica_factory is None:
+            async with self.session() as session:
+                yield session
+            return
+
+        session = replica_factory()
+        try:
+            yield session
+        finally:
+            await session.close()
+
+    def begin_unit_of_work(self) -> AsyncUnitOfWork:
+        """
+        Открыть сессию и привязать её к текущему контексту до вызова finish().
+
+        Все session()/read_session() этого движка внутри контекста будут
+        работать в ней, см. AsyncUnitOfWork.
+        """
+        if not self._session_factory:
+            raise RuntimeError("Session factory not initialized")
+
+        return AsyncUnitOfWork(self, self._session_factory(), self._replica_router.record_write)
+
+    def _current_unit_of_work(self) -> Optional[AsyncUnitOfWork]:
+        unit_of_work = get_current_unit_of_work()
+        if unit_of_work is None or unit_of_work.engine is not self:
+            return None
+        return unit_of_work
+
+    async def dispose(self) -> None:
+        """Закрыть все соединения и очистить ресурсы."""
+        if self._engine:
+            await self._engine.dispose()
+        for replica_engine in self._replica_engines:
+            await replica_engine.dispose()
@@ -6,6 +6,10 @@ from sqlalchemy.exc import OperationalError
 from sqlalchemy.orm import sessionmaker, Session
 
 from src.infrastructure.env.envconfig import EnvConfig
+from src.infrastructure.postgres.notifications import DEFAULT_CHANNEL, ChangeNotifier
+from src.infrastructure.postgres.pooltelemetry import PoolTelemetry, PoolSnapshot, TimedQueuePool
+from src.infrastructure.postgres.querytelemetry import QueryTelemetry, StatementStats
+from src.infrastructure.postgres.replicarouter import ReplicaRouter, WriteTrackingSession, has_writes
 
 DEFAULT_CONN_OPTIONS = {
     'pool_size': 5,
@@ -15,26 +19,41 @@ DEFAULT_CONN_OPTIONS = {
     'echo': False
 }
 
+DEFAULT_SLOW_QUERY_MS = 200
+DEFAULT_REPLICA_FRESHNESS_S = 5
+
 logger = logging.getLogger(__name__)
 
 class DatabaseEngine:
 
     def __init__(self,):
         conn_str: str = EnvConfig.get_str('PLANIFY_DB_DSN')
+        replica_conn_strs: list[str] = EnvConfig.get_list('PLANIFY_DB_REPLICA_DSNS')
         self._engine: Optional[Engine] = None
         self._session_factory: Optional[sessionmaker] = None
+        self._replica_engines: list[Engine] = []
+        self._pool_telemetry = PoolTelemetry()
+        self._query_telemetry = self.create_query_telemetry()
+        self.notifications = self.create_notifier()
 
         self._init_engine(conn_str)
+        self._replica_router: ReplicaRouter[sessionmaker] = ReplicaRouter(
+            [self._init_replica(replica_conn_str) for replica_conn_str in replica_conn_strs],
+            EnvConfig.get_float('PLANIFY_DB_REPLICA_FRESHNESS_S', DEFAULT_REPLICA_FRESHNESS_S)
+        )
 
 
     def _init_engine(self, conn_str: str) -> None:
         try:
-            self._engine = create_engine(conn_str, **DEFAULT_CONN_OPTIONS)
+            self._engine = create_engine(conn_str, poolclass=TimedQueuePool, **DEFAULT_CONN_OPTIONS)
+            self._pool_telemetry.attach(self._engine.pool)
+            self._query_telemetry.attach(self._engine)
 
             self._test_connection()
 
             self._session_factory = sessionmaker(
                 bind=self._engine,
+                class_=WriteTrackingSession,
                 autocommit=False,
                 autoflush=False,
                 expire_on_commit=False
@@ -44,6 +63,18 @@ class DatabaseEngine:
             logger.error(f'Failed to initialize database engine: {e}')
             raise
 
+    def _init_replica(self, conn_str: str) -> sessionmaker:
+        engine = create_engine(conn_str, **DEFAULT_CONN_OPTIONS)
+        self._query_telemetry.attach(engine)
+        self._replica_engines.append(engine)
+
+        return sessionmaker(
+            bind=engine,
+            autocommit=False,
+            autoflush=False,
+            expire_on_commit=False
+        )
+
     def _test_connection(self) -> None:
         if not self._engine:
             raise RuntimeError('Engine not initialized')
@@ -62,6 +93,38 @@ class DatabaseEngine:
             raise RuntimeError('Database engine not initialized')
         return self._engine
 
+    def pool_stats(self, reset: bool = False) -> PoolSnapshot:
+        """
+        Снимок метрик пула соединений.
+
+        При reset=True оконные счётчики (пики, ожидания, таймауты) обнуляются,
+        чтобы следующий снимок описывал только новый интервал.
+        """
+        return self._pool_telemetry.snapshot(reset)
+
+    def query_stats(self, reset: bool = False) -> list[StatementStats]:
+        """
+        Гистограммы времени выполнения по нормализованным SQL-запросам,
+        отсортированные по суммарному времени.
+        """
+        return self._query_telemetry.snapshot(reset)
+
+    @staticmethod
+    def create_query_telemetry() -> QueryTelemetry:
+        """
+        Порог медленного запроса задаётся PLANIFY_DB_SLOW_QUERY_MS,
+        доля медленных SELECT для EXPLAIN ANALYZE - PLANIFY_DB_EXPLAIN_SAMPLE_RATE (по умолчанию выключено).
+        """
+        return QueryTelemetry(
+            slow_query_ms=EnvConfig.get_int('PLANIFY_DB_SLOW_QUERY_MS', DEFAULT_SLOW_QUERY_MS),
+            explain_sample_rate=EnvConfig.get_float('PLANIFY_DB_EXPLAIN_SAMPLE_RATE', 0.0)
+        )
+
+    @staticmethod
+    def create_notifier() -> ChangeNotifier:
+        """Канал NOTIFY об изменениях задаётся PLANIFY_DB_NOTIFY_CHANNEL, общий для всех процессов бота."""
+        return ChangeNotifier(EnvConfig.get_str('PLANIFY_DB_NOTIFY_CHANNEL', DEFAULT_CHANNEL))
+
     @contextmanager
     def session(self) -> Iterator[Session]:
         """
@@ -83,6 +146,33 @@ class DatabaseEngine:
             session.rollback()
             logger.error(f"Session rollback due to error: {e}")
             raise
+        finally:
+            if has_writes(session):
+                self._replica_router.record_write()
+            session.close()
+
+    @contextmanager
+    def read_session(self) -> Iterator[Session]:
+        """
+         Context manager для читающих запросов.
+
+         Если настроены реплики (PLANIFY_DB_REPLICA_DSNS), сессия открывается на одной
+         из них. Сразу после записи тем же пользователем (см. actor_scope) чтение
+         идёт на primary, пока не истечёт PLANIFY_DB_REPLICA_FRESHNESS_S.
+
+         Usage:
+             with db_engine.read_session() as session:
+                 slots = session.scalars(select(Slot)).all()
+         """
+        replica_factory = self._replica_router.choose()
+        if replica_factory is None:
+            with self.session() as session:
+                yield session
+            return
+
+        session = replica_factory()
+        try:
+            yield session
         finally:
             session.close()
 
@@ -90,6 +180,8 @@ class DatabaseEngine:
         """Закрыть все соединения и очистить ресурсы."""
         if self._engine:
             self._engine.dispose()
+        for replica_engine in self._replica_engines:
+            replica_engine.dispose()
 
     def __exit__(self, exc_type, exc_val, exc_tb) -> None:
         self.dispose()
\ No newline at end of file
@@ -0,0 +1,183 @@
+import asyncio
+import logging
+import threading
+from dataclasses import dataclass
+from datetime import date
+from typing import Callable, Iterable, Optional
+
+import asyncpg
+from sqlalchemy import select, func, literal, Select, String, ColumnElement
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHANNEL = 'planify_changes'
+DEFAULT_RECONNECT_DELAY_S = 5.0
+
+# Сущности в событиях. ALL - "сбросить всё": слушатель переподключился и мог пропустить события
+SLOT = 'slot'
+RECURRENCE = 'recurrence'
+APPOINTMENT = 'appointment'
+CLIENT = 'client'
+USER = 'user'
+ALL = '*'
+
+SEPARATOR = ':'
+
+
+@dataclass(frozen=True)
+class ChangeEvent:
+    """
+    Изменение сущности, о котором сообщается другим процессам.
+
+    entity_id - ключ, по которому сущность кешируется (для user и client - tg id),
+    None, если изменилось сразу много сущностей. day - день слота, к которому
+    относится изменение, если он есть.
+    """
+    entity: str
+    entity_id: Optional[int] = None
+    day: Optional[date] = None
+
+    @property
+    def payload(self) -> str:
+        """Компактный payload NOTIFY: 'slot:42:2025-10-15', 'slot::2025-10-15', 'user:1001:'."""
+        return SEPARATOR.join((
+            self.entity,
+            '' if self.entity_id is None else str(self.entity_id),
+            '' if self.day is None else self.day.isoformat()
+        ))
+
+    @staticmethod
+    def from_payload(payload: str) -> 'ChangeEvent':
+        entity, entity_id, day = payload.split(SEPARATOR)
+        return ChangeEvent(
+            entity,
+            int(entity_id) if entity_id else None,
+            date.fromisoformat(day) if day else None
+        )
+
+
+def slot_events(slots: Iterable[tuple[Optional[int], date]]) -> list[ChangeEvent]:
+    """
+    События по парам (slot_id, день): одно событие на день.
+
+    Если в дне изменился один слот - событие с его id, иначе без id, чтобы
+    массовые операции не рассылали по сообщению на слот.
+    """
+    by_day: dict[date, set[Optional[int]]] = {}
+    for slot_id, day in slots:
+        by_day.setdefault(day, set()).add(slot_id)
+    return [
+        ChangeEvent(SLOT, next(iter(slot_ids)) if len(slot_ids) == 1 else None, day)
+        for day, slot_ids in sorted(by_day.items())
+    ]
+
+
+def payload_expression(entity: str, entity_id: Optional[int], day: ColumnElement) -> ColumnElement[str]:
+    """Тот же payload, что у ChangeEvent, но день дописывается в SQL - когда его знает только БД."""
+    return literal(ChangeEvent(entity, entity_id).payload, String).concat(func.to_char(day, 'YYYY-MM-DD'))
+
+
+class ChangeNotifier:
+    """
+    Канал уведомлений об изменениях, который несёт с собой движок БД.
+
+    Сервисы добавляют query(...) в транзакцию своей записи: Postgres доставляет
+    NOTIFY только после commit и только если он прошёл. Локальные кеши
+    подписываются через subscribe и получают события из ChangeListener - в том
+    числе о собственных записях процесса, поэтому обработчик должен быть
+    идемпотентным.
+    """
+
+    def __init__(self, channel: str = DEFAULT_CHANNEL):
+        self.channel = channel
+        self._lock = threading.Lock()
+        self._subscribers: list[Callable[[ChangeEvent], None]] = []
+
+    def query(self, events: Iterable[ChangeEvent]) -> Optional[Select]:
+        """SELECT pg_notify(...) на каждое событие, None, если событий нет."""
+        notifications = [self.notify(event.payload) for event in events]
+        return select(*notifications) if notifications else None
+
+    def notify(self, payload: ColumnElement[str] | str) -> ColumnElement:
+        """Вызов pg_notify на канал движка, например для payload_expression."""
+        return func.pg_notify(self.channel, payload)
+
+    def subscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        """Повторная подписка того же обработчика ничего не меняет."""
+        with self._lock:
+            if callback not in self._subscribers:
+                self._subscribers.append(callback)
+
+    def unsubscribe(self, callback: Callable[[ChangeEvent], None]) -> None:
+        with self._lock:
+            if callback in self._subscribers:
+                self._subscribers.remove(callback)
+
+    def dispatch(self, event: ChangeEvent) -> None:
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for callback in subscribers:
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f'Change subscriber {callback!r} failed on {event!r}: {e}')
+
+    def dispatch_payload(self, payload: str) -> None:
+        try:
+            event = ChangeEvent.from_payload(payload)
+        except ValueError:
+            logger.warning(f'Ignoring malformed change notification {payload!r}')
+            return
+        self.dispatch(event)
+
+
+class ChangeListener:
+    """
+    LISTEN на канал notifier в отдельном соединении asyncpg (не из пула: оно
+    занято всё время работы). Полученные события передаются в notifier.dispatch.
+
+    После каждого (пере)подключения рассылается событие ALL: пока соединения не
+    было, уведомления терялись, и кешам надо начать с чистого листа.
+
+    Usage:
+        task = asyncio.create_task(ChangeListener(dsn, engine.notifications).run())
+    """
+
+    def __init__(self, dsn: str, notifier: ChangeNotifier, reconnect_delay_s: float = DEFAULT_RECONNECT_DELAY_S):
+        self._dsn = dsn
+        self._notifier = notifier
+        self._reconnect_delay_s = reconnect_delay_s
+        self._listening = asyncio.Event()
+
+    async def wait_listening(self) -> None:
+        """Дождаться, пока LISTEN выполнен, например в тестах."""
+        await self._listening.wait()
+
+    async def run(self) -> None:
+        while True:
+            try:
+                await self._listen_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f'Change listener on {self._notifier.channel!r} failed: {e}')
+            self._listening.clear()
+            await asyncio.sleep(self._reconnect_delay_s)
+
+    async def _listen_once(self) -> None:
+        connection = await asyncpg.connect(self._dsn)
+        closed = asyncio.Event()
+        try:
+            connection.add_termination_listener(lambda _: closed.set())
+            await connection.add_listener(self._notifier.channel, self._on_notification)
+            self._notifier.dispatch(ChangeEvent(ALL))
+            self._listening.set()
+            logger.info(f'Listening for changes on {self._notifier.channel!r}')
+            await closed.wait()
+            logger.warning(f'Change listener connection on {self._notifier.channel!r} closed')
+        finally:
+            if not connection.is_closed():
+                await connection.close()
+
+    def _on_notification(self, connection: asyncpg.Connection, pid: int, channel: str, payload: str) -> None:
+        self._notifier.dispatch_payload(payload)
@@ -0,0 +1,164 @@
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Optional, Any
+
+from sqlalchemy import event
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import Pool, QueuePool, AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class PoolSnapshot:
+    pool_size: int
+    max_overflow: int
+    checked_out: int
+    overflow: int
+    open_connections: int
+    peak_checked_out: int
+    peak_overflow: int
+    checkouts: int
+    avg_wait_ms: float
+    max_wait_ms: float
+    timeouts: int
+    oldest_connection_age_s: float
+
+    def format(self) -> str:
+        return (
+            f'checked_out={self.checked_out}/{self.pool_size}+{self.max_overflow} '
+            f'peak={self.peak_checked_out} overflow={self.overflow} peak_overflow={self.peak_overflow} '
+            f'open={self.open_connections} checkouts={self.checkouts} '
+            f'avg_wait={self.avg_wait_ms:.1f}ms max_wait={self.max_wait_ms:.1f}ms '
+            f'timeouts={self.timeouts} oldest_conn={self.oldest_connection_age_s:.0f}s'
+        )
+
+
+class PoolTelemetry:
+    """
+    Метрики пула соединений, собираемые через события пула SQLAlchemy.
+
+    Время ожидания соединения меряется в TimedQueuePool._do_get, всё остальное
+    (число выданных соединений, overflow, возраст соединений) - обработчиками
+    событий connect/checkout/close/detach.
+
+    Счётчики пиков, ожиданий и таймаутов накапливаются с момента последнего
+    snapshot(reset=True), текущие значения берутся из самого пула.
+    """
+
+    def __init__(self):
+        self._pool: Optional[Pool] = None
+        self._lock = threading.Lock()
+        self._connections: dict[int, float] = {}
+        self._reset_window()
+
+    def attach(self, pool: Pool) -> None:
+        if isinstance(pool, _TimedPoolMixin):
+            pool.telemetry = self
+        else:
+            logger.warning(f'Pool {type(pool).__name__} does not report checkout wait time')
+
+        event.listen(pool, 'connect', self._on_connect)
+        event.listen(pool, 'checkout', self._on_checkout)
+        event.listen(pool, 'close', self._on_close)
+        event.listen(pool, 'detach', self._on_close)
+        self._pool = pool
+
+    def record_wait(self, wait_ms: float) -> None:
+        with self._lock:
+            self._checkouts += 1
+            self._wait_total_ms += wait_ms
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+
+    def record_timeout(self, wait_ms: float) -> None:
+        with self._lock:
+            self._timeouts += 1
+            self._wait_max_ms = max(self._wait_max_ms, wait_ms)
+        logger.warning(f'Connection pool checkout timed out after {wait_ms:.0f} ms')
+
+    def snapshot(self, reset: bool = False) -> PoolSnapshot:
+        pool = self._current_pool()
+        now = time.monotonic()
+
+        with self._lock:
+            oldest = min(self._connections.values(), default=now)
+            snapshot = PoolSnapshot(
+                pool_size=pool.size(),
+                max_overflow=pool._max_overflow,
+                checked_out=pool.checkedout(),
+                overflow=max(pool.overflow(), 0),
+                open_connections=len(self._connections),
+                peak_checked_out=self._peak_checked_out,
+                peak_overflow=self._peak_overflow,
+                checkouts=self._checkouts,
+                avg_wait_ms=self._wait_total_ms / self._checkouts if self._checkouts else 0.0,
+                max_wait_ms=self._wait_max_ms,
+                timeouts=self._timeouts,
+                oldest_connection_age_s=now - oldest
+            )
+            if reset:
+                self._reset_window()
+
+        return snapshot
+
+    def _current_pool(self) -> QueuePool:
+        if self._pool is None:
+            raise RuntimeError('Pool telemetry is not attached')
+        return self._pool
+
+    def _reset_window(self) -> None:
+        self._checkouts = 0
+        self._wait_total_ms = 0.0
+        self._wait_max_ms = 0.0
+        self._timeouts = 0
+        self._peak_checked_out = 0
+        self._peak_overflow = 0
+
+    def _on_connect(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self._connections[id(connection_record)] = time.monotonic()
+
+    def _on_checkout(self, dbapi_connection: Any, connection_record: Any, connection_proxy: Any) -> None:
+        pool = self._current_pool()
+        checked_out = pool.checkedout()
+        with self._lock:
+            self._peak_checked_out = max(self._peak_checked_out, checked_out)
+            self._peak_overflow = max(self._peak_overflow, checked_out - pool.size())
+
+    def _on_close(self, dbapi_connection: Any, connection_record: Any) -> None:
+        with self._lock:
+            self._connections.pop(id(connection_record), None)
+
+
+class _TimedPoolMixin:
+    telemetry: Optional[PoolTelemetry] = None
+
+    def _do_get(self) -> Any:
+        started = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except PoolTimeoutError:
+            if self.telemetry:
+                self.telemetry.record_timeout((time.perf_counter() - started) * 1000)
+            raise
+
+        if self.telemetry:
+            self.telemetry.record_wait((time.perf_counter() - started) * 1000)
+        return record
+
+    def recreate(self) -> Pool:
+        pool = super().recreate()
+        pool.telemetry = self.telemetry
+        if self.telemetry:
+            self.telemetry._pool = pool
+        return pool
+
+
+class TimedQueuePool(_TimedPoolMixin, QueuePool):
+    pass
+
+
+class TimedAsyncAdaptedQueuePool(_TimedPoolMixin, AsyncAdaptedQueuePool):
+    pass
@@ -0,0 +1,204 @@
+import bisect
+import logging
+import random
+import re
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Optional
+
+from sqlalchemy import Engine, event
+
+logger = logging.getLogger(__name__)
+
+# Верхние границы корзин гистограммы, мс. Последняя корзина - всё, что дольше.
+LATENCY_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+MAX_TRACKED_STATEMENTS = 500
+OTHER_STATEMENTS_KEY = '<other>'
+EXPLAIN_COOLDOWN_S = 300
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN\s*\((?:\s*[^()]+?\s*,)+\s*[^()]+?\s*\)', re.IGNORECASE)
+_WHITESPACE = re.compile(r'\s+')
+_START_TIMES_KEY = 'planify_query_start'
+_EXPLAINABLE = ('SELECT', 'WITH', 'INSERT', 'UPDATE', 'DELETE')
+# Блокировки строк и функции с побочными эффектами: EXPLAIN ANALYZE выполнил бы их второй раз
+_SIDE_EFFECTS = re.compile(
+    r'\bFOR\s+(?:NO\s+KEY\s+UPDATE|UPDATE|KEY\s+SHARE|SHARE)\b'
+    r'|\b(?:pg_notify|nextval|setval|pg_advisory\w*)\s*\(',
+    re.IGNORECASE
+)
+
+
+def normalize_sql(statement: str) -> str:
+    """Привести SQL к шаблону: без литералов, с одинаковыми пробелами и свёрнутыми IN (...)."""
+    normalized = _STRING_LITERAL.sub('?', statement)
+    normalized = _NUMBER_LITERAL.sub('?', normalized)
+    normalized = _IN_LIST.sub('IN (...)', normalized)
+    return _WHITESPACE.sub(' ', normalized).strip()
+
+
+def explain_prefix(statement: str) -> Optional[str]:
+    """
+    Как объяснять медленный запрос: EXPLAIN ANALYZE (выполняет запрос повторно) - только
+    для чтения без блокировок и побочных эффектов, для остального - EXPLAIN без выполнения.
+    None - запрос не объясняется.
+    """
+    stripped = statement.lstrip().upper()
+    if not stripped.startswith(_EXPLAINABLE):
+        return None
+    if stripped.startswith('SELECT') and not _SIDE_EFFECTS.search(statement):
+        return 'EXPLAIN (ANALYZE, BUFFERS)'
+    return 'EXPLAIN'
+
+
+def redact_parameters(parameters: Any) -> Any:
+    """Оставить от параметров только имена и типы значений."""
+    if isinstance(parameters, dict):
+        return {key: type(value).__name__ for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        if parameters and isinstance(parameters[0], (dict, list, tuple)):
+            return f'<{len(parameters)} rows>'
+        return [type(value).__name__ for value in parameters]
+    return type(parameters).__name__
+
+
+@dataclass(frozen=True)
+class StatementStats:
+    sql: str
+    count: int
+    total_ms: float
+    max_ms: float
+    buckets: tuple[int, ...]
+
+    @property
+    def avg_ms(self) -> float:
+        return self.total_ms / self.count if self.count else 0.0
+
+    def percentile_ms(self, percentile: float) -> float:
+        """Оценка перцентиля по верхней границе корзины гистограммы."""
+        threshold = self.count * percentile / 100
+        seen = 0
+        for bound, bucket_count in zip(LATENCY_BUCKETS_MS, self.buckets):
+            seen += bucket_count
+            if seen >= threshold:
+                return float(bound)
+        return self.max_ms
+
+
+class _Histogram:
+    __slots__ = ('count', 'total_ms', 'max_ms', 'buckets')
+
+    def __init__(self):
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+
+    def observe(self, elapsed_ms: float) -> None:
+        self.count += 1
+        self.total_ms += elapsed_ms
+        self.max_ms = max(self.max_ms, elapsed_ms)
+        self.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, elapsed_ms)] += 1
+
+
+class QueryTelemetry:
+    """
+    Время выполнения SQL по событиям before/after_cursor_execute.
+
+    Для каждого нормализованного запроса ведётся гистограмма задержек. Запросы
+    дольше slow_query_ms пишутся в лог с обезличенными параметрами, а с
+    вероятностью explain_sample_rate для медленных SELECT дополнительно
+    логируется план EXPLAIN (ANALYZE, BUFFERS) - не чаще раза в
+    EXPLAIN_COOLDOWN_S на один шаблон запроса.
+    """
+
+    def __init__(self, slow_query_ms: float, explain_sample_rate: float = 0.0):
+        self._slow_query_ms = slow_query_ms
+        self._explain_sample_rate = explain_sample_rate
+        self._lock = threading.Lock()
+        self._histograms: dict[str, _Histogram] = {}
+        self._last_explain: dict[str, float] = {}
+
+    def attach(self, engine: Engine) -> None:
+        event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+        event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+        event.listen(engine, 'handle_error', self._handle_error)
+
+    def observe(self, statement: str, elapsed_ms: float) -> str:
+        key = normalize_sql(statement)
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                if len(self._histograms) >= MAX_TRACKED_STATEMENTS:
+                    key = OTHER_STATEMENTS_KEY
+                histogram = self._histograms.setdefault(key, _Histogram())
+            histogram.observe(elapsed_ms)
+        return key
+
+    def snapshot(self, reset: bool = False) -> list[StatementStats]:
+        """Статистика по шаблонам запросов, отсортированная по суммарному времени."""
+        with self._lock:
+            stats = [
+                StatementStats(sql, h.count, h.total_ms, h.max_ms, tuple(h.buckets))
+                for sql, h in self._histograms.items()
+            ]
+            if reset:
+                self._histograms = {}
+
+        return sorted(stats, key=lambda s: s.total_ms, reverse=True)
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        conn.info.setdefault(_START_TIMES_KEY, []).append((context, time.perf_counter()))
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany) -> None:
+        _, started = conn.info[_START_TIMES_KEY].pop()
+        elapsed_ms = (time.perf_counter() - started) * 1000
+        key = self.observe(statement, elapsed_ms)
+
+        if elapsed_ms < self._slow_query_ms:
+            return
+
+        logger.warning(
+            f'Slow query {elapsed_ms:.1f} ms: {key} params={redact_parameters(parameters)}'
+        )
+        prefix = explain_prefix(statement)
+        if not executemany and prefix is not None and self._should_explain(key):
+            self._log_explain(conn, key, f'{prefix} {statement}', parameters)
+
+    def _handle_error(self, exception_context) -> None:
+        # Ошибка могла случиться ещё до before_cursor_execute (например, при обработке параметров)
+        conn = exception_context.connection
+        start_times = conn.info.get(_START_TIMES_KEY) if conn is not None else None
+        if start_times and start_times[-1][0] is exception_context.execution_context:
+            start_times.pop()
+
+    def _should_explain(self, key: str) -> bool:
+        if random.random() >= self._explain_sample_rate:
+            return False
+
+        now = time.monotonic()
+        with self._lock:
+            if now - self._last_explain.get(key, -EXPLAIN_COOLDOWN_S) < EXPLAIN_COOLDOWN_S:
+                return False
+            self._last_explain[key] = now
+        return True
+
+    def _log_explain(self, conn, key: str, explain: str, parameters: Any) -> None:
+        dbapi_cursor = conn.connection.dbapi_connection.cursor()
+        try:
+            # savepoint, чтобы ошибка EXPLAIN не сломала транзакцию вызывающего кода
+            dbapi_cursor.execute('SAVEPOINT planify_explain')
+            try:
+                dbapi_cursor.execute(explain, parameters)
+                plan = '\n'.join(row[0] for row in dbapi_cursor.fetchall())
+                dbapi_cursor.execute('RELEASE SAVEPOINT planify_explain')
+            except Exception:
+                dbapi_cursor.execute('ROLLBACK TO SAVEPOINT planify_explain')
+                raise
+            logger.warning(f'Plan for slow query {key}:\n{plan}')
+        except Exception as e:
+            logger.debug(f'Failed to explain slow query {key}: {e}')
+        finally:
+            dbapi_cursor.close()
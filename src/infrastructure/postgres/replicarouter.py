@@ -0,0 +1,120 @@
+import itertools
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Generic, Hashable, Iterator, Optional, TypeVar
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session, ORMExecuteState, UOWTransaction
+
+T = TypeVar('T')
+
+WROTE_KEY = 'planify_wrote'
+
+# Кто выполняет текущий запрос (обычно tg id). Устанавливается на время обработки апдейта.
+_current_actor: ContextVar[Optional[Hashable]] = ContextVar('planify_db_actor', default=None)
+
+MAX_TRACKED_WRITERS = 10_000
+
+
+def get_current_actor() -> Optional[Hashable]:
+    return _current_actor.get()
+
+
+def set_current_actor(actor: Optional[Hashable]) -> Token:
+    """
+    Привязать текущий контекст (asyncio task) к пользователю. Привязку снимает
+    reset_current_actor с возвращённым токеном: иначе её унаследуют задачи,
+    созданные в этом контексте позже.
+    """
+    return _current_actor.set(actor)
+
+
+def reset_current_actor(token: Token) -> None:
+    _current_actor.reset(token)
+
+
+@contextmanager
+def actor_scope(actor: Optional[Hashable]) -> Iterator[None]:
+    """
+    Привязать запросы к пользователю, чтобы его чтения после записи шли на primary.
+
+    Usage:
+        with actor_scope(update.effective_user.id):
+            ...
+    """
+    token = _current_actor.set(actor)
+    try:
+        yield
+    finally:
+        _current_actor.reset(token)
+
+
+class WriteTrackingSession(Session):
+    """Session, которая отмечает в info, что через неё что-то записывалось."""
+
+
+@event.listens_for(WriteTrackingSession, 'after_flush')
+def _mark_flush(session: Session, flush_context: UOWTransaction) -> None:
+    session.info[WROTE_KEY] = True
+
+
+@event.listens_for(WriteTrackingSession, 'do_orm_execute')
+def _mark_bulk_write(orm_execute_state: ORMExecuteState) -> None:
+    if orm_execute_state.is_insert or orm_execute_state.is_update or orm_execute_state.is_delete:
+        orm_execute_state.session.info[WROTE_KEY] = True
+
+
+def has_writes(session: Session) -> bool:
+    return session.info.get(WROTE_KEY, False)
+
+
+class ReplicaRouter(Generic[T]):
+    """
+    Выбор реплики для читающей сессии.
+
+    Реплики перебираются по кругу. Если текущий пользователь что-то записал
+    за последние freshness_window_s секунд, возвращается None - читать нужно
+    с primary, иначе он может не увидеть собственную запись из-за лага репликации.
+    Записи без привязанного пользователя учитываются под общим ключом None.
+    """
+
+    def __init__(self, replicas: list[T], freshness_window_s: float):
+        self._replicas = replicas
+        self._cycle = itertools.cycle(replicas)
+        self._freshness_window_s = freshness_window_s
+        self._lock = threading.Lock()
+        self._last_write: dict[Optional[Hashable], float] = {}
+
+    @property
+    def has_replicas(self) -> bool:
+        return bool(self._replicas)
+
+    def choose(self) -> Optional[T]:
+        if not self._replicas:
+            return None
+
+        now = time.monotonic()
+        actor = get_current_actor()
+        with self._lock:
+            last_write = self._last_write.get(actor)
+            if last_write is not None and now - last_write < self._freshness_window_s:
+                return None
+            return next(self._cycle)
+
+    def record_write(self) -> None:
+        if not self._replicas:
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            if len(self._last_write) >= MAX_TRACKED_WRITERS:
+                self._forget_stale(now)
+            self._last_write[get_current_actor()] = now
+
+    def _forget_stale(self, now: float) -> None:
+        self._last_write = {
+            actor: written_at for actor, written_at in self._last_write.items()
+            if now - written_at < self._freshness_window_s
+        }
@@ -0,0 +1,105 @@
+import logging
+from contextlib import asynccontextmanager
+from contextvars import ContextVar, Token
+from typing import AsyncIterator, Callable, Optional
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.infrastructure.postgres.replicarouter import WROTE_KEY, has_writes
+
+logger = logging.getLogger(__name__)
+
+_current_unit_of_work: ContextVar[Optional['AsyncUnitOfWork']] = ContextVar('planify_unit_of_work', default=None)
+
+
+def get_current_unit_of_work() -> Optional['AsyncUnitOfWork']:
+    return _current_unit_of_work.get()
+
+
+class AsyncUnitOfWork:
+    """
+    Одна сессия на логическую операцию, например на обработку апдейта Telegram.
+
+    Пока unit of work привязан к контексту, AsyncDatabaseEngine.session() и
+    read_session() отдают его сессию вместо новой. Транзакция при этом своя у
+    каждого блока session()/read_session() (см. transaction): она фиксируется в
+    конце вызова сервиса, поэтому блокировки строк и незафиксированные записи
+    не переживают сетевые вызовы хендлера. finish() закрывает сессию и откатывает
+    то, что осталось незафиксированным, если операция завершилась ошибкой.
+
+    Usage:
+        uow = db_engine.begin_unit_of_work()
+        try:
+            ...
+        except Exception:
+            uow.mark_failed()
+        finally:
+            await uow.finish()
+    """
+
+    def __init__(self, engine: object, session: AsyncSession, on_write: Callable[[], None]):
+        self.engine = engine
+        self.session = session
+        self._on_write = on_write
+        self._failed = False
+        self._depth = 0
+        self._token: Optional[Token] = _current_unit_of_work.set(self)
+
+    @property
+    def failed(self) -> bool:
+        return self._failed
+
+    def mark_failed(self) -> None:
+        self._failed = True
+
+    @asynccontextmanager
+    async def transaction(self) -> AsyncIterator[AsyncSession]:
+        """
+        Транзакция одного вызова сервиса в общей сессии: commit в конце блока,
+        rollback при ошибке. Вложенный блок - SAVEPOINT внутри внешнего.
+        """
+        if self._depth:
+            self._depth += 1
+            try:
+                async with self.session.begin_nested():
+                    yield self.session
+            finally:
+                self._depth -= 1
+            return
+
+        self._depth += 1
+        try:
+            yield self.session
+            await self.session.commit()
+        except BaseException:
+            await self.session.rollback()
+            raise
+        finally:
+            self._depth -= 1
+            self._record_writes()
+
+    async def finish(self) -> None:
+        try:
+            # Обычно транзакции уже закрыты блоками transaction(), остаться может
+            # только то, что сделано с сессией в обход них
+            if self.session.in_transaction() and self._failed:
+                await self.session.rollback()
+                logger.debug('Unit of work rolled back')
+            elif self.session.in_transaction():
+                await self.session.commit()
+                logger.debug('Unit of work committed')
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f'Unit of work rollback due to error: {e}')
+            raise
+        finally:
+            self._record_writes()
+            await self.session.close()
+            if self._token is not None:
+                _current_unit_of_work.reset(self._token)
+                self._token = None
+
+    def _record_writes(self) -> None:
+        if has_writes(self.session.sync_session):
+            self._on_write()
+            self.session.sync_session.info.pop(WROTE_KEY, None)
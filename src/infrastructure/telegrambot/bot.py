@@ -1,9 +1,19 @@
+import asyncio
 import logging
+from typing import Optional
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import Application, CallbackQueryHandler, MessageHandler, filters, CommandHandler
 
+from src.app.services import AsyncScheduleService, AsyncSlotHoldService, AvailabilityIndex, SlotDayCache
+from src.app.services.role import role_cache
+from src.app.services.schedule import DEFAULT_HORIZON_DAYS
 from src.infrastructure.env.envconfig import EnvConfig
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+from .botcontext import DB_ENGINE_KEY
+from .unitofwork import MIDDLEWARE_GROUP, UnitOfWorkApplication, UnitOfWorkMiddleware
+from .waitlistnotifier import WaitlistNotifier
 
 from .handlers.admin.actions import *
 from .handlers.admin.menu import *
@@ -14,17 +24,42 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+METRICS_REPORT_INTERVAL = 60
+SCHEDULE_MATERIALIZE_INTERVAL = 3600
+SLOT_HOLD_SWEEP_INTERVAL = 60
+TOP_STATEMENTS_IN_REPORT = 5
+
 
 class BotApplication:
 
     def __init__(self):
         self._token = EnvConfig.get_str('TG_BOT_TOKEN')
-        self.application = Application.builder().token(self._token).build()
+        self._db_engine = AsyncDatabaseEngine()
+        self._metrics_task: Optional[asyncio.Task] = None
+        self._schedule_task: Optional[asyncio.Task] = None
+        self._hold_sweep_task: Optional[asyncio.Task] = None
+        self._change_listener_task: Optional[asyncio.Task] = None
+        # Занятость слотов по дням, общая для обработчиков процесса и сбрасываемая по NOTIFY
+        self._availability = AvailabilityIndex()
+        # Слоты по дням: один кеш на процесс, сервисы обработчиков сбрасывают в нём дни своих записей
+        self._day_cache = SlotDayCache()
+        self._schedule_horizon_days = EnvConfig.get_int('PLANIFY_SCHEDULE_HORIZON_DAYS', DEFAULT_HORIZON_DAYS)
+        self.application = Application.builder() \
+            .token(self._token) \
+            .application_class(UnitOfWorkApplication) \
+            .post_init(self._on_startup) \
+            .post_shutdown(self._on_shutdown) \
+            .build()
+        self.application.bot_data[DB_ENGINE_KEY] = self._db_engine
+        self._waitlist_notifier = WaitlistNotifier(self.application.bot)
 
         self._init_handlers()
 
     def _init_handlers(self) -> None:
 
+        # Middleware: одна сессия БД и определение роли на апдейт
+        self.application.add_handler(UnitOfWorkMiddleware(self._db_engine).get_handler(), group=MIDDLEWARE_GROUP)
+
         # 1-st level Main Menu
         for handler in MainMenuHandler.get_handlers():
             self.application.add_handler(handler)
@@ -42,9 +77,34 @@ class BotApplication:
         )
 
         # Action Handler's
-        add_slot_handler = AddSlotHandler()
+        add_slot_handler = AddSlotHandler(
+            self._db_engine, availability=self._availability, day_cache=self._day_cache
+        )
         self.application.add_handler(add_slot_handler.get_conversation_handler())
 
+        bulk_slots_handler = BulkSlotsHandler(
+            self._db_engine, availability=self._availability, day_cache=self._day_cache
+        )
+        self.application.add_handler(bulk_slots_handler.get_conversation_handler())
+
+        clone_slot_handler = CloneSlotHandler(
+            self._db_engine, availability=self._availability, day_cache=self._day_cache
+        )
+        self.application.add_handler(clone_slot_handler.get_conversation_handler())
+
+        book_slot_handler = BookSlotHandler(
+            self._db_engine, availability=self._availability, day_cache=self._day_cache
+        )
+        self.application.add_handler(book_slot_handler.get_conversation_handler())
+
+        cancel_booking_handler = CancelBookingHandler(
+            self._db_engine,
+            availability=self._availability,
+            day_cache=self._day_cache,
+            on_promotion=self._waitlist_notifier.notify_promotion
+        )
+        self.application.add_handler(cancel_booking_handler.get_conversation_handler())
+
 
         # Base Command's
         self.application.add_handler(CommandHandler('help', self.show_help))
@@ -95,6 +155,60 @@ class BotApplication:
         )
 
 
+    async def _on_startup(self, application: Application) -> None:
+        await self._db_engine.test_connection()
+        self._metrics_task = asyncio.create_task(self._report_metrics())
+        self._schedule_task = asyncio.create_task(self._materialize_schedule())
+        self._hold_sweep_task = asyncio.create_task(self._sweep_slot_holds())
+
+        # Локальные кеши сбрасываются по NOTIFY от записей любого процесса бота
+        self._db_engine.notifications.subscribe(role_cache.on_change)
+        self._db_engine.notifications.subscribe(self._availability.on_change)
+        self._change_listener_task = asyncio.create_task(self._db_engine.change_listener().run())
+
+    async def _on_shutdown(self, application: Application) -> None:
+        if self._metrics_task:
+            self._metrics_task.cancel()
+        if self._schedule_task:
+            self._schedule_task.cancel()
+        if self._hold_sweep_task:
+            self._hold_sweep_task.cancel()
+        if self._change_listener_task:
+            self._change_listener_task.cancel()
+        await self._db_engine.dispose()
+        logger.info('Database engine disposed')
+
+    async def _report_metrics(self) -> None:
+        while True:
+            await asyncio.sleep(METRICS_REPORT_INTERVAL)
+            logger.info(f'Async DB pool: {self._db_engine.pool_stats(reset=True).format()}')
+
+            for stats in self._db_engine.query_stats(reset=True)[:TOP_STATEMENTS_IN_REPORT]:
+                logger.info(
+                    f'SQL count={stats.count} total={stats.total_ms:.0f}ms avg={stats.avg_ms:.1f}ms '
+                    f'p95<={stats.percentile_ms(95):.0f}ms max={stats.max_ms:.1f}ms: {stats.sql}'
+                )
+
+    async def _materialize_schedule(self) -> None:
+        schedule_service = AsyncScheduleService(self._db_engine)
+        while True:
+            try:
+                await schedule_service.materialize_slots(self._schedule_horizon_days)
+            except Exception as e:
+                logger.error(f'Failed to materialize slots from schedule: {e}')
+            await asyncio.sleep(SCHEDULE_MATERIALIZE_INTERVAL)
+
+    async def _sweep_slot_holds(self) -> None:
+        slot_hold_service = AsyncSlotHoldService(self._db_engine)
+        while True:
+            await asyncio.sleep(SLOT_HOLD_SWEEP_INTERVAL)
+            try:
+                swept = await slot_hold_service.sweep_expired()
+                if swept:
+                    logger.info(f'Released {swept} expired slot hold(s)')
+            except Exception as e:
+                logger.error(f'Failed to sweep expired slot holds: {e}')
+
     def run(self):
         print("🤖 Бот запущен с многоуровневым меню...")
         self.application.run_polling(allowed_updates=Update.ALL_TYPES)
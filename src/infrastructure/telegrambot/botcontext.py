@@ -0,0 +1,39 @@
+from dataclasses import dataclass
+from typing import Optional
+
+from telegram.ext import CallbackContext
+
+from src.app.models import Role
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+DB_ENGINE_KEY = 'db_engine'
+IDENTITY_ATTR = 'planify_identity'
+
+
+@dataclass(frozen=True)
+class UpdateIdentity:
+    """Кто прислал апдейт, с какой ролью и какие у него строки user/client."""
+    tg_id: Optional[int]
+    role: Role
+    user_id: Optional[int] = None
+    client_id: Optional[int] = None
+
+
+def get_db_engine(context: CallbackContext) -> AsyncDatabaseEngine:
+    """Общий AsyncDatabaseEngine, созданный при старте BotApplication."""
+    engine = context.bot_data.get(DB_ENGINE_KEY)
+    if engine is None:
+        raise RuntimeError('Database engine not initialized')
+    return engine
+
+
+def get_identity(context: CallbackContext) -> UpdateIdentity:
+    """Роль и id user/client текущего апдейта, определённые UnitOfWorkMiddleware."""
+    identity = getattr(context, IDENTITY_ATTR, None)
+    if identity is None:
+        raise RuntimeError('Update identity not resolved')
+    return identity
+
+
+def set_identity(context: CallbackContext, identity: UpdateIdentity) -> None:
+    setattr(context, IDENTITY_ATTR, identity)
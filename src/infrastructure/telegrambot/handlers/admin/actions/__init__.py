@@ -1 +1,5 @@
-from .add_slot import AddSlotHandler
\ No newline at end of file
+from .add_slot import AddSlotHandler
+from .book_slot import BookSlotHandler
+from .cancel_booking import CancelBookingHandler
+from .bulk_slots import BulkSlotsHandler
+from .clone_slot import CloneSlotHandler
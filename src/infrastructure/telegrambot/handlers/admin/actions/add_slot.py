@@ -1,6 +1,6 @@
 import logging
 
-from typing import Type, TypeVar
+from typing import Optional, Type, TypeVar
 from enum import Enum
 from datetime import timedelta
 
@@ -12,9 +12,9 @@ from .base import BaseHandler
 
 from src.common.utils.validators import *
 from src.app.models import Slot, Role
-from src.app.services import SlotService, RoleService
+from src.app.services import AsyncSlotService, AsyncRoleService, AvailabilityIndex, SlotDayCache, SlotOverlapError
 from src.infrastructure.telegrambot.handlers.admin.keyboards.menu import get_cancel_keyboard
-from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -33,8 +33,11 @@ class AddSlotStates(Enum):
 
 
 class AddSlotHandler(BaseHandler):
-    def __init__(self):
-        super().__init__('add_slot')
+    def __init__(self, engine: AsyncDatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None):
+        super().__init__('add_slot', engine)
+        self._slot_service = AsyncSlotService(engine, availability=availability, day_cache=day_cache)
+        self._role_service = AsyncRoleService(engine)
 
     def define_states(self) -> Type[Enum]:
         return AddSlotStates
@@ -58,9 +61,8 @@ class AddSlotHandler(BaseHandler):
             }
         )
 
-    def is_available_for_user(self, user_id: int) -> bool:
-        role_service = RoleService(DatabaseEngine())
-        return role_service.get_user_role_by_tg_id(user_id) == Role.ADMIN
+    async def is_available_for_user(self, user_id: int) -> bool:
+        return await self._role_service.get_user_role_by_tg_id(user_id) == Role.ADMIN
 
 
     async def start(self, update: Update, context: Context):
@@ -147,7 +149,7 @@ class AddSlotHandler(BaseHandler):
 
         if query.data == 'check_intersection':
             slot_data = context['slot_data']
-            return self._is_slot_intersect_with_other(slot_data)
+            return await self._is_slot_intersect_with_other(slot_data)
         elif query.data == 'cancel':
             return await self.cancel(update, context)
 
@@ -198,13 +200,19 @@ class AddSlotHandler(BaseHandler):
 
         if query.data == 'confirm':
             try:
-                self._save_slot(context.user_data['slot_data'])
+                await self._save_slot(context.user_data['slot_data'])
 
                 await query.edit_message_text(
                     "✅ Слот успешно сохранен!\n"
                     "Для возврата в меню нажмите /start"
                 )
 
+            except SlotOverlapError as e:
+                await query.edit_message_text(
+                    self._format_overlap_text(e.conflicts) +
+                    "\nДля возврата в меню нажмите /start"
+                )
+
             except Exception as e:
                 logger.error(f"Ошибка сохранения слота: {e}")
                 await query.edit_message_text(
@@ -250,9 +258,18 @@ class AddSlotHandler(BaseHandler):
             "Всё верно?"
         )
 
-    def _is_slot_intersect_with_other(self, slot_data: dict) -> bool:
-        service = SlotService(DatabaseEngine())
-        start_time = datetime.combine(slot_data['date'], slot_data['time'])
+    def _format_overlap_text(self, conflicts: list[Slot]) -> str:
+        conflicts_text = "\n".join(
+            f"• {slot.start_time.strftime('%d.%m.%Y %H:%M')} - {slot.end_time.strftime('%H:%M')}"
+            for slot in conflicts
+        )
+        return (
+            "❌ Слот пересекается с уже существующими:\n"
+            f"{conflicts_text}\n"
+        )
+
+    async def _is_slot_intersect_with_other(self, slot_data: dict) -> bool:
+        start_time = datetime.combine(slot_data['date'], slot_data['start_time'])
         end_time = start_time + timedelta(minutes=slot_data['duration'])
 
         slot = Slot(
@@ -261,11 +278,10 @@ class AddSlotHandler(BaseHandler):
             duration_in_minutes=slot_data['duration'],
         )
 
-        return service.is_slot_intersect_with_others(slot)
+        return await self._slot_service.is_slot_intersect_with_others(slot)
 
-    def _save_slot(self, slot_data: dict) -> None:
-        service = SlotService(DatabaseEngine())
-        start_time = datetime.combine(slot_data['date'], slot_data['time'])
+    async def _save_slot(self, slot_data: dict) -> None:
+        start_time = datetime.combine(slot_data['date'], slot_data['start_time'])
         end_time = start_time + timedelta(minutes=slot_data['duration'])
 
         slot = Slot(
@@ -274,4 +290,4 @@ class AddSlotHandler(BaseHandler):
             duration_in_minutes = slot_data['duration'],
         )
 
-        service.add_slot(slot)
+        await self._slot_service.add_slot(slot)
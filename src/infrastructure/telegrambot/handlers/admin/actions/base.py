@@ -4,10 +4,13 @@ from enum import Enum
 from telegram import Update
 from telegram.ext import ContextTypes, ConversationHandler
 
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
 class BaseHandler(ABC):
-    def __init__(self, name: str):
+    def __init__(self, name: str, engine: AsyncDatabaseEngine):
         self.name = name
         self.states = self.define_states()
+        self._engine = engine
 
     @abstractmethod
     def define_states(self) -> Enum:
@@ -18,5 +21,5 @@ class BaseHandler(ABC):
         ...
 
     @abstractmethod
-    def is_available_for_user(self, user_id: int) -> bool:
+    async def is_available_for_user(self, user_id: int) -> bool:
         ...
\ No newline at end of file
@@ -0,0 +1,143 @@
+import logging
+
+from typing import Optional, Type, TypeVar
+from enum import Enum
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler
+
+from .base import BaseHandler
+
+from src.app.models import Appointment, AppointmentStatus
+from src.app.services import AsyncAppointmentService, AsyncRoleService, AsyncSlotHoldService
+from src.app.services import AvailabilityIndex, SlotDayCache
+from src.app.services import SlotBookedError, SlotHeldError
+from src.app.services.slothold import SLOT_HOLD_TTL
+from src.infrastructure.telegrambot.botcontext import get_identity
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+Context = TypeVar('Context', bound=ContextTypes.DEFAULT_TYPE)
+
+
+class BookSlotStates(Enum):
+    CONFIRM = 1
+
+
+class BookSlotHandler(BaseHandler):
+    """
+    Запись клиента на слот: по book_slot_<id> слот бронируется (SlotHoldService.hold_slot),
+    пока клиент подтверждает запись, подтверждение превращает бронь в запись.
+    """
+
+    def __init__(self, engine: AsyncDatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None):
+        super().__init__('book_slot', engine)
+        self._slot_hold_service = AsyncSlotHoldService(engine)
+        self._appointment_service = AsyncAppointmentService(engine, availability=availability, day_cache=day_cache)
+        self._role_service = AsyncRoleService(engine)
+
+    def define_states(self) -> Type[Enum]:
+        return BookSlotStates
+
+    async def is_available_for_user(self, user_id: int) -> bool:
+        return (await self._role_service.get_caller_by_tg_id(user_id)).client_id is not None
+
+    def get_conversation_handler(self) -> ConversationHandler:
+        return ConversationHandler(
+            entry_points=[
+                CallbackQueryHandler(self.start, pattern='^book_slot_\\d+$')
+            ],
+            states={
+                BookSlotStates.CONFIRM: [CallbackQueryHandler(self.confirm, pattern='^confirm_book_\\d+$')]
+            },
+            fallbacks=[
+                CallbackQueryHandler(self.cancel, pattern='^cancel_book_\\d+$')
+            ],
+            map_to_parent={
+                ConversationHandler.END: ConversationHandler.END
+            }
+        )
+
+    async def start(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        identity = get_identity(context)
+        if identity.client_id is None:
+            await query.edit_message_text("❌ Запись на слоты доступна только клиентам.")
+            return ConversationHandler.END
+
+        slot_id = int(query.data.split('_')[2])
+        try:
+            hold = await self._slot_hold_service.hold_slot(slot_id, identity.tg_id)
+        except SlotBookedError as e:
+            await query.edit_message_text(f"❌ {self._describe_taken(e)}")
+            return ConversationHandler.END
+        except ValueError:
+            await query.edit_message_text("❌ Слот не найден.")
+            return ConversationHandler.END
+
+        keyboard = [[
+            InlineKeyboardButton("✅ Записаться", callback_data=f'confirm_book_{slot_id}'),
+            InlineKeyboardButton("❌ Отмена", callback_data=f'cancel_book_{slot_id}')
+        ]]
+
+        await query.edit_message_text(
+            f"📅 Слот {slot_id} забронирован за вами до {hold.expires_at.strftime('%H:%M')} "
+            f"({int(SLOT_HOLD_TTL.total_seconds() // 60)} мин).\n\n"
+            "Подтвердите запись:",
+            reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+        return BookSlotStates.CONFIRM
+
+    async def confirm(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        identity = get_identity(context)
+        slot_id = int(query.data.split('_')[2])
+        if identity.client_id is None:
+            await query.edit_message_text("❌ Запись на слоты доступна только клиентам.")
+            return ConversationHandler.END
+
+        appointment = Appointment(slot_id=slot_id, client_id=identity.client_id, status=AppointmentStatus.PENDING)
+        try:
+            await self._appointment_service.book_slot(appointment, holder_tg_id=identity.tg_id)
+            await query.edit_message_text(
+                f"✅ Вы записаны на слот {slot_id}, запись ожидает подтверждения.\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        except SlotBookedError as e:
+            # Бронь истекла, и слот успел занять другой клиент
+            await query.edit_message_text(f"❌ {self._describe_taken(e)}\nДля возврата в меню нажмите /start")
+
+        except Exception as e:
+            logger.error(f"Ошибка записи на слот {slot_id}: {e}")
+            await query.edit_message_text(
+                "❌ Ошибка при записи. Попробуйте позже.\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        return ConversationHandler.END
+
+    async def cancel(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        slot_id = int(query.data.split('_')[2])
+        await self._slot_hold_service.release_hold(slot_id, get_identity(context).tg_id)
+
+        await query.edit_message_text(
+            "❌ Запись отменена, слот освобождён.\n"
+            "Для возврата в меню нажмите /start"
+        )
+        return ConversationHandler.END
+
+    @staticmethod
+    def _describe_taken(error: SlotBookedError) -> str:
+        if isinstance(error, SlotHeldError):
+            return "Слот сейчас оформляет другой клиент, попробуйте через несколько минут."
+        return "На слот уже записались."
@@ -0,0 +1,271 @@
+import logging
+
+from typing import Optional, Type, TypeVar
+from enum import Enum
+from datetime import datetime, date, time, timedelta
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler, MessageHandler, filters
+
+from .base import BaseHandler
+
+from src.app.models import Slot, Role
+from src.app.services import AsyncSlotService, AsyncRoleService, AvailabilityIndex, SlotDayCache
+from src.infrastructure.telegrambot.botcontext import get_identity
+from src.infrastructure.telegrambot.handlers.admin.keyboards.menu import get_cancel_keyboard
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+Context = TypeVar('Context', bound=ContextTypes.DEFAULT_TYPE)
+
+MAX_PERIOD_DAYS = 92 # Квартал
+MAX_REJECTED_IN_REPORT = 10
+
+
+class BulkSlotsStates(Enum):
+    ENTER_PERIOD = 1
+    ENTER_HOURS = 2
+    ENTER_DURATION = 3
+    CONFIRM = 4
+
+
+class BulkSlotsHandler(BaseHandler):
+    """Массовое добавление: слоты подряд в рабочие часы каждого дня периода."""
+
+    def __init__(self, engine: AsyncDatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None):
+        super().__init__('bulk_slots', engine)
+        self._availability = availability if availability is not None else AvailabilityIndex()
+        self._slot_service = AsyncSlotService(engine, availability=self._availability, day_cache=day_cache)
+        self._role_service = AsyncRoleService(engine)
+
+    def define_states(self) -> Type[Enum]:
+        return BulkSlotsStates
+
+    async def is_available_for_user(self, user_id: int) -> bool:
+        return await self._role_service.get_user_role_by_tg_id(user_id) == Role.ADMIN
+
+    def get_conversation_handler(self) -> ConversationHandler:
+        return ConversationHandler(
+            entry_points=[CallbackQueryHandler(self.start, pattern='^bulk_slots$')],
+            states={
+                BulkSlotsStates.ENTER_PERIOD: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_period_input)],
+                BulkSlotsStates.ENTER_HOURS: [MessageHandler(filters.TEXT & ~filters.COMMAND, self.handle_hours_input)],
+                BulkSlotsStates.ENTER_DURATION: [CallbackQueryHandler(self.handle_duration_selection, pattern='^(30|60|90|120)$')],
+                BulkSlotsStates.CONFIRM: [CallbackQueryHandler(self.handle_confirmation, pattern='^(confirm|cancel)$')]
+            },
+            fallbacks=[
+                CallbackQueryHandler(self.cancel, pattern='^cancel$'),
+                MessageHandler(filters.Regex('^cancel$'), self.cancel)
+            ],
+            map_to_parent={
+                ConversationHandler.END: ConversationHandler.END
+            }
+        )
+
+    async def start(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        if get_identity(context).role != Role.ADMIN:
+            await query.edit_message_text("❌ Массовое добавление доступно только администратору.")
+            return ConversationHandler.END
+
+        context.user_data['bulk_slots'] = {}
+
+        await query.edit_message_text(
+            "📅 Введите период в формате ДД.ММ.ГГГГ-ДД.ММ.ГГГГ\n"
+            "Например: 01.12.2026-31.12.2026",
+            reply_markup=get_cancel_keyboard()
+        )
+
+        return BulkSlotsStates.ENTER_PERIOD
+
+    async def handle_period_input(self, update: Update, context: Context):
+        period = self._parse_period(update.message.text)
+
+        if period is None:
+            await update.message.reply_text(
+                "❌ Неверный период. Используйте ДД.ММ.ГГГГ-ДД.ММ.ГГГГ, "
+                f"не длиннее {MAX_PERIOD_DAYS} дней и не в прошлом.\n"
+                "Попробуйте снова:",
+                reply_markup=get_cancel_keyboard()
+            )
+            return BulkSlotsStates.ENTER_PERIOD
+
+        context.user_data['bulk_slots']['first_day'], context.user_data['bulk_slots']['last_day'] = period
+
+        await update.message.reply_text(
+            "⏰ Введите рабочие часы в формате ЧЧ:ММ-ЧЧ:ММ\n"
+            "Например: 10:00-18:00",
+            reply_markup=get_cancel_keyboard()
+        )
+        return BulkSlotsStates.ENTER_HOURS
+
+    async def handle_hours_input(self, update: Update, context: Context):
+        hours = self._parse_hours(update.message.text)
+
+        if hours is None:
+            await update.message.reply_text(
+                "❌ Неверный формат. Используйте ЧЧ:ММ-ЧЧ:ММ, начало раньше конца.\n"
+                "Попробуйте снова:",
+                reply_markup=get_cancel_keyboard()
+            )
+            return BulkSlotsStates.ENTER_HOURS
+
+        context.user_data['bulk_slots']['day_start'], context.user_data['bulk_slots']['day_end'] = hours
+
+        keyboard = [
+            [
+                InlineKeyboardButton("30 мин", callback_data='30'),
+                InlineKeyboardButton("60 мин", callback_data='60')
+            ],
+            [
+                InlineKeyboardButton("90 мин", callback_data='90'),
+                InlineKeyboardButton("120 мин", callback_data='120')
+            ],
+            [InlineKeyboardButton("❌ Отмена", callback_data='cancel')]
+        ]
+
+        await update.message.reply_text(
+            "⏱️ Выберите продолжительность одного слота:",
+            reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+        return BulkSlotsStates.ENTER_DURATION
+
+    async def handle_duration_selection(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        bulk_data = context.user_data['bulk_slots']
+        bulk_data['duration'] = int(query.data)
+        slots = self._build_slots(bulk_data)
+
+        # Пересечения с уже существующими слотами проверяются в памяти, без запроса на каждый слот.
+        # Индекс общий для процесса: из БД читаются только дни, которых в нём нет или которые изменились
+        availability = await self._slot_service.refresh_availability_index(
+            self._availability, bulk_data['first_day'], bulk_data['last_day'] + timedelta(days=1)
+        )
+        slots_count = sum(availability.validate(slots))
+        conflicts_count = len(slots) - slots_count
+
+        keyboard = [
+            [
+                InlineKeyboardButton("✅ Подтвердить", callback_data='confirm'),
+                InlineKeyboardButton("❌ Отмена", callback_data='cancel')
+            ]
+        ]
+
+        await query.edit_message_text(
+            text=(
+                "📋 Проверьте введенные данные:\n\n"
+                f"📅 Период: {bulk_data['first_day'].strftime('%d.%m.%Y')} - "
+                f"{bulk_data['last_day'].strftime('%d.%m.%Y')}\n"
+                f"⏰ Рабочие часы: {bulk_data['day_start'].strftime('%H:%M')} - "
+                f"{bulk_data['day_end'].strftime('%H:%M')}\n"
+                f"⏱️ Продолжительность: {bulk_data['duration']} минут\n"
+                f"🔢 Будет создано слотов: {slots_count}\n"
+                + (f"⚠️ Пересекаются с существующими: {conflicts_count}\n" if conflicts_count else "")
+                + "\nВсё верно?"
+            ),
+            reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+        return BulkSlotsStates.CONFIRM
+
+    async def handle_confirmation(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        if query.data != 'confirm':
+            return await self.cancel(update, context)
+
+        try:
+            result = await self._slot_service.add_slots(self._build_slots(context.user_data['bulk_slots']))
+            await query.edit_message_text(self._format_result_text(result.inserted, result.rejected))
+
+        except Exception as e:
+            logger.error(f"Ошибка массового добавления слотов: {e}")
+            await query.edit_message_text(
+                "❌ Ошибка при сохранении. Попробуйте позже.\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        context.user_data.pop('bulk_slots', None)
+        return ConversationHandler.END
+
+    async def cancel(self, update: Update, context: Context):
+        query = update.callback_query
+        if query:
+            await query.answer()
+            await query.edit_message_text(
+                "❌ Массовое добавление отменено.\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        context.user_data.pop('bulk_slots', None)
+        return ConversationHandler.END
+
+    @staticmethod
+    def _parse_period(text: str) -> Optional[tuple[date, date]]:
+        try:
+            first_str, last_str = text.split('-')
+            first_day = datetime.strptime(first_str.strip(), '%d.%m.%Y').date()
+            last_day = datetime.strptime(last_str.strip(), '%d.%m.%Y').date()
+        except ValueError:
+            return None
+
+        if first_day < datetime.now().date() or last_day < first_day:
+            return None
+        if (last_day - first_day).days >= MAX_PERIOD_DAYS:
+            return None
+        return first_day, last_day
+
+    @staticmethod
+    def _parse_hours(text: str) -> Optional[tuple[time, time]]:
+        try:
+            start_str, end_str = text.split('-')
+            day_start = datetime.strptime(start_str.strip(), '%H:%M').time()
+            day_end = datetime.strptime(end_str.strip(), '%H:%M').time()
+        except ValueError:
+            return None
+
+        return (day_start, day_end) if day_start < day_end else None
+
+    @staticmethod
+    def _build_slots(bulk_data: dict) -> list[Slot]:
+        duration = timedelta(minutes=bulk_data['duration'])
+        slots = []
+
+        day = bulk_data['first_day']
+        while day <= bulk_data['last_day']:
+            start_time = datetime.combine(day, bulk_data['day_start'])
+            day_end = datetime.combine(day, bulk_data['day_end'])
+            while start_time + duration <= day_end:
+                slots.append(Slot(
+                    start_time=start_time,
+                    end_time=start_time + duration,
+                    duration_in_minutes=bulk_data['duration']
+                ))
+                start_time += duration
+            day += timedelta(days=1)
+
+        return slots
+
+    @staticmethod
+    def _format_result_text(inserted: list[Slot], rejected: list[Slot]) -> str:
+        text = f"✅ Добавлено слотов: {len(inserted)}\n"
+
+        if rejected:
+            rejected_text = "\n".join(
+                f"• {slot.start_time.strftime('%d.%m.%Y %H:%M')}"
+                for slot in rejected[:MAX_REJECTED_IN_REPORT]
+            )
+            more = len(rejected) - MAX_REJECTED_IN_REPORT
+            text += (
+                f"⚠️ Пропущено из-за пересечений: {len(rejected)}\n"
+                f"{rejected_text}\n"
+                + (f"... и ещё {more}\n" if more > 0 else "")
+            )
+
+        return text + "Для возврата в меню нажмите /start"
@@ -0,0 +1,123 @@
+import logging
+
+from typing import Awaitable, Callable, Optional, Type, TypeVar
+from enum import Enum
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler
+
+from .base import BaseHandler
+
+from src.app.models import Role, WaitlistPromotion
+from src.app.services import AsyncAppointmentService, AsyncRoleService, AvailabilityIndex, SlotDayCache
+from src.infrastructure.telegrambot.botcontext import get_identity
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+Context = TypeVar('Context', bound=ContextTypes.DEFAULT_TYPE)
+
+
+class CancelBookingStates(Enum):
+    CONFIRM = 1
+
+
+class CancelBookingHandler(BaseHandler):
+    """
+    Отмена записи на слот администратором (cancel_booking_<slot_id>). Слот достаётся
+    первому из листа ожидания, его уведомляет on_promotion.
+    """
+
+    def __init__(self, engine: AsyncDatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None,
+                 on_promotion: Optional[Callable[[WaitlistPromotion], Awaitable[None]]] = None):
+        super().__init__('cancel_booking', engine)
+        self._appointment_service = AsyncAppointmentService(
+            engine, availability=availability, day_cache=day_cache, on_promotion=on_promotion
+        )
+        self._role_service = AsyncRoleService(engine)
+
+    def define_states(self) -> Type[Enum]:
+        return CancelBookingStates
+
+    async def is_available_for_user(self, user_id: int) -> bool:
+        return await self._role_service.get_user_role_by_tg_id(user_id) == Role.ADMIN
+
+    def get_conversation_handler(self) -> ConversationHandler:
+        return ConversationHandler(
+            entry_points=[
+                CallbackQueryHandler(self.start, pattern='^cancel_booking_\\d+$')
+            ],
+            states={
+                CancelBookingStates.CONFIRM: [
+                    CallbackQueryHandler(self.confirm, pattern='^confirm_cancel_booking_\\d+$')
+                ]
+            },
+            fallbacks=[
+                CallbackQueryHandler(self.cancel, pattern='^keep_booking$')
+            ],
+            map_to_parent={
+                ConversationHandler.END: ConversationHandler.END
+            }
+        )
+
+    async def start(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        if get_identity(context).role != Role.ADMIN:
+            await query.edit_message_text("❌ Отмена записей доступна только администратору.")
+            return ConversationHandler.END
+
+        slot_id = int(query.data.split('_')[2])
+        if await self._appointment_service.get_slot_appointment(slot_id) is None:
+            await query.edit_message_text("❌ На слот нет записи.")
+            return ConversationHandler.END
+
+        keyboard = [[
+            InlineKeyboardButton("🚫 Отменить запись", callback_data=f'confirm_cancel_booking_{slot_id}'),
+            InlineKeyboardButton("↩️ Оставить", callback_data='keep_booking')
+        ]]
+
+        await query.edit_message_text(
+            f"Отменить запись на слот {slot_id}?\n"
+            "Если слот кто-то ждёт, он достанется первому в листе ожидания.",
+            reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+        return CancelBookingStates.CONFIRM
+
+    async def confirm(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        slot_id = int(query.data.split('_')[3])
+        try:
+            appointment = await self._appointment_service.get_slot_appointment(slot_id)
+            if appointment is None:
+                await query.edit_message_text("❌ Запись уже отменена.\nДля возврата в меню нажмите /start")
+                return ConversationHandler.END
+
+            promotion = await self._appointment_service.cancel_appointment(appointment.appointment_id)
+            passed = "\nСлот передан клиенту из листа ожидания." if promotion is not None else ""
+            await query.edit_message_text(
+                f"✅ Запись на слот {slot_id} отменена.{passed}\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        except Exception as e:
+            logger.error(f"Ошибка отмены записи на слот {slot_id}: {e}")
+            await query.edit_message_text(
+                "❌ Ошибка при отмене записи. Попробуйте позже.\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        return ConversationHandler.END
+
+    async def cancel(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+        await query.edit_message_text(
+            "↩️ Запись оставлена.\n"
+            "Для возврата в меню нажмите /start"
+        )
+        return ConversationHandler.END
@@ -0,0 +1,139 @@
+import logging
+
+from typing import Optional, Type, TypeVar
+from enum import Enum
+from datetime import timedelta
+
+from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
+from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler
+
+from .base import BaseHandler
+
+from src.app.models import Role
+from src.app.services import AsyncSlotService, AsyncRoleService, AvailabilityIndex, SlotDayCache
+from src.infrastructure.telegrambot.botcontext import get_identity
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+logger = logging.getLogger(__name__)
+
+Context = TypeVar('Context', bound=ContextTypes.DEFAULT_TYPE)
+
+CLONE_OPTION_PATTERN = '^clone_(next_day|rest_of_week|day|week)_\\d+$'
+
+
+class CloneSlotStates(Enum):
+    CHOOSE_TARGET = 1
+
+
+class CloneSlotHandler(BaseHandler):
+    """Копирование слота, его дня или недели. Копии создаются одним запросом, пересечения пропускаются."""
+
+    def __init__(self, engine: AsyncDatabaseEngine, availability: Optional[AvailabilityIndex] = None,
+                 day_cache: Optional[SlotDayCache] = None):
+        super().__init__('clone_slot', engine)
+        self._slot_service = AsyncSlotService(engine, availability=availability, day_cache=day_cache)
+        self._role_service = AsyncRoleService(engine)
+
+    def define_states(self) -> Type[Enum]:
+        return CloneSlotStates
+
+    async def is_available_for_user(self, user_id: int) -> bool:
+        return await self._role_service.get_user_role_by_tg_id(user_id) == Role.ADMIN
+
+    def get_conversation_handler(self) -> ConversationHandler:
+        return ConversationHandler(
+            entry_points=[
+                CallbackQueryHandler(self.start, pattern='^clone_slot_\\d+$'),
+                CallbackQueryHandler(self.handle_option, pattern=CLONE_OPTION_PATTERN)
+            ],
+            states={
+                CloneSlotStates.CHOOSE_TARGET: [CallbackQueryHandler(self.handle_option, pattern=CLONE_OPTION_PATTERN)]
+            },
+            fallbacks=[
+                CallbackQueryHandler(self.cancel, pattern='^cancel_clone$')
+            ],
+            map_to_parent={
+                ConversationHandler.END: ConversationHandler.END
+            }
+        )
+
+    async def start(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        if get_identity(context).role != Role.ADMIN:
+            await query.edit_message_text("❌ Копирование слотов доступно только администратору.")
+            return ConversationHandler.END
+
+        slot_id = int(query.data.split('_')[2])
+        slot = await self._slot_service.get_slot_by_id(slot_id)
+        if slot is None:
+            await query.edit_message_text("❌ Слот не найден.")
+            return ConversationHandler.END
+
+        keyboard = [
+            [InlineKeyboardButton("➡️ На следующий день", callback_data=f'clone_next_day_{slot_id}')],
+            [InlineKeyboardButton("📆 На каждый день до конца недели", callback_data=f'clone_rest_of_week_{slot_id}')],
+            [InlineKeyboardButton("🗓️ Весь день на следующий день", callback_data=f'clone_day_{slot_id}')],
+            [InlineKeyboardButton("🗓️ Всю неделю на следующую неделю", callback_data=f'clone_week_{slot_id}')],
+            [InlineKeyboardButton("❌ Отмена", callback_data='cancel_clone')]
+        ]
+
+        await query.edit_message_text(
+            f"📋 Копирование слота {slot.start_time.strftime('%d.%m.%Y %H:%M')} - "
+            f"{slot.end_time.strftime('%H:%M')}\n\n"
+            "Куда скопировать? Слоты, пересекающиеся с существующими, будут пропущены.",
+            reply_markup=InlineKeyboardMarkup(keyboard)
+        )
+        return CloneSlotStates.CHOOSE_TARGET
+
+    async def handle_option(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+
+        if get_identity(context).role != Role.ADMIN:
+            await query.edit_message_text("❌ Копирование слотов доступно только администратору.")
+            return ConversationHandler.END
+
+        option, slot_id = query.data.removeprefix('clone_').rsplit('_', 1)
+        slot = await self._slot_service.get_slot_by_id(int(slot_id))
+        if slot is None:
+            await query.edit_message_text("❌ Слот не найден.")
+            return ConversationHandler.END
+
+        day = slot.start_time.date()
+        week_end = day + timedelta(days=6 - day.weekday())
+
+        try:
+            if option == 'next_day':
+                created = await self._slot_service.clone_slot(slot.slot_id, day + timedelta(days=1), day + timedelta(days=1))
+            elif option == 'rest_of_week':
+                created = await self._slot_service.clone_slot(slot.slot_id, day + timedelta(days=1), week_end)
+            elif option == 'day':
+                created = await self._slot_service.clone_day(day, day + timedelta(days=1), day + timedelta(days=1))
+            else:
+                next_week = week_end + timedelta(days=1)
+                created = await self._slot_service.clone_week(day, next_week, next_week)
+
+            await query.edit_message_text(
+                f"✅ Создано слотов: {len(created)}\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        except Exception as e:
+            logger.error(f"Ошибка копирования слота {slot_id}: {e}")
+            await query.edit_message_text(
+                "❌ Ошибка при копировании. Попробуйте позже.\n"
+                "Для возврата в меню нажмите /start"
+            )
+
+        return ConversationHandler.END
+
+    async def cancel(self, update: Update, context: Context):
+        query = update.callback_query
+        await query.answer()
+        await query.edit_message_text(
+            "❌ Копирование отменено.\n"
+            "Для возврата в меню нажмите /start"
+        )
+        return ConversationHandler.END
@@ -4,9 +4,9 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler, MessageHandler, filters
 
 from src.app.models import Role
-from src.app.services import RoleService, SlotService
+from src.app.services import AsyncRoleService, AsyncSlotService
 from src.infrastructure.telegrambot.handlers.admin.keyboards.menu import get_cancel_keyboard
-from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
 
 from .base import BaseHandler
 from ..menu.navigationmanager import NavigationManager
@@ -22,15 +22,16 @@ class DeleteSlotStates(Enum):
     CONFIRM_BULK_DELETE = 6
 
 class DeleteSlotHandler(BaseHandler):
-    def __init__(self):
-        super().__init__('delete_slot')
+    def __init__(self, engine: AsyncDatabaseEngine):
+        super().__init__('delete_slot', engine)
+        self._slot_service = AsyncSlotService(engine)
+        self._role_service = AsyncRoleService(engine)
 
     def define_states(self) -> type[DeleteSlotStates]:
         return DeleteSlotStates
 
-    def is_available_for_user(self, user_id: int) -> bool:
-        role_service = RoleService(DatabaseEngine())
-        return role_service.get_user_role_by_tg_id(user_id) == Role.ADMIN
+    async def is_available_for_user(self, user_id: int) -> bool:
+        return await self._role_service.get_user_role_by_tg_id(user_id) == Role.ADMIN
 
     def get_conversation_handler(self) -> ConversationHandler:
         return ConversationHandler(
@@ -172,8 +173,7 @@ class DeleteSlotHandler(BaseHandler):
             )
             return DeleteSlotStates.ENTER_SLOT_ID
 
-        slot_service = SlotService(DatabaseEngine())
-        slot = slot_service.get_slot_by_id(slot_id)
+        slot = await self._slot_service.get_slot_by_id(slot_id)
         if not slot:
             await update.message.reply_text(
                 f"❌ Слот с ID {slot_id} не найден.\n"
@@ -184,7 +184,7 @@ class DeleteSlotHandler(BaseHandler):
 
         user_id = update.effective_user.id
 
-        if not self.is_available_for_user(user_id):
+        if not await self.is_available_for_user(user_id):
             await update.message.reply_text(
                 "❌ У вас нет прав на удаление этого слота.\n"
                 "Вы можете удалять только свои слоты.",
@@ -5,8 +5,10 @@ from typing import Optional
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler, MessageHandler, filters
 
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
 from .base import BaseHandler
 
 class EditSlotHandler(BaseHandler):
-    def __init__(self):
-        super().__init__('edit_slot')
\ No newline at end of file
+    def __init__(self, engine: AsyncDatabaseEngine):
+        super().__init__('edit_slot', engine)
\ No newline at end of file
@@ -1,14 +1,17 @@
 import logging
-from typing import Type, TypeVar
+from typing import Optional, Type, TypeVar
 from enum import Enum
+from datetime import datetime
 
 from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes, ConversationHandler, CallbackQueryHandler, MessageHandler, filters
 
 from src.common.utils.validators import *
+from src.app.models import SlotView, SlotFilter, SlotSort, SlotCursor, SlotPage, SlotStatus
 from src.app.models.role import Role
-from src.app.services import RoleService, SlotService
-from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.app.services import AsyncRoleService, AsyncSlotService
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.telegrambot.botcontext import get_identity
 from src.infrastructure.telegrambot.handlers.admin.menu.states import MenuLevel
 from src.infrastructure.telegrambot.handlers.admin.menu import NavigationManager
 from src.infrastructure.telegrambot.handlers.admin.keyboards import *
@@ -32,15 +35,17 @@ class ViewSlotsStates(Enum):
 
 class ViewSlotsHandler(BaseHandler):
 
-    def __init__(self):
-        super().__init__("view_slots")
+    def __init__(self, engine: AsyncDatabaseEngine):
+        super().__init__("view_slots", engine)
         self.item_per_page = 5
+        self._slot_service = AsyncSlotService(engine)
+        self._role_service = AsyncRoleService(engine)
 
     def define_states(self) -> Type[Enum]:
         return ViewSlotsStates
 
-    def is_available_for_user(self, user_id: int) -> bool:
-        role: Role = RoleService(DatabaseEngine()).get_user_role_by_tg_id(user_id)
+    async def is_available_for_user(self, user_id: int) -> bool:
+        role: Role = await self._role_service.get_user_role_by_tg_id(user_id)
         return role == Role.ADMIN
 
     def get_conversation_handler(self) -> ConversationHandler:
@@ -56,7 +61,7 @@ class ViewSlotsHandler(BaseHandler):
                     CallbackQueryHandler(self.handle_quick_action, pattern='^(edit_slot_\d+|delete_slot_\d+|clone_slot_\d+)$')
                     ],
                 ViewSlotsStates.FILTER_SLOTS: [
-                    CallbackQueryHandler(self.apply_filter, pattern='^filter_(all|active|past|future|cancel)$'),
+                    CallbackQueryHandler(self.apply_filter, pattern='^filter_(all|active|past|future|booked|cancel)$'),
                     CallbackQueryHandler(self.cancel_filter, pattern='^cancel_filter$')
                 ],
                 ViewSlotsStates.SORT_SLOTS: [
@@ -90,35 +95,27 @@ class ViewSlotsHandler(BaseHandler):
             'sort_by': 'date_asc',
             'last_active': 'list'
         }
-
-        slots = self._get_slot_for_user(context)
-
-        if not slots:
-            return await self.show_empty_state(update, context)
+        self._reset_pagination(context)
 
         return await self.show_slots_list(update, context)
 
-    async def show_slots_list(self, update: Update, context: Context, slots: list[dict] = None):
-        if slots is None:
-            slots = self._get_slots_for_user(context)
+    async def show_slots_list(self, update: Update, context: Context):
+        view_data = context.user_data['view_slots']
+        page = await self._load_page(context)
 
-        if not slots:
+        if not page.slots and view_data['current_page'] == 0:
             return await self.show_empty_state(update, context)
 
-        view_data = context.user_data['view_slots']
         current_page = view_data['current_page']
-        total_pages = (len(slots) + self.item_per_page - 1) // self.item_per_page
-
-        start_idx = current_page * self.item_per_page
-        end_idx = start_idx + self.item_per_page
-        page_slots = slots[start_idx:end_idx]
+        total_pages = max((view_data['total'] + self.item_per_page - 1) // self.item_per_page, current_page + 1)
 
-        message_text = self._format_list_message(page_slots, current_page, total_pages, view_data)
+        # Статусы приходят в той же выборке, что и страница
+        message_text = self._format_list_message(page.slots, current_page, total_pages, view_data)
 
         keyboard = get_slots_list_keyboard(
-            slots=page_slots,
+            slots=page.slots,
             current_page=current_page,
-            total_pages=total_pages,
+            has_next=page.has_next,
             filter_type=view_data['filter_type'],
             sort_by=view_data['sort_by']
         )
@@ -148,9 +145,7 @@ class ViewSlotsHandler(BaseHandler):
         else:
             slot_id = int(query.data.split('_')[2])
 
-
-        slot_service = SlotService(DatabaseEngine())
-        slot = slot_service.get_slot_by_id(slot_id)
+        slot = await self._slot_service.get_slot_view(slot_id)
         if not slot:
             await query.edit_message_text(
                 "❌ Слот не найден или у вас нет к нему доступа.",
@@ -163,21 +158,22 @@ class ViewSlotsHandler(BaseHandler):
         context.user_data['view_slots']['current_slot_id'] = slot_id
 
         message_text = self._format_slot_details(slot)
-        role_service = RoleService(DatabaseEngine())
 
         keyboard = get_slot_details_keyboard(
             slot_id=slot_id,
-            slot_status=slot.get('status', 'active'),
-            user_role=role_service.get_user_role_by_tg_id(update.effective_user.id),
+            slot_status='booked' if slot.status == SlotStatus.BOOKED else 'active',
+            user_role=get_identity(context).role,
             include_back=True
         )
 
+        previous_slot_id, next_slot_id = await self._get_neighbour_slot_ids(context, slot)
+
         nav_buttons = []
-        if self._has_previous_slot(context, slot_id):
-            nav_buttons.append(InlineKeyboardButton("⬅️ Предыдущий", callback_data=f'view_slot_{slot_id - 1}'))
+        if previous_slot_id is not None:
+            nav_buttons.append(InlineKeyboardButton("⬅️ Предыдущий", callback_data=f'view_slot_{previous_slot_id}'))
 
-        if self._has_next_slot(context, slot_id):
-            nav_buttons.append(InlineKeyboardButton("Следующий ➡️", callback_data=f'view_slot_{slot_id + 1}'))
+        if next_slot_id is not None:
+            nav_buttons.append(InlineKeyboardButton("Следующий ➡️", callback_data=f'view_slot_{next_slot_id}'))
 
         if nav_buttons:
             keyboard.inline_keyboard.append(nav_buttons)
@@ -211,6 +207,7 @@ class ViewSlotsHandler(BaseHandler):
             return await self.show_sort_menu(update, context)
 
         elif action == 'refresh':
+            self._reset_pagination(context, keep_page=True)
             return await self.show_slots_list(update, context)
 
         elif action == 'back_to_list':
@@ -246,13 +243,18 @@ class ViewSlotsHandler(BaseHandler):
         if action.startswith('edit_slot_'):
             slot_id = int(action.split('_')[2])
             from src.infrastructure.telegrambot.handlers.admin.actions.edit_slot import EditSlotHandler
-            edit_handler = EditSlotHandler()
+            edit_handler = EditSlotHandler(self._engine)
             return await edit_handler.start_with_slot(update, context, slot_id)
 
         elif action.startswith('delete_slot_'):
             slot_id = int(action.split('_')[2])
             return await self.show_delete_confirmation(update, context, slot_id)
 
+        elif action.startswith('clone_slot_'):
+            from src.infrastructure.telegrambot.handlers.admin.actions.clone_slot import CloneSlotHandler
+            clone_handler = CloneSlotHandler(self._engine)
+            await clone_handler.start(update, context)
+
         return ViewSlotsStates.SHOW_LIST
 
     async def show_filter_menu(self, update: Update, context: Context):
@@ -267,6 +269,7 @@ class ViewSlotsHandler(BaseHandler):
             ('active', 'Активные', '✅'),
             ('future', 'Будущие', '📅'),
             ('past', 'Прошедшие', '⏳'),
+            ('booked', 'Забронированные', '📋'),
             ('cancel', 'Отмененные', '❌')
         ]
 
@@ -293,7 +296,7 @@ class ViewSlotsHandler(BaseHandler):
 
         filter_type = query.data.split('_')[1]
         context.user_data['view_slots']['filter_type'] = filter_type
-        context.user_data['view_slots']['current_page'] = 0
+        self._reset_pagination(context)
 
         return await self.show_slots_list(update, context)
 
@@ -338,72 +341,80 @@ class ViewSlotsHandler(BaseHandler):
         query = update.callback_query
         await query.answer()
 
-        sort_type = query.data.split('_')[1]
+        sort_type = query.data.removeprefix('sort_')
 
         if sort_type == 'cancel':
             return await self.show_slots_list(update, context)
 
         context.user_data['view_slots']['sort_by'] = sort_type
-        context.user_data['view_slots']['current_page'] = 0
+        self._reset_pagination(context)
 
         return await self.show_slots_list(update, context)
 
-    def _get_slots_for_user(self, context: Context) -> list[dict]:
+    @staticmethod
+    def _reset_pagination(context: Context, keep_page: bool = False) -> None:
+        """Сбросить курсоры страниц и общее число слотов (после смены фильтра/сортировки)."""
         view_data = context.user_data['view_slots']
-        user_id = view_data['user_id']
-
-        all_slots = get_user_slots(user_id)
-
-        filtered_slots = self._apply_filter(all_slots, view_data['filter_type'])
-        sorted_slots = self._apply_sort(filtered_slots, view_data['sort_by'])
-
-        return sorted_slots
-
-    def _apply_filter(self, slots: list[dict], filter_type: str) -> list[dict]:
-        now = datetime.now()
-
-        if filter_type == 'all':
-            return slots
-        elif filter_type == 'active':
-            return [s for s in slots if s.get('status') == 'active']
-        elif filter_type == 'future':
-            return [s for s in slots if self._is_future_slot(s, now)]
-        elif filter_type == 'past':
-            return [s for s in slots if not self._is_future_slot(s, now)]
-        elif filter_type == 'cancel':
-            return [s for s in slots if s.get('status') == 'cancelled']
-
-        return slots
+        if keep_page:
+            view_data['page_cursors'] = view_data.get('page_cursors', [None])[:view_data['current_page'] + 1]
+        else:
+            view_data['current_page'] = 0
+            view_data['page_cursors'] = [None]
+        view_data['total'] = None
 
+    @staticmethod
+    def _get_filter_and_sort(context: Context) -> tuple[SlotFilter, SlotSort]:
+        view_data = context.user_data['view_slots']
+        filter_type = view_data['filter_type']
+        slot_filter = SlotFilter.CANCELLED if filter_type == 'cancel' else SlotFilter(filter_type)
+        return slot_filter, SlotSort(view_data['sort_by'])
+
+    async def _load_page(self, context: Context) -> SlotPage:
+        """
+        Текущая страница списка через keyset-пагинацию.
+
+        Курсоры уже просмотренных страниц хранятся в view_data['page_cursors'],
+        поэтому переход на соседнюю страницу читает только item_per_page строк.
+        Общее число слотов считается один раз после сброса пагинации.
+        """
+        view_data = context.user_data['view_slots']
+        cursors: list[Optional[SlotCursor]] = view_data.setdefault('page_cursors', [None])
+        current_page = min(view_data['current_page'], len(cursors) - 1)
+        view_data['current_page'] = current_page
+
+        slot_filter, sort = self._get_filter_and_sort(context)
+        page = await self._slot_service.get_slots_page(
+            slot_filter=slot_filter,
+            sort=sort,
+            cursor=cursors[current_page],
+            limit=self.item_per_page,
+            with_total=view_data.get('total') is None
+        )
 
-    def _apply_sort(self, slots: list[dict], sort_by: str) -> list[dict]:
-        if sort_by == 'date_asc':
-            return sorted(slots, key=lambda x: (x['date'], x['start_time']))
-        elif sort_by == 'date_desc':
-            return sorted(slots, key=lambda x: (x['date'], x['start_time']), reverse=True)
-        elif sort_by == 'time_asc':
-            return sorted(slots, key=lambda x: x['start_time'])
-        elif sort_by == 'time_desc':
-            return sorted(slots, key=lambda x: x['start_time'], reverse=True)
+        if page.total is not None:
+            view_data['total'] = page.total
+        del cursors[current_page + 1:]
+        if page.has_next:
+            cursors.append(page.next_cursor)
 
-        return slots
+        return page
 
-    def _is_future_slot(self, slot: dict, now: datetime) -> bool:
-        from datetime import datetime as dt
-        slot_datetime = dt.combine(slot['date'], slot['start_time'])
-        return slot_datetime > now
+    async def _get_neighbour_slot_ids(self, context: Context, slot: SlotView) -> tuple[Optional[int], Optional[int]]:
+        """
+        Соседние слоты в текущем порядке списка: по одной строке в каждую сторону.
+        Вхождения повторяющихся правил (без slot_id) пропускаются, переход - к ближайшему сохранённому слоту.
+        """
+        slot_filter, sort = self._get_filter_and_sort(context)
+        cursor = SlotCursor.after(slot)
 
-    def _has_previous_slot(self, context: Context, current_slot_id: int) -> bool:
-        slots = self._get_slots_for_user(context)
-        slot_ids = [s['slot_id'] for s in slots]
-        current_index = slot_ids.index(current_slot_id) if current_slot_id in slot_ids else -1
-        return current_index > 0
+        previous_page = await self._slot_service.get_slots_page(
+            slot_filter, sort.reversed(), cursor, limit=1, stored_only=True
+        )
+        next_page = await self._slot_service.get_slots_page(slot_filter, sort, cursor, limit=1, stored_only=True)
 
-    def _has_next_slot(self, context: Context, current_slot_id: int) -> bool:
-        slots = self._get_slots_for_user(context)
-        slot_ids = [s['slot_id'] for s in slots]
-        current_index = slot_ids.index(current_slot_id) if current_slot_id in slot_ids else -1
-        return current_index < len(slot_ids) - 1 and current_index != -1
+        previous_slot_id = previous_page.slots[0].slot_id if previous_page.slots else None
+        next_slot_id = next_page.slots[0].slot_id if next_page.slots else None
+        return previous_slot_id, next_slot_id
 
     async def show_another_slot(self, update: Update, context: Context):
         query = update.callback_query
@@ -411,12 +422,14 @@ class ViewSlotsHandler(BaseHandler):
 
         return await self.show_slot_details(update, context)
 
-    def _format_list_message(self, slots: list[dict], current_page: int, total_pages: int, view_data: dict) -> str:
+    def _format_list_message(self, slots: list[SlotView], current_page: int, total_pages: int,
+                             view_data: dict) -> str:
         filter_names = {
             'all': 'Все слоты',
             'active': 'Активные',
             'future': 'Будущие',
             'past': 'Прошедшие',
+            'booked': 'Забронированные',
             'cancel': 'Отмененные'
         }
 
@@ -438,63 +451,60 @@ class ViewSlotsHandler(BaseHandler):
             return f"{header}\n📭 Список пуст"
 
         slots_text = "\n".join([
-            self._format_slot_list_item(slot, idx + current_page * self.items_per_page + 1)
+            self._format_slot_list_item(slot, idx + current_page * self.item_per_page + 1)
             for idx, slot in enumerate(slots)
         ])
 
         return f"{header}\n\n{slots_text}"
 
-    def _format_slot_list_item(self, slot: dict, index: int) -> str:
-        date_str = slot['date'].strftime("%d.%m.%Y")
-        time_str = slot['start_time'].strftime("%H:%M")
-        duration = slot['duration']
+    def _format_slot_list_item(self, slot: SlotView, index: int) -> str:
+        date_str = slot.date.strftime("%d.%m.%Y")
+        time_str = slot.start_time.strftime("%H:%M")
+        duration = slot.duration_in_minutes
 
         status_icons = {
-            'active': '✅',
-            'booked': '📅',
-            'cancelled': '❌',
-            'completed': '✔️'
+            SlotStatus.FREE: '✅',
+            SlotStatus.BOOKED: '📅',
+            SlotStatus.CANCELLED: '❌'
         }
 
-        status_icon = status_icons.get(slot.get('status', 'active'), '🔘')
+        status_icon = status_icons[slot.status]
+        if slot.status == SlotStatus.BOOKED and slot.end_time <= datetime.now():
+            status_icon = '✔️' # Запись уже прошла
+
+        if slot.is_virtual:
+            return f"{index}. 🔁 <b>{date_str} {time_str}</b> ({duration} мин)"
 
         return (
             f"{index}. {status_icon} <b>{date_str} {time_str}</b> "
-            f"({duration} мин) /slot_{slot['id']}"
+            f"({duration} мин) /slot_{slot.slot_id}"
         )
 
-    def _format_slot_details(self, slot: dict) -> str:
-        date_str = slot['date'].strftime("%d.%m.%Y")
-        time_str = slot['start_time'].strftime("%H:%M")
-        end_time = self._calculate_end_time(slot['start_time'], slot['duration'])
-        created_str = slot['created_at'].strftime("%d.%m.%Y %H:%M") if slot.get('created_at') else "неизвестно"
+    def _format_slot_details(self, slot: SlotView) -> str:
+        date_str = slot.date.strftime("%d.%m.%Y")
+        time_str = slot.start_time.strftime("%H:%M")
+        end_time = slot.end_time.strftime("%H:%M")
+        created_str = slot.created_at.strftime("%d.%m.%Y %H:%M") if slot.created_at else "неизвестно"
 
         status_texts = {
-            'active': '🟢 Активный',
-            'booked': '📅 Забронирован',
-            'cancelled': '🔴 Отменен',
-            'completed': '✔️ Завершен'
+            SlotStatus.FREE: '🟢 Свободен',
+            SlotStatus.BOOKED: '📅 Забронирован',
+            SlotStatus.CANCELLED: '🔴 Запись отменена'
         }
 
-        status = status_texts.get(slot.get('status', 'active'), '❓ Неизвестно')
+        status = status_texts[slot.status]
+        if slot.status == SlotStatus.BOOKED and slot.end_time <= datetime.now():
+            status = '✔️ Завершен'
 
         return (
-            f"📋 <b>Детали слота #{slot['id']}</b>\n\n"
+            f"📋 <b>Детали слота #{slot.slot_id}</b>\n\n"
             f"📅 <b>Дата:</b> {date_str}\n"
             f"⏰ <b>Время:</b> {time_str} - {end_time}\n"
-            f"⏱️ <b>Длительность:</b> {slot['duration']} минут\n"
+            f"⏱️ <b>Длительность:</b> {slot.duration_in_minutes} минут\n"
             f"📊 <b>Статус:</b> {status}\n"
-            f"👤 <b>Создатель:</b> {slot.get('creator_name', 'Неизвестно')}\n"
-            f"📝 <b>Описание:</b> {slot.get('description', 'нет')}\n"
             f"🕒 <b>Создан:</b> {created_str}\n"
         )
 
-    def _calculate_end_time(self, start_time, duration_minutes):
-        from datetime import datetime, timedelta
-        start_dt = datetime.combine(datetime.today(), start_time)
-        end_dt = start_dt + timedelta(minutes=duration_minutes)
-        return end_dt.strftime("%H:%M")
-
     async def show_empty_state(self, update: Update, context: Context) -> int:
         keyboard = get_empty_slots_keyboard()
 
@@ -536,7 +546,7 @@ class ViewSlotsHandler(BaseHandler):
     async def start_edit_slot(self, update: Update, context: Context, slot_id: int):
         """Начать редактирование слота"""
         from src.infrastructure.telegrambot.handlers.admin.actions.edit_slot import EditSlotHandler
-        edit_handler = EditSlotHandler()
+        edit_handler = EditSlotHandler(self._engine)
 
         # Сохраняем контекст для возврата
         context.user_data['return_from_edit'] = {
@@ -550,7 +560,7 @@ class ViewSlotsHandler(BaseHandler):
     async def start_delete_slot(self, update: Update, context: Context, slot_id: int):
         """Начать удаление слота"""
         from  src.infrastructure.telegrambot.handlers.admin.actions.delete_slot import DeleteSlotHandler
-        delete_handler = DeleteSlotHandler()
+        delete_handler = DeleteSlotHandler(self._engine)
 
         # Сохраняем контекст для возврата
         context.user_data['return_from_delete'] = {
@@ -566,14 +576,13 @@ class ViewSlotsHandler(BaseHandler):
         query = update.callback_query
         await query.answer()
 
-        slot_service = SlotService(DatabaseEngine())
-        slot = slot_service.get_slot_by_id(slot_id)
+        slot = await self._slot_service.get_slot_view(slot_id)
         if not slot:
             await query.answer("Слот не найден", show_alert=True)
             return await self.show_slots_list(update, context)
 
-        date_str = slot['date'].strftime("%d.%m.%Y")
-        time_str = slot['start_time'].strftime("%H:%M")
+        date_str = slot.date.strftime("%d.%m.%Y")
+        time_str = slot.start_time.strftime("%H:%M")
 
         keyboard = [
             [
@@ -1,6 +1,7 @@
 from telegram import InlineKeyboardButton, InlineKeyboardMarkup
 from typing import List, Dict
 
+from src.app.models import SlotView
 from src.app.models.role import Role
 
 
@@ -151,24 +152,28 @@ def get_filter_keyboard(current_filter: str) -> InlineKeyboardMarkup:
     return InlineKeyboardMarkup(keyboard)
 
 
-def get_slots_list_keyboard(slots: List[Dict], current_page: int, total_pages: int,
+def get_slots_list_keyboard(slots: List[SlotView], current_page: int, has_next: bool,
                             filter_type: str, sort_by: str) -> InlineKeyboardMarkup:
     """Клавиатура для списка слотов"""
     keyboard = []
 
-    # Кнопки для каждого слота
+    # Кнопки для каждого слота. Вхождения повторяющихся правил ещё не сохранены,
+    # действий над ними нет
     for slot in slots:
-        date_str = slot['date'].strftime("%d.%m")
-        time_str = slot['start_time'].strftime("%H:%M")
+        if slot.is_virtual:
+            continue
 
-        button_text = f"📅 {date_str} {time_str} ({slot['duration']} мин)"
-        callback_data = f"view_slot_{slot['id']}"
+        date_str = slot.start_time.strftime("%d.%m")
+        time_str = slot.start_time.strftime("%H:%M")
+
+        button_text = f"📅 {date_str} {time_str} ({slot.duration_in_minutes} мин)"
+        callback_data = f"view_slot_{slot.slot_id}"
 
         # Быстрые действия
         quick_actions = [
-            InlineKeyboardButton("✏️", callback_data=f"edit_slot_{slot['id']}"),
-            InlineKeyboardButton("🗑️", callback_data=f"delete_slot_{slot['id']}"),
-            InlineKeyboardButton("📋", callback_data=f"clone_slot_{slot['id']}")
+            InlineKeyboardButton("✏️", callback_data=f"edit_slot_{slot.slot_id}"),
+            InlineKeyboardButton("🗑️", callback_data=f"delete_slot_{slot.slot_id}"),
+            InlineKeyboardButton("📋", callback_data=f"clone_slot_{slot.slot_id}")
         ]
 
         keyboard.append([
@@ -185,7 +190,7 @@ def get_slots_list_keyboard(slots: List[Dict], current_page: int, total_pages: i
     keyboard.append(filter_buttons)
 
     # Пагинация
-    if total_pages > 1:
+    if current_page > 0 or has_next:
         pagination_row = []
 
         if current_page > 0:
@@ -193,7 +198,7 @@ def get_slots_list_keyboard(slots: List[Dict], current_page: int, total_pages: i
                 InlineKeyboardButton("⬅️ Предыдущая", callback_data=f'page_{current_page - 1}')
             )
 
-        if current_page < total_pages - 1:
+        if has_next:
             pagination_row.append(
                 InlineKeyboardButton("Следующая ➡️", callback_data=f'page_{current_page + 1}')
             )
@@ -5,10 +5,9 @@ from telegram import Update, InlineKeyboardMarkup, InlineKeyboardButton
 from telegram.ext import ContextTypes, CommandHandler, CallbackQueryHandler
 
 from src.app.models.role import Role
-from src.app.services import RoleService
 from src.infrastructure.telegrambot.handlers.admin.keyboards.menu import get_main_menu_keyboard
 from src.infrastructure.telegrambot.handlers.admin.menu.states import MenuLevel
-from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.telegrambot.botcontext import get_identity
 
 logging.basicConfig(
     format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
@@ -23,8 +22,7 @@ class MainMenuHandler:
 
     @staticmethod
     async def show(update: Update, context: Context, message: str = None) -> MenuLevel:
-        user_id = update.effective_user.id
-        user_role = RoleService(DatabaseEngine()).get_user_role_by_tg_id(user_id)
+        user_role = get_identity(context).role
 
         context.user_data['current_menu'] = MenuLevel.MAIN
         context.user_data['user_role'] = user_role
@@ -4,6 +4,7 @@ from telegram import Update, InlineKeyboardButton, InlineKeyboardMarkup
 from telegram.ext import ContextTypes
 
 from src.infrastructure.telegrambot.handlers.admin.menu.states import MenuLevel, NavigationState
+from src.infrastructure.telegrambot.botcontext import get_db_engine
 
 
 class NavigationManager:
@@ -113,7 +114,7 @@ class NavigationManager:
     @staticmethod
     async def return_to_view_slots(update: Update, context: ContextTypes.DEFAULT_TYPE, message: str = None) -> int:
         from .view_slot import ViewSlotsHandler
-        view_handler = ViewSlotsHandler()
+        view_handler = ViewSlotsHandler(get_db_engine(context))
 
         if 'return_from_edit' in context.user_data:
             return_data = context.user_data.pop('return_from_edit')
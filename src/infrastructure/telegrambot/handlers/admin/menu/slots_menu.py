@@ -9,6 +9,7 @@ from src.app.models.role import Role
 from src.infrastructure.telegrambot.handlers.admin.actions import AddSlotHandler
 from src.infrastructure.telegrambot.handlers.admin.menu.states import MenuLevel
 from src.infrastructure.telegrambot.handlers.admin.keyboards import get_slots_menu_keyboard
+from src.infrastructure.telegrambot.botcontext import get_db_engine
 
 Context = TypeVar('Context', bound=ContextTypes.DEFAULT_TYPE)
 
@@ -100,7 +101,7 @@ class SlotMenuHandler:
         context.user_data['last_slots_action'] = action_id
 
         if action_id == 'add_slot':
-            add_slot_handler = AddSlotHandler()
+            add_slot_handler = AddSlotHandler(get_db_engine(context))
             return await add_slot_handler.start(update, context)
 
         # elif action_id == 'view_slots':
@@ -116,12 +117,6 @@ class SlotMenuHandler:
         #     # Показываем меню выбора слотов для удаления
         #     await SlotsMenuHandler._show_delete_slot_menu(update, context)
         #     return MenuLevel.SLOTS
-        #
-        # elif action_id == 'bulk_slots':
-        #     # Переходим к массовому добавлению
-        #     from handlers.actions.bulk_slots import BulkSlotsHandler
-        #     bulk_handler = BulkSlotsHandler()
-        #     return await bulk_handler.start(update, context)
 
         else:
             await query.edit_message_text(
@@ -135,11 +130,16 @@ class SlotMenuHandler:
     @staticmethod
     async def _show_edit_slot_menu(update: Update, context: Context):
         """Показать меню выбора слотов для редактирования"""
-        from src.app.services import SlotService
-        from src.infrastructure.postgres.databaseengine import DatabaseEngine
+        from src.app.models import SlotSort
+        from src.app.services import AsyncSlotService
 
         user_id = update.effective_user.id
-        slots = SlotService(DatabaseEngine()).get_slots()
+        # Первые 10 слотов одной страницей без ORM-объектов. Вхождения правил ещё не сохранены,
+        # редактировать их нечего - они отсекаются в запросе, а не после limit
+        page = await AsyncSlotService(get_db_engine(context)).get_slots_page(
+            sort=SlotSort.DATE_ASC, limit=10, stored_only=True
+        )
+        slots = page.slots
 
         if not slots:
             keyboard = [
@@ -156,11 +156,11 @@ class SlotMenuHandler:
 
         # Создаем клавиатуру со списком слотов
         keyboard = []
-        for slot in slots[:10]:  # Ограничиваем 10 слотами для удобства
-            date_str = slot['date'].strftime("%d.%m")
-            time_str = slot['start_time'].strftime("%H:%M")
-            button_text = f"📅 {date_str} {time_str} ({slot['duration']} мин)"
-            callback_data = f"edit_slot_{slot['id']}"
+        for slot in slots:
+            date_str = slot.date.strftime("%d.%m")
+            time_str = slot.start_time.strftime("%H:%M")
+            button_text = f"📅 {date_str} {time_str} ({slot.duration_in_minutes} мин)"
+            callback_data = f"edit_slot_{slot.slot_id}"
             keyboard.append([InlineKeyboardButton(button_text, callback_data=callback_data)])
 
         # Добавляем кнопки навигации
@@ -178,9 +178,10 @@ class SlotMenuHandler:
 
     def get_handlers(self):
         """Получить обработчики меню слотов"""
+        # bulk_slots обрабатывает точка входа BulkSlotsHandler
         return [
             CallbackQueryHandler(self.handle_selection,
-                               pattern='^(add_slot|view_slots|edit_slot|delete_slot|bulk_slots|slot_statistics)$'),
+                               pattern='^(add_slot|view_slots|edit_slot|delete_slot|slot_statistics)$'),
             CallbackQueryHandler(lambda u, c: self.show(u, c, "↩️ Возврат к управлению слотами"),
                                pattern='^back_to_slots$')
         ]
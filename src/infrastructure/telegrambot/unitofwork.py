@@ -0,0 +1,85 @@
+import logging
+from contextvars import ContextVar, Token
+from typing import Optional
+
+from telegram import Update
+from telegram.ext import Application, TypeHandler
+
+from src.app.models import Role
+from src.app.services import AsyncRoleService
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.replicarouter import reset_current_actor, set_current_actor
+from src.infrastructure.postgres.unitofwork import get_current_unit_of_work
+
+from .botcontext import UpdateIdentity, set_identity
+
+logger = logging.getLogger(__name__)
+
+# Группа раньше всех хендлеров приложения (они регистрируются в группе 0)
+MIDDLEWARE_GROUP = -1
+
+# Токен привязки к пользователю, которую UnitOfWorkApplication снимает после апдейта
+_actor_token: ContextVar[Optional[Token]] = ContextVar('planify_update_actor_token', default=None)
+
+
+class UnitOfWorkMiddleware:
+    """
+    Открывает одну сессию БД на апдейт и определяет, кто его прислал.
+
+    Регистрируется в группе MIDDLEWARE_GROUP, поэтому выполняется до остальных
+    хендлеров. Роль и id user/client (одним запросом, из кеша AsyncRoleService)
+    кладутся в context (см. get_identity), сервисы внутри апдейта прозрачно
+    работают в общей сессии, каждый вызов - своей короткой транзакцией, чтобы
+    запросы к Telegram не шли с открытой транзакцией.
+    Сессию закрывает UnitOfWorkApplication после обработки апдейта.
+    """
+
+    def __init__(self, engine: AsyncDatabaseEngine):
+        self._engine = engine
+        self._role_service = AsyncRoleService(engine)
+
+    def get_handler(self) -> TypeHandler:
+        return TypeHandler(Update, self.open)
+
+    async def open(self, update: Update, context) -> None:
+        tg_id: Optional[int] = update.effective_user.id if update.effective_user else None
+        _actor_token.set(set_current_actor(tg_id))
+        self._engine.begin_unit_of_work()
+        set_identity(context, await self._resolve_identity(tg_id))
+
+    async def _resolve_identity(self, tg_id: Optional[int]) -> UpdateIdentity:
+        if tg_id is None:
+            return UpdateIdentity(tg_id=None, role=Role.GUEST)
+
+        caller = await self._role_service.get_caller_by_tg_id(tg_id)
+        return UpdateIdentity(tg_id=tg_id, role=caller.role, user_id=caller.user_id, client_id=caller.client_id)
+
+
+class UnitOfWorkApplication(Application):
+    """
+    Application, закрывающий после каждого апдейта unit of work, открытый UnitOfWorkMiddleware,
+    и снимающий его привязку к пользователю: задачи, запущенные позже, не маршрутизируют
+    чтения от имени последнего пользователя.
+    """
+
+    async def process_update(self, update: object) -> None:
+        try:
+            await super().process_update(update)
+        finally:
+            unit_of_work = get_current_unit_of_work()
+            if unit_of_work is not None:
+                try:
+                    await unit_of_work.finish()
+                except Exception as e:
+                    await super().process_error(update=update, error=e)
+            actor_token = _actor_token.get()
+            if actor_token is not None:
+                reset_current_actor(actor_token)
+                _actor_token.set(None)
+
+    async def process_error(self, update: Optional[object], error: Exception, job=None, coroutine=None) -> bool:
+        # Завершённые вызовы сервисов уже зафиксированы, откатится только незакрытая транзакция
+        unit_of_work = get_current_unit_of_work()
+        if update is not None and unit_of_work is not None:
+            unit_of_work.mark_failed()
+        return await super().process_error(update=update, error=error, job=job, coroutine=coroutine)
@@ -0,0 +1,31 @@
+import logging
+
+from telegram import Bot
+
+from src.app.models import WaitlistPromotion
+
+logger = logging.getLogger(__name__)
+
+
+class WaitlistNotifier:
+    """
+    Сообщение клиенту, которому из листа ожидания досталась запись на освободившийся слот.
+    Передаётся в AsyncAppointmentService как on_promotion и вызывается после commit отмены.
+    """
+
+    def __init__(self, bot: Bot):
+        self._bot = bot
+
+    async def notify_promotion(self, promotion: WaitlistPromotion) -> None:
+        if promotion.tg_client_id is None:
+            logger.warning(
+                f'Client {promotion.client_id} has no Telegram id, slot {promotion.slot_id} promotion is silent'
+            )
+            return
+
+        await self._bot.send_message(
+            chat_id=promotion.tg_client_id,
+            text=f"🎉 Освободился слот {promotion.start_time.strftime('%d.%m.%Y %H:%M')}, "
+                 "которого вы ждали в листе ожидания.\n"
+                 "Вы записаны на него, запись ожидает подтверждения."
+        )
@@ -0,0 +1,190 @@
+import asyncio
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+
+from src.app.models import Slot, SlotRecurrence, Appointment, AppointmentStatus
+from src.app.services import SlotService, AppointmentService, AsyncAppointmentService, SlotBookedError
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+from tests.integration.common.fixture import clean_database
+
+
+def _add_slots(engine: DatabaseEngine, count: int) -> list[datetime]:
+    starts = [datetime(2025, 11, 3, 9, 0, 0) + timedelta(hours=i) for i in range(count)]
+    SlotService(engine).add_slots([
+        Slot(start_time=start, end_time=start + timedelta(hours=1), duration_in_minutes=60) for start in starts
+    ])
+    return starts
+
+
+def test_appointment_service_book_slot(clean_database):
+    engine = DatabaseEngine()
+    service = AppointmentService(engine)
+    _add_slots(engine, 1)
+
+    cancelled = Appointment(slot_id=1, status=AppointmentStatus.PENDING)
+    service.book_slot(cancelled)
+    with pytest.raises(SlotBookedError):
+        service.book_slot(Appointment(slot_id=1, status=AppointmentStatus.PENDING))
+    with pytest.raises(SlotBookedError):
+        service.create_appointment(Appointment(slot_id=1, status=AppointmentStatus.CONFIRMED))
+    with pytest.raises(ValueError):
+        service.book_slot(Appointment(slot_id=100, status=AppointmentStatus.PENDING))
+
+    service.cancel_appointment(cancelled.appointment_id)
+    service.book_slot(Appointment(slot_id=1, status=AppointmentStatus.CONFIRMED))
+
+    assert [a.status for a in service.iter_appointments()] == [AppointmentStatus.CANCELLED, AppointmentStatus.CONFIRMED]
+
+
+def test_appointment_service_book_slot_concurrently(clean_database):
+    engine = DatabaseEngine()
+    service = AppointmentService(engine)
+    _add_slots(engine, 1)
+
+    def book(_) -> bool:
+        try:
+            service.book_slot(Appointment(slot_id=1, status=AppointmentStatus.PENDING))
+            return True
+        except SlotBookedError:
+            return False
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        booked = list(executor.map(book, range(8)))
+
+    assert booked.count(True) == 1
+    assert len(list(service.iter_appointments())) == 1
+
+
+def test_appointment_service_book_first_free_slot_concurrently(clean_database):
+    engine = DatabaseEngine()
+    service = AppointmentService(engine)
+    starts = _add_slots(engine, 5)
+    service.book_slot(Appointment(slot_id=1, status=AppointmentStatus.CONFIRMED))
+
+    def book(_) -> bool:
+        return service.book_first_free_slot(
+            Appointment(status=AppointmentStatus.PENDING), starts[0], starts[-1] + timedelta(hours=1)
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        booked = list(executor.map(book, range(6)))
+
+    assert booked.count(True) == 4
+    assert sorted(a.slot_id for a in service.iter_appointments()) == [1, 2, 3, 4, 5]
+
+
+def _add_recurrence(engine: DatabaseEngine) -> int:
+    # Пн 03.11.2025 09:00-12:00 по часу
+    recurrence = SlotRecurrence(
+        weekdays=SlotRecurrence.weekdays_mask([0]),
+        start_time=time(9, 0),
+        end_time=time(12, 0),
+        slot_duration_in_minutes=60,
+        valid_from=date(2025, 11, 3),
+        valid_until=date(2025, 11, 3)
+    )
+    SlotService(engine).add_recurrence(recurrence)
+    return recurrence.recurrence_id
+
+
+def test_appointment_service_book_occurrence(clean_database):
+    engine = DatabaseEngine()
+    service = AppointmentService(engine)
+    recurrence_id = _add_recurrence(engine)
+
+    appointment = Appointment(status=AppointmentStatus.PENDING)
+    service.book_occurrence(appointment, recurrence_id, datetime(2025, 11, 3, 10, 0, 0))
+    with pytest.raises(SlotBookedError):
+        service.book_occurrence(Appointment(status=AppointmentStatus.PENDING), recurrence_id, datetime(2025, 11, 3, 10))
+    with pytest.raises(ValueError):
+        service.book_occurrence(Appointment(status=AppointmentStatus.PENDING), recurrence_id, datetime(2025, 11, 3, 10, 30))
+
+    slot = SlotService(engine).get_slot_by_id(appointment.slot_id)
+    assert (slot.recurrence_id, slot.start_time) == (recurrence_id, datetime(2025, 11, 3, 10, 0, 0))
+    assert len(list(service.iter_appointments())) == 1
+
+
+def test_appointment_service_book_first_free_slot_takes_occurrences(clean_database):
+    engine = DatabaseEngine()
+    service = AppointmentService(engine)
+    _add_recurrence(engine)
+    # Сохранённый слот 10:00 перекрывает вхождение, остаются вхождения 09:00 и 11:00
+    SlotService(engine).add_slot(Slot(
+        start_time=datetime(2025, 11, 3, 10), end_time=datetime(2025, 11, 3, 11), duration_in_minutes=60
+    ))
+
+    def book(_) -> bool:
+        return service.book_first_free_slot(
+            Appointment(status=AppointmentStatus.PENDING), datetime(2025, 11, 3), datetime(2025, 11, 4)
+        )
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        booked = list(executor.map(book, range(4)))
+
+    starts = sorted(SlotService(engine).get_slot_by_id(a.slot_id).start_time for a in service.iter_appointments())
+    assert booked.count(True) == 3
+    assert starts == [datetime(2025, 11, 3, 9), datetime(2025, 11, 3, 10), datetime(2025, 11, 3, 11)]
+
+
+def test_appointment_service_reschedule_appointment(clean_database):
+    engine = DatabaseEngine()
+    service = AppointmentService(engine)
+    _add_slots(engine, 3)
+    first = Appointment(slot_id=1, status=AppointmentStatus.CONFIRMED)
+    service.book_slot(first)
+    service.book_slot(Appointment(slot_id=2, status=AppointmentStatus.CONFIRMED))
+
+    with pytest.raises(SlotBookedError):
+        service.reschedule_appointment(first.appointment_id, Slot(slot_id=2))
+    service.reschedule_appointment(first.appointment_id, Slot(slot_id=3))
+    service.reschedule_appointment(first.appointment_id, Slot(slot_id=3))
+
+    assert service.get_appointment_by_id(first.appointment_id).slot_id == 3
+    service.book_slot(Appointment(slot_id=1, status=AppointmentStatus.PENDING))
+
+
+def test_async_appointment_service_book_slot_concurrently(clean_database):
+    _add_slots(DatabaseEngine(), 2)
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncAppointmentService(engine)
+        results = await asyncio.gather(
+            *[service.book_slot(Appointment(slot_id=1, status=AppointmentStatus.PENDING)) for _ in range(5)],
+            return_exceptions=True
+        )
+        free = await service.book_first_free_slot(
+            Appointment(status=AppointmentStatus.PENDING), datetime(2025, 11, 3), datetime(2025, 11, 4)
+        )
+        await engine.dispose()
+        return results, free
+
+    results, free = asyncio.run(scenario())
+
+    assert sum(r is None for r in results) == 1
+    assert all(isinstance(r, SlotBookedError) for r in results if r is not None)
+    assert free
+
+
+def test_async_appointment_service_books_occurrences(clean_database):
+    recurrence_id = _add_recurrence(DatabaseEngine())
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncAppointmentService(engine)
+        appointment = Appointment(status=AppointmentStatus.PENDING)
+        await service.book_occurrence(appointment, recurrence_id, datetime(2025, 11, 3, 11, 0, 0))
+        first_free = Appointment(status=AppointmentStatus.PENDING)
+        await service.book_first_free_slot(first_free, datetime(2025, 11, 3), datetime(2025, 11, 4))
+        await engine.dispose()
+        return appointment, first_free
+
+    appointment, first_free = asyncio.run(scenario())
+
+    slot_service = SlotService(DatabaseEngine())
+    assert slot_service.get_slot_by_id(appointment.slot_id).start_time == datetime(2025, 11, 3, 11, 0, 0)
+    assert slot_service.get_slot_by_id(first_free.slot_id).start_time == datetime(2025, 11, 3, 9, 0, 0)
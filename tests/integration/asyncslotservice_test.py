@@ -0,0 +1,212 @@
+import asyncio
+import pytest
+
+from datetime import date, datetime, time
+
+from src.app.models import Slot, SlotRecurrence
+from src.app.services import AsyncSlotService, SlotDayCache, SlotOverlapError
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+from tests.integration.common.fixture import clean_database
+
+
+def test_async_slot_service_add_slot(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        slot = Slot(
+            start_time=datetime(2025, 10, 15, 12, 0, 0),
+            end_time=datetime(2025, 10, 15, 13, 0, 0),
+            duration_in_minutes=60
+        )
+
+        await service.add_slot(slot)
+        result = await service.get_slot_by_id(slot.slot_id)
+        await engine.dispose()
+        return slot, result
+
+    slot, result = asyncio.run(scenario())
+
+    assert result == slot
+
+
+def test_async_slot_service_get_slots_by_date(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        slots = [
+            Slot(
+                start_time=datetime(2025, 11, 11, 12, 0, 0),
+                end_time=datetime(2025, 11, 11, 13, 0, 0),
+                duration_in_minutes=60
+            ),
+            Slot(
+                start_time=datetime(2025, 11, 11, 13, 30, 0),
+                end_time=datetime(2025, 11, 11, 15, 0, 0),
+                duration_in_minutes=90
+            ),
+            Slot(
+                start_time=datetime(2025, 11, 12, 9, 0, 0),
+                end_time=datetime(2025, 11, 12, 10, 0, 0),
+                duration_in_minutes=60
+            )
+        ]
+
+        for s in slots:
+            await service.add_slot(s)
+
+        result = await asyncio.gather(
+            service.get_slots_by_date(datetime(2025, 11, 11).date()),
+            service.get_slots_by_date(datetime(2025, 11, 12).date())
+        )
+        await engine.dispose()
+        return slots, result
+
+    slots, (first_day, second_day) = asyncio.run(scenario())
+
+    assert first_day == slots[:2]
+    assert second_day == slots[2:]
+
+
+def test_async_slot_service_add_slot_rejects_overlap(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        await service.add_slot(Slot(
+            start_time=datetime(2025, 10, 15, 12, 0, 0),
+            end_time=datetime(2025, 10, 15, 13, 0, 0),
+            duration_in_minutes=60
+        ))
+        try:
+            await service.add_slot(Slot(
+                start_time=datetime(2025, 10, 15, 11, 0, 0),
+                end_time=datetime(2025, 10, 15, 14, 0, 0),
+                duration_in_minutes=180
+            ))
+        finally:
+            await engine.dispose()
+
+    with pytest.raises(SlotOverlapError) as error:
+        asyncio.run(scenario())
+
+    assert [s.start_time.hour for s in error.value.conflicts] == [12]
+
+
+def test_async_slot_service_add_slots(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        result = await service.add_slots([
+            Slot(start_time=datetime(2025, 10, 15, 9, 0, 0), end_time=datetime(2025, 10, 15, 10, 0, 0), duration_in_minutes=60),
+            Slot(start_time=datetime(2025, 10, 15, 9, 30, 0), end_time=datetime(2025, 10, 15, 10, 30, 0), duration_in_minutes=60),
+        ])
+        await engine.dispose()
+        return result
+
+    result = asyncio.run(scenario())
+
+    assert [s.slot_id for s in result.inserted] == [1]
+    assert [s.start_time.minute for s in result.rejected] == [30]
+
+
+def test_async_slot_service_clone_day(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        await service.add_slot(Slot(
+            start_time=datetime(2025, 11, 3, 10, 0, 0),
+            end_time=datetime(2025, 11, 3, 11, 0, 0),
+            duration_in_minutes=60
+        ))
+        created = await service.clone_day(
+            datetime(2025, 11, 3).date(), datetime(2025, 11, 4).date(), datetime(2025, 11, 5).date()
+        )
+        slots = await service.get_slots()
+        await engine.dispose()
+        return created, slots
+
+    created, slots = asyncio.run(scenario())
+
+    assert len(created) == 2
+    assert [s.start_time.day for s in slots] == [3, 4, 5]
+
+
+def test_async_slot_service_materialize_occurrence(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        recurrence = SlotRecurrence(
+            weekdays=SlotRecurrence.weekdays_mask([0]),
+            start_time=time(9, 0),
+            end_time=time(10, 0),
+            slot_duration_in_minutes=30,
+            valid_from=date(2025, 11, 3),
+            valid_until=date(2025, 11, 30)
+        )
+        await service.add_recurrence(recurrence)
+        before = await service.get_slots_by_date(date(2025, 11, 10))
+        slot = await service.materialize_occurrence(recurrence.recurrence_id, datetime(2025, 11, 10, 9, 30, 0))
+        after = await service.get_slots_by_date(date(2025, 11, 10))
+        await engine.dispose()
+        return before, slot, after
+
+    before, slot, after = asyncio.run(scenario())
+
+    assert [s.is_virtual for s in before] == [True, True]
+    assert slot.start_time == datetime(2025, 11, 10, 9, 30, 0)
+    assert [s.slot_id for s in after] == [None, slot.slot_id]
+
+
+def test_async_slot_service_day_cache(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine, day_cache=SlotDayCache())
+        day = date(2025, 11, 10)
+
+        before = await asyncio.gather(*[service.get_slots_by_date(day) for _ in range(10)])
+        queries = sum(s.count for s in engine.query_stats() if 'FROM slot' in s.sql)
+
+        await service.add_slot(Slot(
+            start_time=datetime(2025, 11, 10, 9, 0, 0),
+            end_time=datetime(2025, 11, 10, 10, 0, 0),
+            duration_in_minutes=60
+        ))
+        after = await service.get_slots_by_date(day)
+        await engine.dispose()
+        return before, queries, after
+
+    before, queries, after = asyncio.run(scenario())
+
+    assert before == [[]] * 10
+    # Один промах: запрос слотов дня и запрос вхождений правил
+    assert queries == 2
+    assert [s.start_time for s in after] == [datetime(2025, 11, 10, 9, 0, 0)]
+
+
+def test_async_slot_service_iter_slots(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+        await service.add_slots([
+            Slot(
+                start_time=datetime(2025, 11, 10, 9 + i, 0, 0),
+                end_time=datetime(2025, 11, 10, 10 + i, 0, 0),
+                duration_in_minutes=60
+            )
+            for i in range(5)
+        ])
+        streamed = [s async for s in service.iter_slots(chunk_size=2)]
+        in_range = [s async for s in service.iter_slots(datetime(2025, 11, 10, 10), datetime(2025, 11, 10, 12))]
+        await engine.dispose()
+        return streamed, in_range
+
+    streamed, in_range = asyncio.run(scenario())
+
+    assert [s.start_time.hour for s in streamed] == [9, 10, 11, 12, 13]
+    assert [s.start_time.hour for s in in_range] == [10, 11]
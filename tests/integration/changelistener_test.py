@@ -0,0 +1,53 @@
+import asyncio
+from datetime import date, datetime
+
+from src.app.models import Slot, User
+from src.app.services import AsyncSlotService, AsyncUserService
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.notifications import ALL, SLOT, USER, ChangeEvent
+
+from tests.integration.common.fixture import clean_database
+
+
+def test_change_listener_receives_committed_writes(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        received: list[ChangeEvent] = []
+        engine.notifications.subscribe(received.append)
+        listener = engine.change_listener()
+        task = asyncio.create_task(listener.run())
+        await asyncio.wait_for(listener.wait_listening(), 5)
+
+        slot = Slot(
+            start_time=datetime(2025, 10, 15, 12, 0, 0),
+            end_time=datetime(2025, 10, 15, 13, 0, 0),
+            duration_in_minutes=60
+        )
+        await AsyncSlotService(engine).add_slot(slot)
+        await AsyncUserService(engine).add_user(User(tg_user_id=10, first_name='Admin', last_name='Admin'))
+
+        # Откаченная запись ничего не рассылает
+        try:
+            async with engine.session() as session:
+                await session.execute(engine.notifications.query([ChangeEvent(USER, 20)]))
+                raise RuntimeError('rollback')
+        except RuntimeError:
+            pass
+
+        for _ in range(50):
+            if len(received) >= 3:
+                break
+            await asyncio.sleep(0.1)
+        await asyncio.sleep(0.2)
+
+        task.cancel()
+        await engine.dispose()
+        return slot, received
+
+    slot, received = asyncio.run(scenario())
+
+    assert received == [
+        ChangeEvent(ALL),
+        ChangeEvent(SLOT, slot.slot_id, date(2025, 10, 15)),
+        ChangeEvent(USER, 10)
+    ]
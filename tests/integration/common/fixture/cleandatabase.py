@@ -22,7 +22,7 @@ def clean_database():
             # Очищаем все таблицы
             for table in tables:
                 if table not in ['spatial_ref_sys']:  # Исключаем системные
-                    session.execute(text(f'TRUNCATE TABLE "{table}" CASCADE;'))
+                    session.execute(text(f'TRUNCATE TABLE "{table}" RESTART IDENTITY CASCADE;'))
 
             session.commit()
 
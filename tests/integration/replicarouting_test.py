@@ -0,0 +1,46 @@
+import os
+
+from datetime import datetime
+
+from sqlalchemy import text
+
+from src.app.models import Slot
+
+from src.app.services import SlotService
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.replicarouter import actor_scope
+
+from tests.integration.common.fixture import clean_database
+
+
+def _with_application_name(dsn: str, name: str) -> str:
+    separator = '&' if '?' in dsn else '?'
+    return f'{dsn}{separator}application_name={name}'
+
+
+def _application_name(engine: DatabaseEngine) -> str:
+    with engine.read_session() as session:
+        return session.execute(text('SHOW application_name')).scalar_one()
+
+
+def test_read_session_uses_replica_until_actor_writes(clean_database, monkeypatch):
+    # В качестве "реплики" используется тот же сервер, отличаем её по application_name
+    dsn = os.environ['PLANIFY_DB_DSN']
+    monkeypatch.setenv('PLANIFY_DB_REPLICA_DSNS', _with_application_name(dsn, 'planify_replica'))
+    monkeypatch.setenv('PLANIFY_DB_REPLICA_FRESHNESS_S', '60')
+    engine = DatabaseEngine()
+    slot_service = SlotService(engine)
+
+    with actor_scope(1):
+        assert _application_name(engine) == 'planify_replica'
+        slot_service.add_slot(Slot(
+            start_time=datetime(2030, 1, 1, 10, 0, 0),
+            end_time=datetime(2030, 1, 1, 10, 30, 0),
+            duration_in_minutes=30
+        ))
+        assert _application_name(engine) != 'planify_replica'
+
+    with actor_scope(2):
+        assert _application_name(engine) == 'planify_replica'
+
+    engine.dispose()
@@ -0,0 +1,51 @@
+from src.app.models import Caller, Role, User, Client
+from src.app.services import RoleService, UserService, ClientService
+from src.app.services.role import role_cache
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+
+from tests.integration.common.fixture import clean_database
+
+
+def test_role_service_get_user_role_by_tg_id(clean_database):
+    role_cache.clear()
+    engine = DatabaseEngine()
+    service = RoleService(engine)
+
+    assert service.get_user_role_by_tg_id(10) == Role.GUEST
+
+    UserService(engine).add_user(User(tg_user_id=10, first_name='Admin', last_name='Admin'))
+    ClientService(engine).add_client(Client(tg_client_id=20, first_name='Client', last_name='Client'))
+
+    assert service.get_user_role_by_tg_id(10) == Role.ADMIN
+    assert service.get_user_role_by_tg_id(20) == Role.CLIENT
+    assert service.get_user_role_by_tg_id(30) == Role.GUEST
+
+
+def test_role_service_get_caller_by_tg_id(clean_database):
+    role_cache.clear()
+    engine = DatabaseEngine()
+    service = RoleService(engine)
+    UserService(engine).add_user(User(tg_user_id=10, first_name='Admin', last_name='Admin'))
+    ClientService(engine).add_client(Client(tg_client_id=10, first_name='Admin', last_name='Client'))
+    ClientService(engine).add_client(Client(tg_client_id=20, first_name='Client', last_name='Client'))
+
+    assert service.get_caller_by_tg_id(10) == Caller(Role.ADMIN, user_id=1, client_id=1)
+    assert service.get_caller_by_tg_id(20) == Caller(Role.CLIENT, client_id=2)
+    assert service.get_caller_by_tg_id(30) == Caller(Role.GUEST)
+    # Роль берётся из того же закешированного Caller
+    assert role_cache.get(20) == Caller(Role.CLIENT, client_id=2)
+    assert service.get_user_role_by_tg_id(20) == Role.CLIENT
+
+
+def test_role_service_caches_role(clean_database):
+    role_cache.clear()
+    engine = DatabaseEngine()
+    service = RoleService(engine)
+    service.get_user_role_by_tg_id(10)
+
+    # Запись в обход сервисов не сбрасывает кеш
+    with engine.session() as session:
+        session.add(User(tg_user_id=10, first_name='Admin', last_name='Admin'))
+
+    assert service.get_user_role_by_tg_id(10) == Role.GUEST
+    role_cache.clear()
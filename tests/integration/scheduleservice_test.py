@@ -0,0 +1,45 @@
+from datetime import date, time, timedelta
+
+from src.app.models import Schedule, User
+from src.app.services import ScheduleService, SlotService, UserService
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+
+from tests.integration.common.fixture import clean_database
+
+
+def _add_schedule(engine: DatabaseEngine, day: date, start: time, end: time, is_active: int = 1) -> Schedule:
+    schedule = Schedule(
+        admin_id=1,
+        date=day,
+        start_time=start,
+        end_time=end,
+        is_active=is_active,
+        slot_duration_in_minutes=60
+    )
+    ScheduleService(engine).add_schedule(schedule)
+    return schedule
+
+
+def test_schedule_service_materialize_slots_is_incremental(clean_database):
+    engine = DatabaseEngine()
+    UserService(engine).add_user(User(tg_user_id=1, first_name='Admin', last_name='Admin'))
+    service = ScheduleService(engine)
+    today = date.today()
+
+    _add_schedule(engine, today + timedelta(days=1), time(10, 0), time(13, 0))
+    _add_schedule(engine, today + timedelta(days=2), time(10, 0), time(12, 30))
+    _add_schedule(engine, today + timedelta(days=3), time(10, 0), time(12, 0), is_active=0)
+    _add_schedule(engine, today + timedelta(days=40), time(10, 0), time(12, 0))
+
+    assert service.materialize_slots(horizon_days=30) == 5
+    assert service.materialize_slots(horizon_days=30) == 0
+
+    _add_schedule(engine, today + timedelta(days=4), time(9, 0), time(10, 0))
+
+    assert service.materialize_slots(horizon_days=30) == 1
+    assert service.materialize_slots(horizon_days=60) == 2
+
+    slots = SlotService(engine).get_slots()
+    assert len(slots) == 8
+    assert slots[0].start_time.time() == time(10, 0)
+    assert slots[0].end_time - slots[0].start_time == timedelta(hours=1)
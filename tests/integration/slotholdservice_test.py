@@ -0,0 +1,94 @@
+import asyncio
+import pytest
+
+from datetime import datetime, timedelta
+
+from src.app.models import Slot, Appointment, AppointmentStatus
+from src.app.services import (
+    SlotService, AppointmentService, SlotHoldService, AsyncSlotHoldService, SlotBookedError, SlotHeldError
+)
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+from tests.integration.common.fixture import clean_database
+
+
+def _add_slots(engine: DatabaseEngine, count: int) -> list[datetime]:
+    starts = [datetime(2025, 11, 3, 9, 0, 0) + timedelta(hours=i) for i in range(count)]
+    SlotService(engine).add_slots([
+        Slot(start_time=start, end_time=start + timedelta(hours=1), duration_in_minutes=60) for start in starts
+    ])
+    return starts
+
+
+def test_slot_hold_service_hold_slot(clean_database):
+    engine = DatabaseEngine()
+    holds = SlotHoldService(engine)
+    appointments = AppointmentService(engine)
+    starts = _add_slots(engine, 2)
+
+    hold = holds.hold_slot(1, 1001)
+    renewed = holds.hold_slot(1, 1001)
+    with pytest.raises(SlotHeldError):
+        holds.hold_slot(1, 1002)
+    with pytest.raises(SlotHeldError):
+        appointments.book_slot(Appointment(slot_id=1, status=AppointmentStatus.PENDING))
+    with pytest.raises(ValueError):
+        holds.hold_slot(100, 1001)
+
+    other = Appointment(status=AppointmentStatus.PENDING)
+    assert appointments.book_first_free_slot(other, starts[0], starts[-1] + timedelta(hours=1))
+    assert other.slot_id == 2
+
+    appointments.book_slot(Appointment(slot_id=1, status=AppointmentStatus.CONFIRMED), holder_tg_id=1001)
+
+    assert renewed.hold_id == hold.hold_id and renewed.expires_at >= hold.expires_at
+    assert holds.get_hold(1) is None
+    assert not holds.release_hold(1, 1001)
+    with pytest.raises(SlotBookedError):
+        holds.hold_slot(1, 1002)
+
+
+def test_slot_hold_service_expired_hold(clean_database):
+    engine = DatabaseEngine()
+    _add_slots(engine, 1)
+    SlotHoldService(engine, ttl=timedelta(0)).hold_slot(1, 1001)
+
+    hold = SlotHoldService(engine).hold_slot(1, 1002)
+
+    assert (hold.slot_id, hold.holder_tg_id) == (1, 1002)
+    assert SlotHoldService(engine).get_hold(1) == hold
+
+
+def test_slot_hold_service_sweep_expired(clean_database):
+    engine = DatabaseEngine()
+    _add_slots(engine, 6)
+    expired = SlotHoldService(engine, ttl=timedelta(0))
+    for slot_id in range(1, 6):
+        expired.hold_slot(slot_id, 1000 + slot_id)
+    live = SlotHoldService(engine).hold_slot(6, 1006)
+
+    swept = SlotHoldService(engine).sweep_expired(batch_size=2)
+
+    assert swept == 5
+    assert SlotHoldService(engine).sweep_expired() == 0
+    assert SlotHoldService(engine).get_hold(6) == live
+
+
+def test_async_slot_hold_service_hold_slot(clean_database):
+    _add_slots(DatabaseEngine(), 1)
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotHoldService(engine)
+        results = await asyncio.gather(*[service.hold_slot(1, 1000 + i) for i in range(5)], return_exceptions=True)
+        hold = await service.get_hold(1)
+        released = await service.release_hold(1, hold.holder_tg_id)
+        await engine.dispose()
+        return results, released
+
+    results, released = asyncio.run(scenario())
+
+    assert sum(not isinstance(r, Exception) for r in results) == 1
+    assert all(isinstance(r, SlotHeldError) for r in results if isinstance(r, Exception))
+    assert released
@@ -1,10 +1,15 @@
 import pytest
 
-from datetime import datetime
+from datetime import date, datetime, time, timedelta
 
-from src.app.models import Slot
-from src.app.services import SlotService
+from sqlalchemy import delete
+
+from src.app.models import (
+    Slot, SlotRecurrence, SlotStatus, FreeWindow, Appointment, AppointmentStatus, SlotFilter, SlotSort, Client
+)
+from src.app.services import SlotService, SlotOverlapError, AppointmentService, AvailabilityIndex, ClientService
 from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.notifications import SLOT, ChangeEvent
 
 from tests.integration.common.fixture import clean_database
 
@@ -107,3 +112,492 @@ def test_slot_service_get_slots_by_date_return_no_one(clean_database):
     result = service.get_slots_by_date(dt)
 
     assert expected == result
+
+
+def _add_slots(service: SlotService, starts: list[datetime]) -> None:
+    for start in starts:
+        service.add_slot(Slot(
+            start_time=start,
+            end_time=start + timedelta(hours=1),
+            duration_in_minutes=60
+        ))
+
+
+def test_slot_service_get_slots_page_walks_all_pages(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    starts = [datetime(2025, 11, day, 10, 0, 0) for day in range(1, 13)]
+    _add_slots(service, list(reversed(starts)))
+
+    first = service.get_slots_page(limit=5, with_total=True)
+    second = service.get_slots_page(cursor=first.next_cursor, limit=5)
+    third = service.get_slots_page(cursor=second.next_cursor, limit=5)
+
+    assert first.total == 12
+    assert second.total is None
+    assert (first.has_next, second.has_next, third.has_next) == (True, True, False)
+    assert [s.start_time for s in first.slots + second.slots + third.slots] == starts
+
+
+def test_slot_service_get_slots_page_sorts_by_time_of_day_desc(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [
+        datetime(2025, 11, 1, 9, 0, 0),
+        datetime(2025, 11, 2, 18, 0, 0),
+        datetime(2025, 11, 3, 12, 0, 0),
+    ])
+
+    first = service.get_slots_page(sort=SlotSort.TIME_DESC, limit=2)
+    second = service.get_slots_page(sort=SlotSort.TIME_DESC, cursor=first.next_cursor, limit=2)
+
+    assert [s.start_time.hour for s in first.slots] == [18, 12]
+    assert [s.start_time.hour for s in second.slots] == [9]
+
+
+def test_slot_service_get_slots_page_filters(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    now = datetime.now().replace(microsecond=0)
+    _add_slots(service, [now - timedelta(days=1), now + timedelta(days=1), now + timedelta(days=2)])
+
+    with engine.session() as session:
+        session.add(Appointment(slot_id=2, status=AppointmentStatus.CANCELLED))
+        session.add(Appointment(slot_id=3, status=AppointmentStatus.CANCELLED))
+        session.add(Appointment(slot_id=3, status=AppointmentStatus.CONFIRMED))
+
+    def slot_ids(slot_filter: SlotFilter) -> list[int]:
+        return [s.slot_id for s in service.get_slots_page(slot_filter, limit=10).slots]
+
+    assert slot_ids(SlotFilter.ALL) == [1, 2, 3]
+    assert slot_ids(SlotFilter.FUTURE) == [2, 3]
+    assert slot_ids(SlotFilter.PAST) == [1]
+    assert slot_ids(SlotFilter.CANCELLED) == [2]
+    assert slot_ids(SlotFilter.BOOKED) == [3]
+
+
+def test_slot_service_get_slot_statuses(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, day, 10, 0, 0) for day in range(1, 4)])
+
+    with engine.session() as session:
+        session.add(Appointment(slot_id=2, status=AppointmentStatus.CANCELLED))
+        session.add(Appointment(slot_id=3, status=AppointmentStatus.CANCELLED))
+        session.add(Appointment(slot_id=3, status=AppointmentStatus.CONFIRMED))
+
+    assert service.get_slot_statuses([1, 2, 3]) == {1: SlotStatus.FREE, 2: SlotStatus.CANCELLED, 3: SlotStatus.BOOKED}
+    assert service.get_slot_statuses([]) == {}
+    assert [service.is_slot_free(slot_id) for slot_id in (1, 2, 3)] == [True, True, False]
+
+
+def test_slot_service_slot_views_and_agenda(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, day, 10, 0, 0) for day in range(1, 4)])
+
+    with engine.session() as session:
+        client = Client(tg_client_id=20, first_name='Ivan', last_name='Petrov')
+        session.add(client)
+        session.flush()
+        session.add(Appointment(slot_id=2, status=AppointmentStatus.CANCELLED))
+        session.add(Appointment(slot_id=3, client_id=client.client_id, status=AppointmentStatus.CONFIRMED,
+                                description='Консультация'))
+
+    page = service.get_slots_page(limit=10)
+    view = service.get_slot_view(3)
+    agenda = service.get_agenda(datetime(2025, 11, 1), datetime(2025, 11, 4))
+    appointments = ClientService(engine).get_client_appointment_views(client.client_id)
+
+    assert [s.status for s in page.slots] == [SlotStatus.FREE, SlotStatus.CANCELLED, SlotStatus.BOOKED]
+    assert (view.date, view.status, view.created_at is not None) == (date(2025, 11, 3), SlotStatus.BOOKED, True)
+    assert service.get_slot_view(100) is None
+    assert [(row.slot_id, row.status, row.client_name) for row in agenda] == [
+        (1, SlotStatus.FREE, None),
+        (2, SlotStatus.CANCELLED, None),
+        (3, SlotStatus.BOOKED, 'Ivan Petrov')
+    ]
+    assert [(a.slot_id, a.date, a.status, a.description) for a in appointments] == [
+        (3, date(2025, 11, 3), AppointmentStatus.CONFIRMED, 'Консультация')
+    ]
+
+
+def test_slot_service_iter_slots(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    starts = [datetime(2025, 11, 1, 8, 0, 0) + timedelta(hours=i) for i in range(7)]
+    _add_slots(service, list(reversed(starts)))
+
+    with engine.session() as session:
+        session.add(Appointment(slot_id=7, status=AppointmentStatus.CONFIRMED))
+        session.add(Appointment(slot_id=1, status=AppointmentStatus.CANCELLED))
+
+    streamed = list(service.iter_slots(chunk_size=3))
+    in_range = list(service.iter_slots(starts[2], starts[5], chunk_size=2))
+    first = next(service.iter_slots(chunk_size=2))
+    appointments = list(AppointmentService(engine).iter_appointments(chunk_size=1))
+
+    assert [s.start_time for s in streamed] == starts
+    assert [s.start_time for s in in_range] == starts[2:5]
+    assert first.start_time == starts[0]
+    assert [(a.slot_id, a.start_time, a.status) for a in appointments] == [
+        (7, starts[0], AppointmentStatus.CONFIRMED),
+        (1, starts[6], AppointmentStatus.CANCELLED)
+    ]
+
+
+def test_slot_service_detects_overlaps(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 1, 10, 0, 0), datetime(2025, 11, 1, 12, 0, 0)])
+
+    containing = Slot(
+        start_time=datetime(2025, 11, 1, 9, 0, 0),
+        end_time=datetime(2025, 11, 1, 14, 0, 0),
+        duration_in_minutes=300
+    )
+    adjacent = Slot(
+        start_time=datetime(2025, 11, 1, 11, 0, 0),
+        end_time=datetime(2025, 11, 1, 12, 0, 0),
+        duration_in_minutes=60
+    )
+
+    assert service.is_slot_intersect_with_others(containing)
+    assert [s.slot_id for s in service.get_conflicting_slots(containing)] == [1, 2]
+    assert not service.is_slot_intersect_with_others(adjacent)
+
+
+def test_slot_service_add_slot_rejects_overlap(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 1, 10, 0, 0)])
+
+    overlapping = Slot(
+        start_time=datetime(2025, 11, 1, 10, 30, 0),
+        end_time=datetime(2025, 11, 1, 11, 30, 0),
+        duration_in_minutes=60
+    )
+
+    with pytest.raises(SlotOverlapError) as error:
+        service.add_slot(overlapping)
+
+    assert [s.slot_id for s in error.value.conflicts] == [1]
+    assert len(service.get_slots()) == 1
+
+
+def test_slot_service_add_slots_rejects_overlaps_in_batch_and_table(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 1, 10, 0, 0)])
+
+    batch = [
+        Slot(start_time=datetime(2025, 11, 1, 9, 0, 0), end_time=datetime(2025, 11, 1, 10, 0, 0), duration_in_minutes=60),
+        Slot(start_time=datetime(2025, 11, 1, 10, 30, 0), end_time=datetime(2025, 11, 1, 11, 30, 0), duration_in_minutes=60),
+        Slot(start_time=datetime(2025, 11, 1, 12, 0, 0), end_time=datetime(2025, 11, 1, 13, 0, 0), duration_in_minutes=60),
+        Slot(start_time=datetime(2025, 11, 1, 12, 30, 0), end_time=datetime(2025, 11, 1, 13, 30, 0), duration_in_minutes=60),
+    ]
+
+    result = service.add_slots(batch)
+
+    assert [s.start_time.strftime('%H:%M') for s in result.inserted] == ['09:00', '12:00']
+    assert [s.start_time.strftime('%H:%M') for s in result.rejected] == ['10:30', '12:30']
+    assert all(s.slot_id is not None for s in result.inserted)
+    assert len(service.get_slots()) == 3
+
+
+def test_slot_service_add_slots_many(clean_database, monkeypatch):
+    monkeypatch.setattr('src.app.services.slot.BULK_INSERT_CHUNK_SIZE', 100)
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    start = datetime(2026, 1, 1, 0, 0, 0)
+    batch = [
+        Slot(start_time=start + timedelta(minutes=30 * i), end_time=start + timedelta(minutes=30 * (i + 1)), duration_in_minutes=30)
+        for i in range(250)
+    ]
+
+    result = service.add_slots(batch)
+
+    assert len(result.inserted) == 250
+    assert result.rejected == []
+    assert service.get_slots_page(limit=1, with_total=True).total == 250
+
+
+def test_slot_service_clone_slot_to_days(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 5, 10, 30, 0)])
+
+    created = service.clone_slot(1, datetime(2025, 11, 4).date(), datetime(2025, 11, 6).date())
+
+    assert len(created) == 2
+    assert [s.start_time for s in service.get_slots()] == [
+        datetime(2025, 11, 3, 10, 0, 0),
+        datetime(2025, 11, 4, 10, 0, 0),
+        datetime(2025, 11, 5, 10, 30, 0),
+        datetime(2025, 11, 6, 10, 0, 0),
+    ]
+
+
+def test_slot_service_clone_day_with_offset(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 12, 0, 0)])
+
+    created = service.clone_day(
+        datetime(2025, 11, 3).date(), datetime(2025, 11, 4).date(), datetime(2025, 11, 4).date(), timedelta(minutes=30)
+    )
+
+    assert len(created) == 2
+    assert [(s.start_time, s.end_time) for s in service.get_slots()][2:] == [
+        (datetime(2025, 11, 4, 10, 30, 0), datetime(2025, 11, 4, 11, 30, 0)),
+        (datetime(2025, 11, 4, 12, 30, 0), datetime(2025, 11, 4, 13, 30, 0)),
+    ]
+
+
+def test_slot_service_clone_week(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    # Пн 03.11 и Вс 09.11 - одна неделя
+    _add_slots(service, [datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 9, 18, 0, 0)])
+
+    created = service.clone_week(datetime(2025, 11, 5).date(), datetime(2025, 11, 5).date(), datetime(2025, 11, 17).date())
+
+    assert len(created) == 4
+    assert [s.start_time for s in service.get_slots()][2:] == [
+        datetime(2025, 11, 10, 10, 0, 0),
+        datetime(2025, 11, 16, 18, 0, 0),
+        datetime(2025, 11, 17, 10, 0, 0),
+        datetime(2025, 11, 23, 18, 0, 0),
+    ]
+
+
+def test_slot_service_clone_skips_overlaps(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 4, 10, 30, 0)])
+
+    created = service.clone_slot(1, datetime(2025, 11, 4).date(), datetime(2025, 11, 5).date())
+
+    assert len(created) == 1
+    assert len(service.get_slots()) == 3
+
+
+def _tue_thu_recurrence() -> SlotRecurrence:
+    # Вт/Чт 10:00-12:00 по часу, 04.11 - 13.11: 4 дня по 2 слота
+    return SlotRecurrence(
+        weekdays=SlotRecurrence.weekdays_mask([1, 3]),
+        start_time=time(10, 0),
+        end_time=time(12, 0),
+        slot_duration_in_minutes=60,
+        valid_from=date(2025, 11, 4),
+        valid_until=date(2025, 11, 13)
+    )
+
+
+def test_slot_service_get_slots_by_date_expands_recurrence(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    service.add_recurrence(_tue_thu_recurrence())
+    _add_slots(service, [datetime(2025, 11, 4, 11, 0, 0)])
+
+    result = service.get_slots_by_date(date(2025, 11, 4))
+
+    assert [(s.start_time, s.slot_id, s.is_virtual) for s in result] == [
+        (datetime(2025, 11, 4, 10, 0, 0), None, True),
+        (datetime(2025, 11, 4, 11, 0, 0), 1, False),
+    ]
+    assert service.get_slots_by_date(date(2025, 11, 5)) == []
+
+
+def test_slot_service_get_slots_page_merges_recurrences(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    service.add_recurrence(_tue_thu_recurrence())
+    _add_slots(service, [datetime(2025, 11, 5, 9, 0, 0)])
+
+    pages = [service.get_slots_page(limit=3, with_total=True)]
+    while pages[-1].has_next:
+        pages.append(service.get_slots_page(cursor=pages[-1].next_cursor, limit=3))
+    descending = service.get_slots_page(sort=SlotSort.DATE_DESC, limit=2)
+    stored = service.get_slots_page(limit=3, with_total=True, stored_only=True)
+
+    starts = [s.start_time for page in pages for s in page.slots]
+    assert ([s.slot_id for s in stored.slots], stored.has_next, stored.total) == ([1], False, 1)
+    assert pages[0].total == 9
+    assert len(pages) == 3
+    assert starts == sorted(starts)
+    assert starts[2] == datetime(2025, 11, 5, 9, 0, 0)
+    assert [s.start_time for s in descending.slots] == [datetime(2025, 11, 13, 11, 0, 0), datetime(2025, 11, 13, 10, 0, 0)]
+
+
+def test_slot_service_get_slots_page_expands_long_recurrence_by_windows(clean_database, monkeypatch):
+    monkeypatch.setattr('src.app.services.slot.OCCURRENCE_COUNT_LIMIT', 10)
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    # По понедельникам 10:00-11:00 весь 2026 год и ещё одно правило через год после него
+    for valid_from, valid_until in [(date(2026, 1, 1), date(2026, 12, 31)), (date(2028, 1, 1), date(2028, 1, 31))]:
+        service.add_recurrence(SlotRecurrence(
+            weekdays=SlotRecurrence.weekdays_mask([0]),
+            start_time=time(10, 0),
+            end_time=time(11, 0),
+            slot_duration_in_minutes=60,
+            valid_from=valid_from,
+            valid_until=valid_until
+        ))
+    _add_slots(service, [datetime(2026, 6, 3, 9, 0, 0), datetime(2027, 6, 2, 9, 0, 0)])
+
+    def walk(sort: SlotSort) -> list[datetime]:
+        pages = [service.get_slots_page(sort=sort, limit=7)]
+        while pages[-1].has_next:
+            pages.append(service.get_slots_page(sort=sort, cursor=pages[-1].next_cursor, limit=7))
+        return [s.start_time for page in pages for s in page.slots]
+
+    ascending = walk(SlotSort.DATE_ASC)
+
+    assert len(ascending) == 52 + 2 + 5
+    assert ascending == sorted(ascending)
+    assert walk(SlotSort.DATE_DESC) == list(reversed(ascending))
+    assert service.get_slots_page(with_total=True).total == 2 + 10
+
+
+def test_slot_service_materialize_occurrence(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    recurrence = _tue_thu_recurrence()
+    service.add_recurrence(recurrence)
+
+    slot = service.materialize_occurrence(recurrence.recurrence_id, datetime(2025, 11, 6, 11, 0, 0))
+    again = service.materialize_occurrence(recurrence.recurrence_id, datetime(2025, 11, 6, 11, 0, 0))
+
+    assert slot.slot_id is not None
+    assert slot.recurrence_id == recurrence.recurrence_id
+    assert slot.end_time == datetime(2025, 11, 6, 12, 0, 0)
+    assert again.slot_id == slot.slot_id
+    assert [s.is_virtual for s in service.get_slots_by_date(date(2025, 11, 6))] == [True, False]
+    assert len(service.get_slots()) == 1
+
+    with pytest.raises(ValueError):
+        service.materialize_occurrence(recurrence.recurrence_id, datetime(2025, 11, 6, 10, 30, 0))
+    with pytest.raises(ValueError):
+        service.materialize_occurrence(recurrence.recurrence_id, datetime(2025, 11, 5, 10, 0, 0))
+
+
+def test_slot_service_add_recurrence_rejects_overlap(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    service.add_recurrence(_tue_thu_recurrence())
+
+    overlapping = _tue_thu_recurrence()
+    overlapping.weekdays = SlotRecurrence.weekdays_mask([3, 4])
+    overlapping.start_time = time(11, 30)
+    overlapping.end_time = time(13, 30)
+
+    with pytest.raises(ValueError):
+        service.add_recurrence(overlapping)
+
+    overlapping.weekdays = SlotRecurrence.weekdays_mask([4])
+    service.add_recurrence(overlapping)
+    assert service.get_recurrence_by_id(overlapping.recurrence_id) == overlapping
+
+
+def test_slot_service_find_free_windows(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    # 03.11: 10-11, 11-12, 12-13 подряд, 12-13 занят; 14-15 отдельно. 04.11: 10-11, 11-12
+    _add_slots(service, [
+        datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 11, 0, 0), datetime(2025, 11, 3, 12, 0, 0),
+        datetime(2025, 11, 3, 14, 0, 0), datetime(2025, 11, 4, 10, 0, 0), datetime(2025, 11, 4, 11, 0, 0),
+    ])
+    with engine.session() as session:
+        session.add(Appointment(slot_id=3, status=AppointmentStatus.CONFIRMED))
+
+    range_from, range_to = datetime(2025, 11, 3), datetime(2025, 11, 10)
+
+    assert service.find_free_windows(range_from, range_to, timedelta(minutes=90)) == [
+        FreeWindow(datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 12, 0, 0)),
+        FreeWindow(datetime(2025, 11, 4, 10, 0, 0), datetime(2025, 11, 4, 12, 0, 0)),
+    ]
+    assert len(service.find_free_windows(range_from, range_to, timedelta(minutes=60))) == 3
+    assert service.find_free_windows(range_from, range_to, timedelta(minutes=60), limit=1)[0].duration == timedelta(hours=2)
+    assert service.find_free_windows(range_from, range_to, timedelta(hours=3)) == []
+
+
+def test_slot_service_find_free_windows_joins_recurrences(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    service.add_recurrence(_tue_thu_recurrence())
+    _add_slots(service, [datetime(2025, 11, 4, 12, 0, 0)])
+
+    windows = service.find_free_windows(datetime(2025, 11, 4), datetime(2025, 11, 5), timedelta(hours=3))
+
+    assert windows == [FreeWindow(datetime(2025, 11, 4, 10, 0, 0), datetime(2025, 11, 4, 13, 0, 0))]
+
+
+def test_slot_service_availability_index(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 11, 0, 0), datetime(2025, 11, 5, 10, 0, 0)])
+    with engine.session() as session:
+        session.add(Appointment(slot_id=2, status=AppointmentStatus.CONFIRMED))
+
+    index = service.build_availability_index(datetime(2025, 11, 3), datetime(2025, 11, 4))
+
+    assert len(index) == 2
+    assert index.find_bookable_run(date(2025, 11, 3), 60) == datetime(2025, 11, 3, 10, 0, 0)
+    assert index.find_bookable_run(date(2025, 11, 3), 61) is None
+
+
+def test_slot_service_keeps_availability_index_current(clean_database):
+    engine = DatabaseEngine()
+    index = AvailabilityIndex()
+    service = SlotService(engine, index)
+    appointments = AppointmentService(engine, index)
+    start, end = datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 11, 0, 0)
+
+    _add_slots(service, [start])
+    service.add_slots([Slot(start_time=end, end_time=end + timedelta(hours=1), duration_in_minutes=60)])
+    assert not index.is_free(start, end + timedelta(hours=1))
+
+    appointment = Appointment(slot_id=1, status=AppointmentStatus.PENDING)
+    appointments.create_appointment(appointment)
+    assert index.is_booked(start, end)
+
+    appointments.cancel_appointment(appointment.appointment_id)
+    assert not index.is_booked(start, end)
+
+    service.delete_slot_by_id(1)
+    assert index.is_free(start, end)
+    assert not index.is_free(end, end + timedelta(hours=1))
+
+
+def test_slot_service_refresh_availability_index(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    index = AvailabilityIndex()
+    _add_slots(service, [datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 23, 30, 0)])
+
+    service.refresh_availability_index(index, date(2025, 11, 3), date(2025, 11, 5))
+    assert len(index) == 2
+    assert not index.is_free(datetime(2025, 11, 4, 0, 0, 0), datetime(2025, 11, 4, 0, 30, 0))
+
+    # Слот, удалённый мимо индекса, пропадает только после уведомления о его дне
+    with engine.session() as session:
+        session.execute(delete(Slot).where(Slot.slot_id == 1))
+    service.refresh_availability_index(index, date(2025, 11, 3), date(2025, 11, 5))
+    assert not index.is_free(datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 11, 0, 0))
+
+    index.on_change(ChangeEvent(SLOT, 1, date(2025, 11, 3)))
+    service.refresh_availability_index(index, date(2025, 11, 3), date(2025, 11, 5))
+    assert index.is_free(datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 11, 0, 0))
+    assert len(index) == 1
+
+
+def test_slot_service_build_interval_tree(clean_database):
+    engine = DatabaseEngine()
+    service = SlotService(engine)
+    _add_slots(service, [datetime(2025, 11, 3, 10, 0, 0), datetime(2025, 11, 3, 23, 30, 0), datetime(2025, 11, 5, 10, 0, 0)])
+
+    tree = service.build_interval_tree(datetime(2025, 11, 4), datetime(2025, 11, 5))
+
+    assert len(tree) == 1
+    assert tree.find_overlap(datetime(2025, 11, 4, 0, 0, 0), datetime(2025, 11, 4, 1, 0, 0)) == 2
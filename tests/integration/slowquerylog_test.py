@@ -0,0 +1,23 @@
+import logging
+
+from sqlalchemy import text
+
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+
+from tests.integration.common.fixture import clean_database
+
+
+def test_query_telemetry_explains_slow_select(clean_database, monkeypatch, caplog):
+    monkeypatch.setenv('PLANIFY_DB_SLOW_QUERY_MS', '0')
+    monkeypatch.setenv('PLANIFY_DB_EXPLAIN_SAMPLE_RATE', '1')
+    engine = DatabaseEngine()
+
+    with caplog.at_level(logging.WARNING):
+        with engine.session() as session:
+            session.execute(text('SELECT slot_id FROM slot WHERE duration_in_minutes > :minutes'), {'minutes': 30})
+            result = session.execute(text('SELECT 1 AS value')).scalar_one()
+
+    assert result == 1
+    assert 'Plan for slow query' in caplog.text
+    assert any('FROM slot' in s.sql for s in engine.query_stats())
+    engine.dispose()
@@ -0,0 +1,224 @@
+import asyncio
+
+from datetime import datetime
+
+from sqlalchemy import select
+from telegram import Chat, Message, Update, User
+from telegram.ext import ApplicationBuilder, ExtBot, TypeHandler
+
+from src.app.models import Role, Slot, Appointment, AppointmentStatus, Client
+from src.app.services import AsyncSlotService, AsyncAppointmentService, ClientService, SlotService
+from src.app.services.role import role_cache
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.replicarouter import get_current_actor
+from src.infrastructure.postgres.unitofwork import get_current_unit_of_work
+from src.infrastructure.telegrambot.botcontext import UpdateIdentity, get_identity
+from src.infrastructure.telegrambot.unitofwork import MIDDLEWARE_GROUP, UnitOfWorkApplication, UnitOfWorkMiddleware
+
+from tests.integration.common.fixture import clean_database
+
+
+def _slot(hour: int) -> Slot:
+    return Slot(
+        start_time=datetime(2025, 12, 1, hour, 0, 0),
+        end_time=datetime(2025, 12, 1, hour + 1, 0, 0),
+        duration_in_minutes=60
+    )
+
+
+def test_unit_of_work_shares_session_and_commits(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        unit_of_work = engine.begin_unit_of_work()
+        async with engine.session() as write_session:
+            pass
+        async with engine.read_session() as read_session:
+            pass
+        await service.add_slot(_slot(10))
+        await unit_of_work.finish()
+
+        slots = await service.get_slots()
+        await engine.dispose()
+        return unit_of_work.session, write_session, read_session, slots
+
+    uow_session, write_session, read_session, slots = asyncio.run(scenario())
+
+    assert write_session is uow_session
+    assert read_session is uow_session
+    assert len(slots) == 1
+
+
+def test_unit_of_work_commits_each_call(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        unit_of_work = engine.begin_unit_of_work()
+        await service.add_slot(_slot(10))
+        in_transaction = unit_of_work.session.in_transaction()
+        visible = SlotService(DatabaseEngine()).get_slots()
+        unit_of_work.mark_failed()
+        await unit_of_work.finish()
+
+        slots = await service.get_slots()
+        await engine.dispose()
+        return in_transaction, visible, slots
+
+    in_transaction, visible, slots = asyncio.run(scenario())
+
+    assert not in_transaction
+    assert len(visible) == 1
+    assert len(slots) == 1
+
+
+def test_unit_of_work_keeps_changes_after_failed_call(clean_database):
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        unit_of_work = engine.begin_unit_of_work()
+        await service.add_slot(_slot(10))
+        duplicate = _slot(12)
+        duplicate.slot_id = 1
+        try:
+            await service.add_slot(duplicate)
+        except Exception:
+            pass
+        await unit_of_work.finish()
+
+        slots = await service.get_slots()
+        await engine.dispose()
+        return slots
+
+    slots = asyncio.run(scenario())
+
+    assert [slot.start_time.hour for slot in slots] == [10]
+
+
+class _OfflineBot(ExtBot):
+    """Бот без сетевых вызовов: initialize не запрашивает getMe."""
+
+    async def initialize(self) -> None:
+        pass
+
+    async def shutdown(self) -> None:
+        pass
+
+
+async def _process(engine: AsyncDatabaseEngine, handler, error_handler=None, update: Update = None) -> None:
+    application = ApplicationBuilder() \
+        .bot(_OfflineBot('123:TEST')) \
+        .application_class(UnitOfWorkApplication) \
+        .build()
+    application.add_handler(UnitOfWorkMiddleware(engine).get_handler(), group=MIDDLEWARE_GROUP)
+    application.add_handler(TypeHandler(Update, handler))
+    if error_handler is not None:
+        application.add_error_handler(error_handler)
+    await application.initialize()
+    await application.process_update(update or Update(update_id=1))
+
+
+def test_unit_of_work_middleware_releases_locks_before_handler_io(clean_database):
+    SlotService(DatabaseEngine()).add_slot(_slot(10))
+    observed = {}
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+
+        async def handler(update, context):
+            await AsyncAppointmentService(engine).book_slot(Appointment(slot_id=1, status=AppointmentStatus.PENDING))
+            # Здесь хендлер отвечал бы в Telegram: блокировка слота уже снята, запись видна всем
+            with DatabaseEngine().session() as session:
+                observed['locked_slot'] = session.scalars(select(Slot.slot_id).with_for_update(nowait=True)).all()
+            observed['in_transaction'] = get_current_unit_of_work().session.in_transaction()
+            observed['role'] = get_identity(context).role
+
+        await _process(engine, handler)
+        observed['unbound'] = get_current_unit_of_work() is None
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+    assert observed == {'locked_slot': [1], 'in_transaction': False, 'role': Role.GUEST, 'unbound': True}
+
+
+def test_unit_of_work_middleware_marks_failed_update(clean_database):
+    observed = {}
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncSlotService(engine)
+
+        async def handler(update, context):
+            observed['unit_of_work'] = get_current_unit_of_work()
+            await service.add_slot(_slot(10))
+            raise RuntimeError('handler failed')
+
+        async def error_handler(update, context):
+            observed['error'] = str(context.error)
+
+        await _process(engine, handler, error_handler)
+        slots = await service.get_slots()
+        await engine.dispose()
+        return slots
+
+    slots = asyncio.run(scenario())
+
+    assert observed['error'] == 'handler failed'
+    assert observed['unit_of_work'].failed
+    # Вызов сервиса до ошибки уже зафиксирован своей транзакцией
+    assert [slot.start_time.hour for slot in slots] == [10]
+
+
+async def _current_actor():
+    return get_current_actor()
+
+
+def _user_update(tg_id: int) -> Update:
+    user = User(id=tg_id, first_name='Client', is_bot=False)
+    return Update(update_id=1, message=Message(
+        message_id=1, date=datetime(2025, 12, 1), chat=Chat(id=tg_id, type=Chat.PRIVATE), from_user=user
+    ))
+
+
+def test_unit_of_work_middleware_resolves_client_once(clean_database):
+    role_cache.clear()
+    ClientService(DatabaseEngine()).add_client(Client(tg_client_id=42, first_name='Client', last_name='Client'))
+    observed = {}
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+
+        async def handler(update, context):
+            observed['identity'] = get_identity(context)
+
+        await _process(engine, handler, update=_user_update(42))
+        await engine.dispose()
+
+    asyncio.run(scenario())
+    role_cache.clear()
+
+    assert observed['identity'] == UpdateIdentity(tg_id=42, role=Role.CLIENT, client_id=1)
+
+
+def test_unit_of_work_middleware_resets_actor_after_update(clean_database):
+    update = _user_update(42)
+    observed = {}
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+
+        async def handler(update, context):
+            observed['in_update'] = get_current_actor()
+
+        await _process(engine, handler, update=update)
+        # Задачи, созданные после апдейта в этом контексте, не наследуют его пользователя
+        observed['after_update'] = await asyncio.create_task(_current_actor())
+        await engine.dispose()
+
+    asyncio.run(scenario())
+
+    assert observed == {'in_update': 42, 'after_update': None}
@@ -0,0 +1,132 @@
+import asyncio
+import pytest
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from src.app.models import Slot, Appointment, AppointmentStatus, Client
+from src.app.services import (
+    SlotService, AppointmentService, AsyncAppointmentService, ClientService, WaitlistService, AsyncWaitlistService
+)
+from src.infrastructure.postgres.databaseengine import DatabaseEngine
+from src.infrastructure.postgres.asyncdatabaseengine import AsyncDatabaseEngine
+
+from tests.integration.common.fixture import clean_database
+
+
+def _prepare(engine: DatabaseEngine, clients: int) -> Appointment:
+    """Один слот с записью первого клиента, остальные клиенты только заведены."""
+    start = datetime(2025, 11, 3, 9, 0, 0)
+    SlotService(engine).add_slot(Slot(start_time=start, end_time=start + timedelta(hours=1), duration_in_minutes=60))
+    for i in range(1, clients + 1):
+        ClientService(engine).add_client(Client(tg_client_id=1000 + i, first_name=f'Client {i}'))
+    appointment = Appointment(slot_id=1, client_id=1, status=AppointmentStatus.CONFIRMED)
+    AppointmentService(engine).book_slot(appointment)
+    return appointment
+
+
+def test_waitlist_service_promotes_on_cancel(clean_database):
+    engine = DatabaseEngine()
+    appointments = AppointmentService(engine)
+    waitlist = WaitlistService(engine)
+    first = _prepare(engine, 3)
+
+    positions = [waitlist.join_waitlist(1, 2), waitlist.join_waitlist(1, 3), waitlist.join_waitlist(1, 2)]
+    promotion = appointments.cancel_appointment(first.appointment_id)
+    promoted = appointments.get_appointment_by_id(promotion.appointment_id)
+
+    assert positions == [1, 2, 1]
+    assert (promotion.slot_id, promotion.client_id, promotion.tg_client_id) == (1, 2, 1002)
+    assert promotion.start_time == datetime(2025, 11, 3, 9, 0, 0)
+    assert promoted.status == AppointmentStatus.PENDING
+    assert [e.client_id for e in waitlist.get_waitlist(1)] == [3]
+
+    assert appointments.cancel_appointment(first.appointment_id) is None
+    assert waitlist.leave_waitlist(1, 3)
+    assert appointments.cancel_appointment(promotion.appointment_id) is None
+    with pytest.raises(ValueError):
+        waitlist.join_waitlist(1, 3)
+
+
+def test_waitlist_service_promotes_once_on_concurrent_cancel(clean_database):
+    engine = DatabaseEngine()
+    appointments = AppointmentService(engine)
+    waitlist = WaitlistService(engine)
+    first = _prepare(engine, 4)
+    for client_id in (2, 3, 4):
+        waitlist.join_waitlist(1, client_id)
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        promotions = list(executor.map(lambda _: appointments.cancel_appointment(first.appointment_id), range(4)))
+
+    assert [p.client_id for p in promotions if p is not None] == [2]
+    assert [e.client_id for e in waitlist.get_waitlist(1)] == [3, 4]
+
+
+def test_async_waitlist_service_promotes_on_cancel(clean_database):
+    sync_engine = DatabaseEngine()
+    first = _prepare(sync_engine, 2)
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        notified = []
+
+        async def on_promotion(promotion):
+            # Уведомление идёт после commit: запись уже видна другим соединениям
+            notified.append((promotion, AppointmentService(sync_engine).get_appointment_by_id(promotion.appointment_id)))
+
+        position = await AsyncWaitlistService(engine).join_waitlist(1, 2)
+        service = AsyncAppointmentService(engine, on_promotion=on_promotion)
+        promotion = await service.cancel_appointment(first.appointment_id)
+        left = await AsyncWaitlistService(engine).get_waitlist(1)
+        await engine.dispose()
+        return position, promotion, left, notified
+
+    position, promotion, left, notified = asyncio.run(scenario())
+
+    assert position == 1
+    assert (promotion.client_id, promotion.tg_client_id) == (2, 1002)
+    assert left == []
+    assert [(p, a.status) for p, a in notified] == [(promotion, AppointmentStatus.PENDING)]
+
+
+def test_async_waitlist_service_cancel_twice_in_unit_of_work(clean_database):
+    sync_engine = DatabaseEngine()
+    first = _prepare(sync_engine, 3)
+    for client_id in (2, 3):
+        WaitlistService(sync_engine).join_waitlist(1, client_id)
+
+    async def scenario():
+        engine = AsyncDatabaseEngine()
+        service = AsyncAppointmentService(engine)
+
+        unit_of_work = engine.begin_unit_of_work()
+        # Как CancelBookingHandler: запись уже в identity map сессии unit of work
+        loaded = await service.get_slot_appointment(1)
+        elsewhere = AppointmentService(sync_engine).cancel_appointment(first.appointment_id)
+        again = await service.cancel_appointment(loaded.appointment_id)
+        await unit_of_work.finish()
+
+        left = await AsyncWaitlistService(engine).get_waitlist(1)
+        await engine.dispose()
+        return elsewhere, again, left
+
+    elsewhere, again, left = asyncio.run(scenario())
+
+    assert elsewhere.client_id == 2
+    assert again is None
+    assert [e.client_id for e in left] == [3]
+
+
+def test_waitlist_service_notification_failure_keeps_cancel(clean_database):
+    engine = DatabaseEngine()
+    first = _prepare(engine, 2)
+    WaitlistService(engine).join_waitlist(1, 2)
+
+    def on_promotion(promotion):
+        raise RuntimeError('Telegram is down')
+
+    promotion = AppointmentService(engine, on_promotion=on_promotion).cancel_appointment(first.appointment_id)
+
+    assert promotion.client_id == 2
+    assert AppointmentService(engine).get_slot_appointment(1).appointment_id == promotion.appointment_id
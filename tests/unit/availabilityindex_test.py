@@ -0,0 +1,100 @@
+from datetime import date, datetime, time
+
+from src.app.models import Slot
+from src.app.services.availability import AvailabilityIndex
+from src.infrastructure.postgres.notifications import ALL, APPOINTMENT, RECURRENCE, SLOT, ChangeEvent
+
+
+def _slot(slot_id: int, start: datetime, end: datetime) -> Slot:
+    return Slot(slot_id=slot_id, start_time=start, end_time=end, duration_in_minutes=int((end - start).total_seconds() // 60))
+
+
+def _index() -> AvailabilityIndex:
+    index = AvailabilityIndex()
+    index.add_slot(_slot(1, datetime(2025, 11, 3, 10, 0), datetime(2025, 11, 3, 11, 0)))
+    index.add_slot(_slot(2, datetime(2025, 11, 3, 11, 0), datetime(2025, 11, 3, 12, 0)), bookings=1)
+    index.add_slot(_slot(3, datetime(2025, 11, 3, 23, 30), datetime(2025, 11, 4, 0, 30)))
+    return index
+
+
+def test_availability_index_is_free():
+    index = _index()
+
+    assert index.is_free(datetime(2025, 11, 3, 9, 0), datetime(2025, 11, 3, 10, 0))
+    assert not index.is_free(datetime(2025, 11, 3, 9, 30), datetime(2025, 11, 3, 10, 1))
+    assert not index.is_free(datetime(2025, 11, 4, 0, 0), datetime(2025, 11, 4, 1, 0))
+    assert index.is_free(datetime(2025, 11, 4, 0, 30), datetime(2025, 11, 4, 1, 0))
+    assert index.is_booked(datetime(2025, 11, 3, 11, 30), datetime(2025, 11, 3, 13, 0))
+    assert not index.is_booked(datetime(2025, 11, 3, 10, 0), datetime(2025, 11, 3, 11, 0))
+
+
+def test_availability_index_find_runs():
+    index = _index()
+    day = date(2025, 11, 3)
+
+    assert index.find_free_run(day, 60) == datetime(2025, 11, 3, 0, 0)
+    assert index.find_free_run(day, 60, not_before=time(9, 30)) == datetime(2025, 11, 3, 12, 0)
+    assert index.find_free_run(day, 11 * 60 + 31, not_before=time(12, 0)) is None
+    assert index.find_bookable_run(day, 60) == datetime(2025, 11, 3, 10, 0)
+    assert index.find_bookable_run(day, 61) is None
+
+
+def test_availability_index_validate_batch():
+    index = _index()
+    candidates = [
+        _slot(None, datetime(2025, 11, 3, 9, 0), datetime(2025, 11, 3, 10, 0)),
+        _slot(None, datetime(2025, 11, 3, 9, 30), datetime(2025, 11, 3, 10, 0)),
+        _slot(None, datetime(2025, 11, 3, 11, 30), datetime(2025, 11, 3, 12, 30)),
+        _slot(None, datetime(2025, 11, 3, 12, 0), datetime(2025, 11, 3, 13, 0)),
+    ]
+
+    assert index.validate(candidates) == [True, False, False, True]
+    assert len(index) == 3
+
+
+def test_availability_index_incremental_updates():
+    index = _index()
+
+    index.release(2)
+    assert not index.is_booked(datetime(2025, 11, 3, 11, 0), datetime(2025, 11, 3, 12, 0))
+    index.book(2)
+    index.book(2)
+    index.release(2)
+    assert index.is_booked(datetime(2025, 11, 3, 11, 0), datetime(2025, 11, 3, 12, 0))
+
+    index.remove_slot(2)
+    assert index.is_free(datetime(2025, 11, 3, 11, 0), datetime(2025, 11, 3, 12, 0))
+    assert not index.is_booked(datetime(2025, 11, 3, 11, 0), datetime(2025, 11, 3, 12, 0))
+
+
+def test_availability_index_reloads_changed_days():
+    index = AvailabilityIndex()
+    day = date(2025, 11, 3)
+    missing = index.missing_days(day, date(2025, 11, 5))
+    assert list(missing) == [day, date(2025, 11, 4)]
+
+    index.load_day(day, missing[day], [(_slot(1, datetime(2025, 11, 3, 10, 0), datetime(2025, 11, 3, 11, 0)), 0)])
+    assert list(index.missing_days(day, date(2025, 11, 5))) == [date(2025, 11, 4)]
+
+    index.on_change(ChangeEvent(SLOT, 1, day))
+    index.on_change(ChangeEvent(RECURRENCE))
+    version = index.missing_days(day, date(2025, 11, 4))[day]
+    index.load_day(day, version, [(_slot(2, datetime(2025, 11, 3, 12, 0), datetime(2025, 11, 3, 13, 0)), 1)])
+    assert index.is_free(datetime(2025, 11, 3, 10, 0), datetime(2025, 11, 3, 11, 0))
+    assert index.is_booked(datetime(2025, 11, 3, 12, 0), datetime(2025, 11, 3, 13, 0))
+    assert index.missing_days(day, date(2025, 11, 4)) == {}
+
+    index.on_change(ChangeEvent(ALL))
+    assert day in index.missing_days(day, date(2025, 11, 4))
+
+
+def test_availability_index_keeps_day_changed_while_loading():
+    index = AvailabilityIndex()
+    day = date(2025, 11, 3)
+    version = index.missing_days(day, date(2025, 11, 4))[day]
+
+    index.on_change(ChangeEvent(APPOINTMENT, 7, day))
+    index.load_day(day, version, [(_slot(1, datetime(2025, 11, 3, 10, 0), datetime(2025, 11, 3, 11, 0)), 0)])
+
+    assert not index.is_free(datetime(2025, 11, 3, 10, 0), datetime(2025, 11, 3, 11, 0))
+    assert day in index.missing_days(day, date(2025, 11, 4))
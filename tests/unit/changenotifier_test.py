@@ -0,0 +1,60 @@
+from datetime import date
+
+from src.app.models import Role
+from src.app.services.role import RoleCache
+from src.infrastructure.postgres.notifications import (
+    ALL, SLOT, USER, ChangeEvent, ChangeNotifier, slot_events
+)
+
+
+def test_change_event_payload_round_trip():
+    events = [
+        ChangeEvent(SLOT, 42, date(2025, 10, 15)),
+        ChangeEvent(SLOT, None, date(2025, 10, 15)),
+        ChangeEvent(USER, 1001),
+        ChangeEvent(ALL)
+    ]
+
+    assert events[0].payload == 'slot:42:2025-10-15'
+    assert [ChangeEvent.from_payload(event.payload) for event in events] == events
+
+
+def test_slot_events_one_event_per_day():
+    events = slot_events([
+        (1, date(2025, 10, 15)),
+        (2, date(2025, 10, 15)),
+        (3, date(2025, 10, 16))
+    ])
+
+    assert events == [ChangeEvent(SLOT, None, date(2025, 10, 15)), ChangeEvent(SLOT, 3, date(2025, 10, 16))]
+
+
+def test_change_notifier_dispatch():
+    notifier = ChangeNotifier()
+    received = []
+
+    def failing(event: ChangeEvent) -> None:
+        raise RuntimeError('boom')
+
+    notifier.subscribe(failing)
+    notifier.subscribe(received.append)
+    notifier.subscribe(received.append)
+    notifier.dispatch_payload('user:7:')
+    notifier.dispatch_payload('garbage')
+    notifier.unsubscribe(received.append)
+    notifier.dispatch(ChangeEvent(ALL))
+
+    assert received == [ChangeEvent(USER, 7)]
+
+
+def test_role_cache_on_change():
+    cache = RoleCache()
+    cache.put(1, Role.ADMIN)
+    cache.put(2, Role.CLIENT)
+
+    cache.on_change(ChangeEvent(SLOT, 1, date(2025, 10, 15)))
+    cache.on_change(ChangeEvent(USER, 1))
+    assert (cache.get(1), cache.get(2)) == (None, Role.CLIENT)
+
+    cache.on_change(ChangeEvent(ALL))
+    assert cache.get(2) is None
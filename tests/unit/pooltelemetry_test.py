@@ -0,0 +1,75 @@
+import sqlite3
+
+import pytest
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+
+from src.infrastructure.postgres.pooltelemetry import PoolTelemetry, TimedQueuePool
+
+
+def make_pool(pool_size: int = 1, max_overflow: int = 1) -> tuple[TimedQueuePool, PoolTelemetry]:
+    pool = TimedQueuePool(
+        lambda: sqlite3.connect(':memory:', check_same_thread=False),
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        timeout=0.05
+    )
+    telemetry = PoolTelemetry()
+    telemetry.attach(pool)
+    return pool, telemetry
+
+
+def test_pool_telemetry_tracks_checkouts_and_overflow():
+    pool, telemetry = make_pool(pool_size=1, max_overflow=1)
+
+    first = pool.connect()
+    second = pool.connect()
+    snapshot = telemetry.snapshot()
+
+    assert snapshot.checked_out == 2
+    assert snapshot.peak_checked_out == 2
+    assert snapshot.peak_overflow == 1
+    assert snapshot.checkouts == 2
+    assert snapshot.open_connections == 2
+
+    first.close()
+    second.close()
+
+    assert telemetry.snapshot().checked_out == 0
+
+
+def test_pool_telemetry_counts_timeouts():
+    pool, telemetry = make_pool(pool_size=1, max_overflow=0)
+
+    conn = pool.connect()
+    with pytest.raises(PoolTimeoutError):
+        pool.connect()
+    conn.close()
+
+    snapshot = telemetry.snapshot()
+
+    assert snapshot.timeouts == 1
+    assert snapshot.max_wait_ms >= 50
+
+
+def test_pool_telemetry_reset_clears_window_counters():
+    pool, telemetry = make_pool()
+
+    pool.connect().close()
+    first = telemetry.snapshot(reset=True)
+    second = telemetry.snapshot()
+
+    assert first.checkouts == 1
+    assert second.checkouts == 0
+    assert second.peak_checked_out == 0
+    assert second.open_connections == 1
+
+
+def test_pool_telemetry_survives_dispose():
+    pool, telemetry = make_pool()
+
+    pool.connect().close()
+    new_pool = pool.recreate()
+    pool.dispose()
+    new_pool.connect().close()
+
+    assert telemetry.snapshot().checkouts == 2
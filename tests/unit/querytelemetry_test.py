@@ -0,0 +1,81 @@
+import logging
+
+from sqlalchemy import create_engine, text
+
+from src.infrastructure.postgres.querytelemetry import QueryTelemetry, explain_prefix, normalize_sql, redact_parameters
+
+
+def test_normalize_sql_strips_literals_and_whitespace():
+    statement = "SELECT * FROM slot\n  WHERE slot_id IN (1, 2, 3) AND description = 'it''s'   AND duration > 30"
+
+    result = normalize_sql(statement)
+
+    assert result == 'SELECT * FROM slot WHERE slot_id IN (...) AND description = ? AND duration > ?'
+
+
+def test_normalize_sql_keeps_bound_parameter_names():
+    statement = 'SELECT slot.slot_id FROM slot WHERE slot.slot_id = %(slot_id_1)s'
+
+    assert normalize_sql(statement) == statement
+
+
+def test_redact_parameters_hides_values():
+    assert redact_parameters({'tg_user_id': 42, 'name': 'secret'}) == {'tg_user_id': 'int', 'name': 'str'}
+    assert redact_parameters((42, 'secret')) == ['int', 'str']
+    assert redact_parameters([{'a': 1}, {'a': 2}]) == '<2 rows>'
+
+
+
+def test_explain_prefix_runs_analyze_only_for_plain_reads():
+    assert explain_prefix('SELECT * FROM slot WHERE slot_id = %(id)s') == 'EXPLAIN (ANALYZE, BUFFERS)'
+    assert explain_prefix('SELECT slot.slot_id FROM slot LIMIT 1 FOR UPDATE SKIP LOCKED') == 'EXPLAIN'
+    assert explain_prefix("SELECT pg_notify('planify_changes', 'slot::')") == 'EXPLAIN'
+    assert explain_prefix('DELETE FROM slot_hold WHERE hold_id = 1') == 'EXPLAIN'
+    assert explain_prefix('SAVEPOINT sa_savepoint_1') is None
+
+def test_query_telemetry_collects_histograms_per_statement():
+    engine = create_engine('sqlite://')
+    telemetry = QueryTelemetry(slow_query_ms=10_000)
+    telemetry.attach(engine)
+
+    with engine.connect() as conn:
+        for value in range(3):
+            conn.execute(text(f'SELECT {value}'))
+        conn.execute(text('SELECT 1, 2'))
+
+    stats = {s.sql: s for s in telemetry.snapshot(reset=True)}
+
+    assert stats['SELECT ?'].count == 3
+    assert stats['SELECT ?, ?'].count == 1
+    assert sum(stats['SELECT ?'].buckets) == 3
+    assert telemetry.snapshot() == []
+
+
+def test_query_telemetry_logs_slow_queries_with_redacted_parameters(caplog):
+    engine = create_engine('sqlite://')
+    telemetry = QueryTelemetry(slow_query_ms=0)
+    telemetry.attach(engine)
+
+    with caplog.at_level(logging.WARNING):
+        with engine.connect() as conn:
+            conn.execute(text('SELECT :secret'), {'secret': 'password'})
+
+    assert 'Slow query' in caplog.text
+    assert 'password' not in caplog.text
+    assert "params=['str']" in caplog.text
+
+
+def test_query_telemetry_survives_failed_statements():
+    engine = create_engine('sqlite://')
+    telemetry = QueryTelemetry(slow_query_ms=10_000)
+    telemetry.attach(engine)
+
+    with engine.connect() as conn:
+        try:
+            conn.execute(text('SELECT * FROM missing_table'))
+        except Exception:
+            pass
+        result = conn.execute(text('SELECT 1')).scalar_one()
+
+    assert result == 1
+    assert [s.sql for s in telemetry.snapshot()] == ['SELECT ?']
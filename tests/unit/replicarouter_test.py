@@ -0,0 +1,33 @@
+from src.infrastructure.postgres.replicarouter import ReplicaRouter, actor_scope
+
+
+def test_replica_router_round_robin():
+    router = ReplicaRouter(['r1', 'r2'], freshness_window_s=60)
+
+    assert [router.choose() for _ in range(3)] == ['r1', 'r2', 'r1']
+
+
+def test_replica_router_without_replicas_uses_primary():
+    router = ReplicaRouter([], freshness_window_s=60)
+    router.record_write()
+
+    assert router.choose() is None
+
+
+def test_replica_router_keeps_writer_on_primary():
+    router = ReplicaRouter(['r1'], freshness_window_s=60)
+
+    with actor_scope(42):
+        router.record_write()
+        assert router.choose() is None
+
+    with actor_scope(7):
+        assert router.choose() == 'r1'
+
+
+def test_replica_router_returns_to_replica_after_window():
+    router = ReplicaRouter(['r1'], freshness_window_s=0)
+
+    with actor_scope(42):
+        router.record_write()
+        assert router.choose() == 'r1'
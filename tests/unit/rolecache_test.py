@@ -0,0 +1,31 @@
+import time
+
+from src.app.models import Caller, Role
+from src.app.services.role import RoleCache
+
+
+def test_role_cache_evicts_least_recently_used():
+    cache = RoleCache(max_size=2, ttl_s=60)
+    cache.put(1, Caller(Role.ADMIN))
+    cache.put(2, Caller(Role.CLIENT))
+    cache.get(1)
+    cache.put(3, Caller(Role.GUEST))
+
+    assert (cache.get(1), cache.get(2), cache.get(3)) == (Caller(Role.ADMIN), None, Caller(Role.GUEST))
+
+
+def test_role_cache_expires_entries():
+    cache = RoleCache(max_size=10, ttl_s=0.01)
+    cache.put(1, Caller(Role.ADMIN))
+    time.sleep(0.02)
+
+    assert cache.get(1) is None
+
+
+def test_role_cache_invalidate():
+    cache = RoleCache()
+    cache.put(1, Caller(Role.GUEST))
+    cache.invalidate(1)
+    cache.invalidate(None)
+
+    assert cache.get(1) is None
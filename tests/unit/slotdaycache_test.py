@@ -0,0 +1,160 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime
+
+import pytest
+
+from src.app.models import Slot
+from src.app.services import SlotDayCache
+from src.infrastructure.postgres.notifications import ALL, APPOINTMENT, RECURRENCE, ChangeEvent
+
+DAY = date(2025, 10, 15)
+
+
+def make_slot(hour: int) -> Slot:
+    return Slot(
+        start_time=datetime(2025, 10, 15, hour, 0, 0),
+        end_time=datetime(2025, 10, 15, hour + 1, 0, 0),
+        duration_in_minutes=60
+    )
+
+
+def test_slot_day_cache_reads_through():
+    cache = SlotDayCache()
+    loads = []
+
+    def load():
+        loads.append(DAY)
+        return [make_slot(10)]
+
+    first = cache.get_or_load(DAY, load)
+    first.append(make_slot(12))
+    second = cache.get_or_load(DAY, load)
+
+    assert len(loads) == 1
+    assert len(second) == 1
+
+
+def test_slot_day_cache_expires_and_evicts():
+    cache = SlotDayCache(max_size=1, ttl_s=0.01)
+    cache.get_or_load(DAY, lambda: [make_slot(10)])
+    cache.get_or_load(date(2025, 10, 16), lambda: [])
+    assert len(cache) == 1
+
+    time.sleep(0.02)
+    assert cache.get_or_load(date(2025, 10, 16), lambda: [make_slot(11)]) != []
+
+
+def test_slot_day_cache_single_flight_threads():
+    cache = SlotDayCache()
+    loads = []
+    release = threading.Event()
+
+    def load():
+        loads.append(DAY)
+        release.wait(1)
+        return [make_slot(10)]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(cache.get_or_load, DAY, load) for _ in range(8)]
+        time.sleep(0.05)
+        release.set()
+        results = [future.result() for future in futures]
+
+    assert len(loads) == 1
+    assert all(len(result) == 1 for result in results)
+
+
+def test_slot_day_cache_single_flight_async():
+    async def scenario():
+        cache = SlotDayCache()
+        loads = []
+
+        async def load():
+            loads.append(DAY)
+            await asyncio.sleep(0.01)
+            return [make_slot(10)]
+
+        results = await asyncio.gather(*[cache.get_or_load_async(DAY, load) for _ in range(20)])
+        return loads, results
+
+    loads, results = asyncio.run(scenario())
+
+    assert len(loads) == 1
+    assert all(len(result) == 1 for result in results)
+
+
+def test_slot_day_cache_async_error_reaches_all_callers():
+    async def scenario():
+        cache = SlotDayCache()
+
+        async def load():
+            await asyncio.sleep(0.01)
+            raise RuntimeError('db is down')
+
+        return await asyncio.gather(*[cache.get_or_load_async(DAY, load) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(scenario())
+
+    assert all(isinstance(result, RuntimeError) for result in results)
+
+
+def test_slot_day_cache_cancelled_leader_keeps_followers():
+    async def scenario():
+        cache = SlotDayCache()
+        started = asyncio.Event()
+        loads = []
+
+        async def slow_load():
+            loads.append('leader')
+            started.set()
+            await asyncio.sleep(10)
+            return [make_slot(9)]
+
+        async def load():
+            loads.append('follower')
+            return [make_slot(10)]
+
+        leader = asyncio.create_task(cache.get_or_load_async(DAY, slow_load))
+        await started.wait()
+        followers = [asyncio.create_task(cache.get_or_load_async(DAY, load)) for _ in range(2)]
+        await asyncio.sleep(0)
+        leader.cancel()
+
+        results = await asyncio.gather(*followers)
+        with pytest.raises(asyncio.CancelledError):
+            await leader
+        return loads, results
+
+    loads, results = asyncio.run(scenario())
+
+    # Один из ожидающих стал ведущим и загрузил день, второй дождался его
+    assert loads == ['leader', 'follower']
+    assert [[slot.start_time.hour for slot in result] for result in results] == [[10], [10]]
+
+
+def test_slot_day_cache_does_not_store_load_invalidated_midway():
+    cache = SlotDayCache()
+
+    def load():
+        cache.invalidate(DAY)
+        return [make_slot(10)]
+
+    assert len(cache.get_or_load(DAY, load)) == 1
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize('change, kept', [
+    (ChangeEvent(APPOINTMENT, 1, DAY), False),
+    (ChangeEvent(APPOINTMENT, 1, date(2025, 10, 16)), True),
+    (ChangeEvent(RECURRENCE, 1), False),
+    (ChangeEvent(ALL), False)
+])
+def test_slot_day_cache_on_change(change, kept):
+    cache = SlotDayCache()
+    cache.get_or_load(DAY, lambda: [])
+    cache.on_change(change)
+
+    assert (len(cache) == 1) == kept
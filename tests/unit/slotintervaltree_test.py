@@ -0,0 +1,73 @@
+import random
+from datetime import datetime, timedelta
+
+from src.app.models import Slot
+from src.app.services.availability import AvailabilityIndex
+from src.app.services.intervaltree import SlotIntervalTree
+
+
+def _slot(start: datetime, minutes: int, slot_id: int = None) -> Slot:
+    return Slot(slot_id=slot_id, start_time=start, end_time=start + timedelta(minutes=minutes), duration_in_minutes=minutes)
+
+
+def test_slot_interval_tree_overlaps():
+    tree = SlotIntervalTree([
+        _slot(datetime(2025, 11, 3, 10, 0), 60, 1),
+        _slot(datetime(2025, 11, 3, 12, 0), 60, 2),
+    ])
+
+    assert len(tree) == 2
+    assert tree.find_overlap(datetime(2025, 11, 3, 10, 30), datetime(2025, 11, 3, 12, 30)) in (1, 2)
+    assert tree.find_overlap(datetime(2025, 11, 3, 12, 59), datetime(2025, 11, 3, 13, 30)) == 2
+    assert not tree.overlaps(datetime(2025, 11, 3, 11, 0), datetime(2025, 11, 3, 12, 0))
+    assert not tree.overlaps(datetime(2025, 11, 3, 13, 0), datetime(2025, 11, 3, 14, 0))
+
+
+def test_slot_interval_tree_validate_catches_overlaps_inside_batch():
+    tree = SlotIntervalTree([_slot(datetime(2025, 11, 3, 10, 0), 60, 1)])
+    batch = [
+        _slot(datetime(2025, 11, 3, 9, 0), 60),
+        _slot(datetime(2025, 11, 3, 10, 30), 60),
+        _slot(datetime(2025, 11, 3, 12, 0), 60),
+        _slot(datetime(2025, 11, 3, 12, 30), 60),
+    ]
+
+    assert tree.validate(batch) == [True, False, True, False]
+    assert [start.hour for start, _ in tree] == [10]
+
+
+def test_slot_interval_tree_matches_brute_force():
+    rng = random.Random(7)
+    base = datetime(2025, 1, 1)
+    intervals = [(rng.randrange(0, 10_000), rng.randrange(1, 120)) for _ in range(2000)]
+    tree = SlotIntervalTree()
+    accepted = []
+
+    for start, length in intervals:
+        candidate = _slot(base + timedelta(minutes=start), length)
+        expected = all(start + length <= other or other + other_length <= start for other, other_length in accepted)
+        assert tree.validate([candidate]) == [expected]
+        if expected:
+            tree.add(candidate)
+            accepted.append((start, length))
+
+    assert len(tree) == len(accepted)
+    assert [start for start, _ in tree] == sorted(base + timedelta(minutes=start) for start, _ in accepted)
+
+
+def test_slot_interval_tree_validate_matches_availability_index():
+    stored = [_slot(datetime(2025, 11, 3, 10, 0), 60, 1), _slot(datetime(2025, 11, 3, 23, 30), 60, 2)]
+    tree = SlotIntervalTree(stored)
+    index = AvailabilityIndex()
+    for slot in stored:
+        index.add_slot(slot)
+    batch = [
+        _slot(datetime(2025, 11, 3, 9, 0), 90),
+        _slot(datetime(2025, 11, 3, 11, 0), 60),
+        _slot(datetime(2025, 11, 3, 11, 30), 60),
+        _slot(datetime(2025, 11, 4, 0, 0), 30),
+        _slot(datetime(2025, 11, 4, 0, 30), 30),
+    ]
+
+    assert tree.validate(batch) == index.validate(batch) == [False, True, False, False, True]
+    assert len(tree) == len(index) == 2